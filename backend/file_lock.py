@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Inter-process file lock (fcntl on POSIX, msvcrt on Windows).
+
+The OS releases the lock when the holding process exits or crashes, so there
+is no stale-lock heuristic.
+
+Usage:
+    lock = InterProcessLock('some.lock')
+    if lock.acquire(timeout=5):
+        try:
+            ...
+        finally:
+            lock.release()
+
+    with InterProcessLock('some.lock'):   # blocks until acquired
+        ...
+"""
+
+import os
+import time
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class InterProcessLock:
+    """Exclusive lock on a file shared between processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def _try_lock(self):
+        try:
+            if os.name == 'nt':
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self, timeout=None, poll_interval=0.05):
+        """
+        Acquire the lock, waiting up to `timeout` seconds (None waits forever).
+
+        Returns:
+            bool: True if the lock is held
+        """
+        if self._file is not None:
+            return True
+        self._file = open(self.path, 'a+b')
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._try_lock():
+            if deadline is not None and time.monotonic() >= deadline:
+                self._file.close()
+                self._file = None
+                return False
+            time.sleep(poll_interval)
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            if os.name == 'nt':
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        except OSError:
+            pass
+        finally:
+            self._file.close()
+            self._file = None
+
+    @property
+    def locked(self):
+        return self._file is not None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
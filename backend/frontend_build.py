@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Helpers for serving the production React build (`npm run build`) from the backend.
+Precompresses the build output into .gz/.br siblings and picks the best
+variant for a request's Accept-Encoding.
+
+Usage:
+    python frontend_build.py [path/to/build]
+"""
+
+import gzip
+import os
+import re
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Brotli is optional - gzip variants are always produced
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Default location of the React build output (portable_app/build)
+DEFAULT_BUILD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'build')
+
+# File types worth compressing (images/audio are already compressed)
+COMPRESSIBLE_EXTENSIONS = {'.html', '.js', '.css', '.json', '.map', '.svg', '.txt', '.ico', '.xml'}
+MIN_COMPRESS_SIZE = 1024
+
+# CRA emits content-hashed names like main.3f2a9c1b.js / 787.1a2b3c4d.chunk.css
+HASHED_ASSET_PATTERN = re.compile(r'\.[0-9a-f]{8,}\.(?:chunk\.)?[A-Za-z0-9]+$')
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+
+def is_hashed_asset(relative_path):
+    """True for content-hashed build assets that can be cached forever"""
+    return HASHED_ASSET_PATTERN.search(os.path.basename(relative_path)) is not None
+
+
+def choose_encoded_variant(file_path, accept_encoding):
+    """
+    Pick the best precompressed variant of file_path the client accepts.
+
+    Returns:
+        (path_to_send, content_encoding or None)
+    """
+    accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.isfile(file_path + suffix):
+            return file_path + suffix, encoding
+    return file_path, None
+
+
+def _write_if_smaller(path, data, original_size):
+    """Write a compressed variant only if it actually saves space"""
+    if len(data) >= original_size:
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def precompress_build(build_folder=DEFAULT_BUILD_FOLDER):
+    """
+    Create .gz (and .br when brotli is installed) variants for the build output.
+    Variants newer than their source are left untouched.
+
+    Returns:
+        Dict with counts of compressed/skipped files
+    """
+    stats = {'gzip': 0, 'br': 0, 'skipped': 0}
+    if not os.path.isdir(build_folder):
+        logger.warning(f"Build folder not found: {build_folder}")
+        return stats
+
+    for root, _, files in os.walk(build_folder):
+        for name in files:
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            source_stat = os.stat(path)
+            if source_stat.st_size < MIN_COMPRESS_SIZE:
+                stats['skipped'] += 1
+                continue
+
+            data = None
+            for encoding, suffix in ENCODINGS:
+                if encoding == 'br' and not BROTLI_AVAILABLE:
+                    continue
+                variant = path + suffix
+                if os.path.exists(variant) and os.path.getmtime(variant) >= source_stat.st_mtime:
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                if encoding == 'br':
+                    compressed = brotli.compress(data, quality=11)
+                else:
+                    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                if _write_if_smaller(variant, compressed, source_stat.st_size):
+                    stats[encoding] += 1
+
+    logger.info(f"Precompressed build output in {build_folder}: {stats}")
+    return stats
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    folder = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_BUILD_FOLDER
+    result = precompress_build(folder)
+    print(f"✅ Precompressed build: {result['gzip']} gzip, {result['br']} brotli, {result['skipped']} skipped")
+    if not BROTLI_AVAILABLE:
+        print("💡 Install the 'brotli' package to also produce .br variants")
@@ -0,0 +1,402 @@
+# Rules applied
+"""
+In-process scheduler backend: fires ringtones from a timer thread in the server.
+
+For machines without an OS scheduler (Linux, CI) or when schtasks is not
+wanted. Tasks are weekly (HH:MM on a set of weekdays) like the Windows backend.
+
+Engine:
+    - a min-heap of (next fire time, sequence, task name); creating or
+      re-scheduling a task is one O(log n) push
+    - cancelling is O(1): the task's live sequence number is dropped and its
+      heap entry is skipped when it surfaces (the heap is compacted once most
+      entries are stale)
+    - the timer thread sleeps on the monotonic clock, but never longer than
+      CHECK_INTERVAL before reading the wall clock again, so clock drift,
+      DST and clock changes are corrected before the next fire; a wall clock
+      jump (suspend/resume, manual change) recomputes all fire times
+    - fires that are late by more than MISFIRE_GRACE (machine asleep, server
+      down) are skipped and recorded as missed
+    - tasks and their next fire times are persisted (debounced, atomic) in
+      inprocess_tasks.json, so a restart resumes where it stopped
+
+Firing spawns play_ringtone.py exactly like the scheduled task would.
+"""
+
+import atexit
+import heapq
+import itertools
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time as time_module
+from datetime import datetime, time as dtime, timedelta
+from typing import Dict, List, Optional
+
+from file_lock import InterProcessLock
+from schedulerBackend import SchedulerBackend
+from task_xml import task_triggers
+from taskSchedulerService import TASK_PREFIX
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(BACKEND_DIR, 'inprocess_tasks.json')
+ENGINE_LOCK_FILE = os.path.join(BACKEND_DIR, 'inprocess_scheduler.lock')
+
+# Longest sleep before the wall clock is read again (seconds)
+CHECK_INTERVAL = 30.0
+# A fire this late still plays (seconds)
+MISFIRE_GRACE = 120.0
+# Wall clock vs monotonic clock disagreement treated as a clock jump (seconds)
+CLOCK_JUMP_THRESHOLD = 5.0
+# Debounce for persisting task changes (seconds)
+SAVE_DELAY = 0.5
+# Grace for a still-ringing player to exit before it is killed (seconds)
+PLAYER_STOP_TIMEOUT = 2.0
+
+
+def next_fire_time(time: str, days: List[int], after: datetime) -> Optional[datetime]:
+    """
+    First local datetime strictly after `after` at HH:MM on one of `days`
+    (0=Sunday ... 6=Saturday; an empty list means every day).
+    """
+    hours, minutes = (int(part) for part in time.split(':')[:2])
+    allowed = set(days) if days else set(range(7))
+    for offset in range(8):
+        candidate = datetime.combine(after.date() + timedelta(days=offset), dtime(hours, minutes))
+        # datetime.weekday() is 0=Monday; schedules use 0=Sunday
+        if candidate > after and (candidate.weekday() + 1) % 7 in allowed:
+            return candidate
+    return None
+
+
+class InProcessSchedulerService(SchedulerBackend):
+    """Timer-heap scheduler that plays ringtones from the server process"""
+
+    name = "inprocess"
+
+    def __init__(self, state_file: str = STATE_FILE, python_exe: Optional[str] = None):
+        self.state_file = state_file
+        self.python_exe = python_exe or sys.executable
+        self.ringtone_player_script = os.path.join(BACKEND_DIR, "play_ringtone.py")
+
+        self._tasks: Dict[str, Dict] = {}
+        self._heap = []
+        # task name -> sequence number of its live heap entry
+        self._scheduled: Dict[str, int] = {}
+        self._stale_entries = 0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._players: Dict[str, subprocess.Popen] = {}
+
+        self._thread = None
+        self._stopping = False
+        self._engine_lock = None
+        self._save_timer = None
+        self._dirty = False
+
+        self._load()
+        atexit.register(self.save)
+
+    # ------------------------------------------------------------------
+    # Heap maintenance (callers hold self._condition)
+    # ------------------------------------------------------------------
+
+    def _push(self, task_name: str, fire_at: float):
+        if task_name in self._scheduled:
+            self._stale_entries += 1
+        sequence = next(self._sequence)
+        self._scheduled[task_name] = sequence
+        heapq.heappush(self._heap, (fire_at, sequence, task_name))
+        self._tasks[task_name]['next_fire'] = fire_at
+        if self._heap[0][1] == sequence:
+            # New earliest fire: wake the timer thread so it does not oversleep
+            self._condition.notify()
+
+    def _cancel(self, task_name: str):
+        if self._scheduled.pop(task_name, None) is not None:
+            self._stale_entries += 1
+        task = self._tasks.get(task_name)
+        if task:
+            task['next_fire'] = None
+        if self._stale_entries > 64 and self._stale_entries > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if self._scheduled.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+            self._stale_entries = 0
+
+    def _schedule_next(self, task_name: str, after: datetime):
+        task = self._tasks[task_name]
+        if not task['enabled']:
+            self._cancel(task_name)
+            return
+        fire_at = next_fire_time(task['time'], task['days'], after)
+        if fire_at is None:
+            self._cancel(task_name)
+        else:
+            self._push(task_name, fire_at.timestamp())
+
+    def _reschedule_all(self, after: datetime):
+        self._heap = []
+        self._scheduled = {}
+        self._stale_entries = 0
+        for task_name in self._tasks:
+            self._schedule_next(task_name, after)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                stored = json.load(f).get('tasks', {})
+        except (OSError, ValueError):
+            stored = {}
+
+        now = time_module.time()
+        with self._condition:
+            for task_name, task in stored.items():
+                self._tasks[task_name] = task
+                next_fire = task.get('next_fire')
+                if task.get('enabled') and next_fire and next_fire > now - MISFIRE_GRACE:
+                    # Resume the pending fire (plays right away if it fell due while we were down)
+                    self._push(task_name, next_fire)
+                else:
+                    self._schedule_next(task_name, datetime.now())
+        if stored:
+            logger.info(f"📋 Loaded {len(stored)} in-process scheduled tasks")
+
+    def _save_later(self):
+        """Persist soon; bursts of changes are written once"""
+        with self._condition:
+            self._dirty = True
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(SAVE_DELAY, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        with self._condition:
+            self._save_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            payload = json.dumps({'tasks': self._tasks}, separators=(',', ':'))
+        tmp_file = self.state_file + '.tmp'
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_file, self.state_file)
+        except OSError as e:
+            logger.error(f"❌ Error saving in-process tasks: {e}")
+
+    # ------------------------------------------------------------------
+    # Timer thread
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the timer thread (one engine per machine fires the tasks)"""
+        if self._thread is not None:
+            return
+        self._engine_lock = InterProcessLock(ENGINE_LOCK_FILE)
+        if not self._engine_lock.acquire(timeout=0):
+            logger.warning("⚠️ Another process runs the in-process scheduler; tasks will not fire from this one")
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='inprocess-scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"✅ In-process scheduler started with {len(self._scheduled)} pending tasks")
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._engine_lock is not None:
+            self._engine_lock.release()
+        self.save()
+
+    def _run(self):
+        last_wall, last_monotonic = time_module.time(), time_module.monotonic()
+        with self._condition:
+            while not self._stopping:
+                now, now_monotonic = time_module.time(), time_module.monotonic()
+                jump = (now - last_wall) - (now_monotonic - last_monotonic)
+                if abs(jump) > CLOCK_JUMP_THRESHOLD:
+                    logger.info(f"🕒 Wall clock jumped {jump:+.0f}s, recomputing fire times")
+                    # Fires that fell into a forward jump stay due (and hit the misfire check)
+                    self._reschedule_all(datetime.fromtimestamp(min(now, last_wall)))
+                last_wall, last_monotonic = now, now_monotonic
+
+                self._fire_due(now)
+                self._reap_players()
+
+                # Sleep on the monotonic clock, but re-read the wall clock at least every CHECK_INTERVAL
+                timeout = CHECK_INTERVAL
+                if self._heap:
+                    timeout = max(0.0, min(timeout, self._heap[0][0] - time_module.time()))
+                if self._players:
+                    timeout = min(timeout, 1.0)
+                self._condition.wait(timeout)
+
+    def _fire_due(self, now: float):
+        changed = False
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, sequence, task_name = heapq.heappop(self._heap)
+            if self._scheduled.get(task_name) != sequence:
+                self._stale_entries = max(0, self._stale_entries - 1)
+                continue
+            del self._scheduled[task_name]
+            task = self._tasks[task_name]
+
+            lateness = now - fire_at
+            if lateness <= MISFIRE_GRACE:
+                self._fire(task_name, task, fire_at)
+            else:
+                logger.warning(f"⚠️ Missed {TASK_PREFIX}{task_name} by {lateness:.0f}s, skipping")
+                task['last_run'] = fire_at
+                task['last_result'] = 'missed'
+            self._schedule_next(task_name, datetime.fromtimestamp(max(now, fire_at)))
+            changed = True
+        if changed:
+            self._save_later()
+
+    def _stop_player(self, task_name: str):
+        """Stop and reap a player of `task_name` that is still ringing"""
+        process = self._players.pop(task_name, None)
+        if process is None or process.poll() is not None:
+            return
+        logger.warning(f"⚠️ {TASK_PREFIX}{task_name} is still playing, stopping it before firing again")
+        process.terminate()
+        try:
+            process.wait(timeout=PLAYER_STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def _fire(self, task_name: str, task: Dict, fire_at: float):
+        self._stop_player(task_name)
+        scheduled = datetime.fromtimestamp(fire_at).isoformat(timespec='seconds')
+        popen_kwargs = {}
+        if os.name == 'nt':
+            popen_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+        else:
+            popen_kwargs['start_new_session'] = True
+        try:
+            self._players[task_name] = subprocess.Popen(
+                [self.python_exe, self.ringtone_player_script, task['ringtone_path'], '--scheduled-time', scheduled],
+                cwd=BACKEND_DIR, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                **popen_kwargs
+            )
+            task['last_result'] = 'running'
+            logger.info(f"🔔 Fired {TASK_PREFIX}{task_name} (scheduled {scheduled})")
+        except OSError as e:
+            task['last_result'] = f'error: {e}'
+            logger.error(f"❌ Could not start player for {TASK_PREFIX}{task_name}: {e}")
+        task['last_run'] = fire_at
+
+    def _reap_players(self):
+        for task_name, process in list(self._players.items()):
+            returncode = process.poll()
+            if returncode is None:
+                continue
+            del self._players[task_name]
+            task = self._tasks.get(task_name)
+            if task:
+                task['last_result'] = returncode
+                self._save_later()
+
+    # ------------------------------------------------------------------
+    # SchedulerBackend
+    # ------------------------------------------------------------------
+
+    def create_scheduled_task(self, task_name: str, ringtone_path: str, time: str, days: List[int]) -> bool:
+        try:
+            ((time, days, _enabled),) = task_triggers([{'time': time, 'days': days}])
+        except (ValueError, TypeError) as e:
+            logger.error(f"❌ Invalid schedule for {task_name}: {e}")
+            return False
+        with self._condition:
+            previous = self._tasks.get(task_name, {})
+            self._tasks[task_name] = {
+                'ringtone_path': ringtone_path,
+                'time': time,
+                'days': list(days),
+                'enabled': True,
+                'next_fire': None,
+                'last_run': previous.get('last_run'),
+                'last_result': previous.get('last_result'),
+            }
+            self._schedule_next(task_name, datetime.now())
+        self._save_later()
+        logger.info(f"✅ Created in-process scheduled task: {task_name}")
+        return True
+
+    def delete_scheduled_task(self, task_name: str) -> bool:
+        with self._condition:
+            if task_name not in self._tasks:
+                return False
+            self._cancel(task_name)
+            del self._tasks[task_name]
+        self._save_later()
+        logger.info(f"✅ Deleted in-process scheduled task: {task_name}")
+        return True
+
+    def _set_enabled(self, task_name: str, enabled: bool) -> bool:
+        with self._condition:
+            task = self._tasks.get(task_name)
+            if task is None:
+                return False
+            task['enabled'] = enabled
+            self._schedule_next(task_name, datetime.now())
+        self._save_later()
+        return True
+
+    def enable_scheduled_task(self, task_name: str) -> bool:
+        return self._set_enabled(task_name, True)
+
+    def disable_scheduled_task(self, task_name: str) -> bool:
+        return self._set_enabled(task_name, False)
+
+    def _describe(self, task_name: str, task: Dict) -> Dict:
+        def local_time(timestamp):
+            return datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else None
+
+        process = self._players.get(task_name)
+        if process is not None and process.poll() is None:
+            status = "Running"
+        elif not task['enabled']:
+            status = "Disabled"
+        else:
+            status = "Ready"
+        return {
+            "name": task_name,
+            "full_name": f"{TASK_PREFIX}{task_name}",
+            "status": status,
+            "enabled": task['enabled'],
+            "time": task['time'],
+            "days": task['days'],
+            "next_run": local_time(task.get('next_fire')),
+            "last_run": local_time(task.get('last_run')),
+            "last_result": task.get('last_result'),
+            "task_to_run": f'"{self.python_exe}" "{self.ringtone_player_script}" "{task["ringtone_path"]}"',
+        }
+
+    def get_task_status(self, task_name: str) -> Optional[str]:
+        with self._condition:
+            task = self._tasks.get(task_name)
+            return self._describe(task_name, task)['status'] if task else None
+
+    def list_all_tasks(self, refresh: bool = False) -> List[Dict]:
+        with self._condition:
+            return [self._describe(task_name, task) for task_name, task in sorted(self._tasks.items())]
+
+    def player_command(self, ringtone_path: str) -> List[str]:
+        return [self.python_exe, self.ringtone_player_script, ringtone_path]
@@ -30,6 +30,8 @@ def setup_local_packages():
     # Extract wheel files if needed
     extracted_packages = []
     for wheel_file in PACKAGES_DIR.glob("*.whl"):
+        if not wheel_is_compatible(wheel_file):
+            continue
         try:
             # Extract wheel to a temporary directory
             with zipfile.ZipFile(wheel_file, 'r') as wheel:
@@ -52,6 +54,18 @@ def setup_local_packages():
     
     return True
 
+def wheel_is_compatible(wheel_file):
+    """
+    Rough wheel tag check: pure wheels always, binary wheels only on their
+    OS family and (unless abi3) the CPython version they were built for
+    """
+    python_tag, abi_tag, platform_tag = Path(wheel_file).stem.split('-')[-3:]
+    if platform_tag == 'any':
+        return True
+    if platform_tag.startswith('win') != (os.name == 'nt'):
+        return False
+    return abi_tag == 'abi3' or python_tag == f"cp{sys.version_info.major}{sys.version_info.minor}"
+
 def safe_import(module_name, package_name=None, fallback_import=None):
     """
     Safely import a module with fallback to local packages
@@ -116,7 +130,8 @@ def import_required_packages():
         'requests': 'requests',
         'dateutil': 'python_dateutil',
         'psutil': 'psutil',
-        'werkzeug': 'werkzeug'
+        'werkzeug': 'werkzeug',
+        'numpy': 'numpy'
     }
     
     imported_packages = {}
@@ -2,11 +2,21 @@
 """
 Python script to play ringtone files using pygame or system audio.
 This script is called by Windows Task Scheduler to play scheduled ringtones.
+
+Usage:
+    python play_ringtone.py <ringtone_path> [--verbose] [--scheduled-time HH:MM[,HH:MM...]]
 """
 
 import sys
 import os
 import time
+
+# Taken before anything else so telemetry can separate import cost from playback
+SCRIPT_START = time.time()
+
+import json
+import socket
+import argparse
 import logging
 from pathlib import Path
 
@@ -35,16 +45,67 @@ except PermissionError:
     )
 logger = logging.getLogger(__name__)
 
-def play_ringtone_with_pygame(ringtone_path):
-    """Play ringtone using pygame (preferred method)"""
+# Test playback started from the UI (--test): not counted in stats or latency telemetry
+TEST_RUN = False
+
+def record_playback_stat(name, **details):
+    """Count a playback outcome unless this is a test playback"""
+    if not TEST_RUN:
+        from playback_coordinator import record_stat
+        record_stat(name, **details)
+
+def mark(timer, name):
+    """Record a telemetry timestamp if telemetry is enabled for this run"""
+    if timer is not None:
+        timer.mark(name)
+
+def play_ringtone_with_daemon(ringtone_path, timer=None):
+    """Play ringtone through the resident playback daemon (mixer already open, sound cached)"""
+    try:
+        from playback_daemon import PLAYBACK_DAEMON_HOST, PLAYBACK_DAEMON_PORT, CONNECT_TIMEOUT, read_token
+        sock = socket.create_connection((PLAYBACK_DAEMON_HOST, PLAYBACK_DAEMON_PORT), timeout=CONNECT_TIMEOUT)
+    except (ImportError, OSError):
+        logger.info("Playback daemon not running, playing in-process")
+        return False
+    
+    # The daemon's mixer is already open
+    mark(timer, 'mixer_ready')
+    try:
+        with sock, sock.makefile('rb') as reader:
+            request = {'cmd': 'play', 'path': os.path.abspath(ringtone_path), 'token': read_token()}
+            sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+            
+            # Stay connected until the sound finished (disconnecting stops it)
+            sock.settimeout(None)
+            started = json.loads(reader.readline().decode('utf-8') or '{}')
+            if not started.get('ok'):
+                logger.warning(f"Playback daemon could not play ringtone: {started.get('error')}")
+                return False
+            mark(timer, 'first_buffer')
+            if started.get('active', 1) > 1:
+                # Overlapping alarm: mixed with the ones already playing
+                record_playback_stat('mixed', ringtone=os.path.basename(ringtone_path), active=started['active'])
+            finished = json.loads(reader.readline().decode('utf-8') or '{}')
+        
+        logger.info(f"Successfully played ringtone with playback daemon: {ringtone_path}")
+        return finished.get('event') == 'finished'
+        
+    except (OSError, ValueError) as e:
+        logger.error(f"Error playing ringtone with playback daemon: {e}")
+        return False
+
+def play_ringtone_with_pygame(ringtone_path, timer=None):
+    """Play ringtone using pygame (portable fallback)"""
     try:
         import os
         import sys
         
         # Set environment variables BEFORE importing pygame to suppress messages and windows
-        os.environ['SDL_VIDEODRIVER'] = 'dummy'
-        os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
-        os.environ['SDL_AUDIODRIVER'] = 'directsound'  # Use DirectSound for Windows
+        # (setdefault: an explicit SDL_AUDIODRIVER such as 'dummy' for headless benchmarks wins)
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+        if os.name == 'nt':
+            os.environ.setdefault('SDL_AUDIODRIVER', 'directsound')  # Use DirectSound for Windows
         
         # Redirect stdout and stderr BEFORE importing pygame
         original_stdout = sys.stdout
@@ -54,22 +115,32 @@ def play_ringtone_with_pygame(ringtone_path):
         
         try:
             import pygame
+            from playback_renditions import MIXER_BUFFER, MIXER_CHANNELS, MIXER_FREQUENCY, MIXER_SIZE, is_mixer_format
             
             # Initialize pygame with no display and no video
-            pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=512)
+            pygame.mixer.pre_init(frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
             pygame.mixer.init()
+            mark(timer, 'mixer_ready')
             
             # Ensure no display is initialized
             if not pygame.display.get_init():
                 pygame.display.init()
                 pygame.display.quit()  # Immediately quit display
             
-            pygame.mixer.music.load(ringtone_path)
-            pygame.mixer.music.play()
-            
-            # Wait for the music to finish playing
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
+            if is_mixer_format(ringtone_path):
+                # Playback rendition: load the PCM as-is, no decode or resampling
+                channel = pygame.mixer.Sound(ringtone_path).play()
+                mark(timer, 'first_buffer')
+                while channel.get_busy():
+                    time.sleep(0.05)
+            else:
+                pygame.mixer.music.load(ringtone_path)
+                pygame.mixer.music.play()
+                mark(timer, 'first_buffer')
+                
+                # Wait for the music to finish playing
+                while pygame.mixer.music.get_busy():
+                    time.sleep(0.1)
             pygame.mixer.quit()
         finally:
             # Restore stdout and stderr
@@ -88,7 +159,7 @@ def play_ringtone_with_pygame(ringtone_path):
         logger.error(f"Error playing ringtone with pygame: {e}")
         return False
 
-def play_ringtone_with_winsound(ringtone_path):
+def play_ringtone_with_winsound(ringtone_path, timer=None):
     """Play ringtone using winsound (Windows only, WAV files only)"""
     try:
         import winsound
@@ -98,6 +169,10 @@ def play_ringtone_with_winsound(ringtone_path):
             logger.warning("⚠️ winsound only supports WAV files")
             return False
             
+        # winsound opens the device inside PlaySound; both marks are taken just before it
+        mark(timer, 'mixer_ready')
+        mark(timer, 'first_buffer')
+        
         # Play the sound synchronously (blocking)
         winsound.PlaySound(ringtone_path, winsound.SND_FILENAME)
         
@@ -111,7 +186,7 @@ def play_ringtone_with_winsound(ringtone_path):
         logger.error(f"Error playing ringtone with winsound: {e}")
         return False
 
-def play_ringtone_with_system(ringtone_path):
+def play_ringtone_with_system(ringtone_path, timer=None):
     """Play ringtone using system command (fallback method)"""
     try:
         import subprocess
@@ -120,10 +195,11 @@ def play_ringtone_with_system(ringtone_path):
         if os.name == 'nt':  # Windows
             # Use Windows Media Player
             cmd = ['wmplayer', '/play', '/close', ringtone_path]
-        else:  # Linux/Mac
-            # Try common audio players
-            for player in ['aplay', 'paplay', 'afplay']:
+        else:  # macOS (Linux uses the pulse/alsa backends)
+            for player in ['afplay']:
                 try:
+                    mark(timer, 'mixer_ready')
+                    mark(timer, 'first_buffer')
                     subprocess.run([player, ringtone_path], check=True, timeout=30)
                     logger.info(f"Successfully played ringtone with {player}: {ringtone_path}")
                     return True
@@ -137,35 +213,122 @@ def play_ringtone_with_system(ringtone_path):
         logger.error(f"Error playing ringtone with system command: {e}")
         return False
 
-def main():
-    """Main function to play ringtone"""
-    # Check if running in verbose mode (default is silent mode)
-    verbose_mode = len(sys.argv) > 2 and sys.argv[2] == '--verbose'
-    silent_mode = not verbose_mode
-    
-    # Create a lock file to prevent multiple instances
-    lock_file = os.path.join(os.path.dirname(__file__), 'play_ringtone.lock')
+# Linux players: (command for a WAV file, command for raw PCM on stdin)
+LINUX_PLAYERS = {
+    'pulse': (['paplay'], ['paplay', '--raw', '--format=s16le']),
+    'alsa': (['aplay', '-q'], ['aplay', '-q', '-t', 'raw', '-f', 'S16_LE']),
+}
+# Upper bound for one ringtone played through a Linux player (seconds)
+MAX_PLAYBACK_SECONDS = 600
+
+def play_ringtone_with_linux_audio(player_name, ringtone_path, timer=None):
+    """
+    Play ringtone through PulseAudio (paplay) or ALSA (aplay).
+    WAV files are handed to the player directly; other formats are decoded by
+    FFmpeg and piped to the player as raw PCM.
+    """
+    import shutil
+    import subprocess
+    from playback_renditions import MIXER_CHANNELS, MIXER_FREQUENCY
     
-    # Check if another instance is already running
-    if os.path.exists(lock_file):
-        try:
-            # Check if the lock file is recent (less than 30 seconds old)
-            lock_age = time.time() - os.path.getmtime(lock_file)
-            if lock_age < 30:
-                logger.error("Another instance of the script is already running")
-                sys.exit(1)
+    file_command, raw_command = LINUX_PLAYERS[player_name]
+    processes = []
+    try:
+        if ringtone_path.lower().endswith('.wav'):
+            player = subprocess.Popen(file_command + [ringtone_path],
+                                      stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        else:
+            ffmpeg = shutil.which('ffmpeg')
+            if not ffmpeg:
+                logger.warning(f"FFmpeg not found, {player_name} can only play WAV files")
+                return False
+            decoder = subprocess.Popen(
+                [ffmpeg, '-v', 'error', '-nostdin', '-i', ringtone_path, '-vn',
+                 '-f', 's16le', '-ar', str(MIXER_FREQUENCY), '-ac', str(MIXER_CHANNELS), '-'],
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+            processes.append(decoder)
+            if player_name == 'pulse':
+                pcm_format = [f'--rate={MIXER_FREQUENCY}', f'--channels={MIXER_CHANNELS}']
             else:
-                # Remove stale lock file
-                os.remove(lock_file)
-        except:
-            pass
+                pcm_format = ['-r', str(MIXER_FREQUENCY), '-c', str(MIXER_CHANNELS)]
+            player = subprocess.Popen(raw_command + pcm_format,
+                                      stdin=decoder.stdout, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            # The player owns the read end of the pipe now
+            decoder.stdout.close()
+        processes.append(player)
+        
+        # The player opens the device right after spawning; no finer signal is available
+        mark(timer, 'mixer_ready')
+        mark(timer, 'first_buffer')
+        
+        try:
+            _, error = player.communicate(timeout=MAX_PLAYBACK_SECONDS)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Stopped {player_name} playback after {MAX_PLAYBACK_SECONDS}s: {ringtone_path}")
+            return True
+        if player.returncode != 0:
+            logger.warning(f"{player_name} playback failed: {error.decode('utf-8', 'replace').strip()}")
+            return False
+        
+        logger.info(f"Successfully played ringtone with {player_name}: {ringtone_path}")
+        return True
+        
+    except OSError as e:
+        logger.error(f"Error playing ringtone with {player_name}: {e}")
+        return False
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+def build_backend_registry():
+    """In-process playback backends in order of preference"""
+    from playback_backends import PlaybackBackendRegistry, commands_available
+    
+    def linux_player_available(command):
+        return lambda fmt: commands_available(command) and (fmt == '.wav' or commands_available('ffmpeg'))
+    
+    registry = PlaybackBackendRegistry()
+    # winsound for Windows (no windows, more reliable)
+    registry.register('winsound', play_ringtone_with_winsound, platforms=['win32'], available=lambda fmt: fmt == '.wav')
+    registry.register('pulse', lambda path, timer=None: play_ringtone_with_linux_audio('pulse', path, timer),
+                      platforms=['linux'], available=linux_player_available('paplay'))
+    registry.register('alsa', lambda path, timer=None: play_ringtone_with_linux_audio('alsa', path, timer),
+                      platforms=['linux'], available=linux_player_available('aplay'))
+    registry.register('pygame', play_ringtone_with_pygame)
+    registry.register('system', play_ringtone_with_system, platforms=['win32', 'darwin'])
+    return registry
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Play a ringtone file')
+    parser.add_argument('ringtone_path', help='Path to the ringtone file')
+    parser.add_argument('--verbose', action='store_true', help='Log every playback step')
+    parser.add_argument('--scheduled-time', help='Scheduled fire time (HH:MM, comma-separated HH:MM list or ISO timestamp) for latency telemetry')
+    parser.add_argument('--test', action='store_true', help='Test playback: no stats or telemetry, fail at once if another ringtone is playing')
+    return parser.parse_args(argv)
+
+def main():
+    """Main function to play ringtone"""
+    global TEST_RUN
+    args = parse_args()
+    TEST_RUN = args.test
+    # Silent mode is the default
+    silent_mode = not args.verbose
     
-    # Create lock file
     try:
-        with open(lock_file, 'w') as f:
-            f.write(str(os.getpid()))
-    except:
-        pass
+        from playback_telemetry import PlaybackTimer, parse_scheduled_time
+        timer = None if TEST_RUN else PlaybackTimer(parse_scheduled_time(args.scheduled_time), script_start=SCRIPT_START)
+    except ImportError:
+        timer = None
+    
+    # In-process playback is serialized across processes (real OS lock, bounded wait);
+    # the daemon mixes overlapping alarms itself and needs no slot
+    # (a test playback never queues behind a real alarm)
+    from playback_coordinator import PlaybackSlot, QUEUE_MAX_WAIT
+    from playback_backends import file_format
+    slot = None
     
     try:
         if not silent_mode:
@@ -173,49 +336,82 @@ def main():
             logger.info("RINGTONE PLAYBACK SCRIPT STARTED")
             logger.info("=" * 60)
         
-        if len(sys.argv) < 2:
-            logger.error("Usage: python play_ringtone.py <ringtone_path> [--verbose]")
-            sys.exit(1)
-        
-        ringtone_path = sys.argv[1]
+        ringtone_path = args.ringtone_path
+        ringtone_name = os.path.basename(ringtone_path)
         
         # Validate file exists
         if not os.path.exists(ringtone_path):
             logger.error(f"Ringtone file not found: {ringtone_path}")
             sys.exit(1)
         
+        # Prefer the pre-decoded rendition created with the schedule
+        try:
+            from playback_renditions import find_rendition
+            playback_path = find_rendition(ringtone_path) or ringtone_path
+        except ImportError:
+            playback_path = ringtone_path
+        if playback_path != ringtone_path and not silent_mode:
+            logger.info(f"Using playback rendition: {playback_path}")
+        ringtone_path = playback_path
+        
         if not silent_mode:
             logger.info(f"Attempting to play ringtone: {ringtone_path}")
             logger.info(f"File size: {os.path.getsize(ringtone_path)} bytes")
             logger.info(f"File extension: {os.path.splitext(ringtone_path)[1]}")
         
-        # Try different methods in order of preference
-        # Use winsound first for Windows (no windows, more reliable)
-        methods = [
-            ("winsound", play_ringtone_with_winsound),
-            ("pygame", play_ringtone_with_pygame),
-            ("system", play_ringtone_with_system)
-        ]
+        # The resident daemon first (no startup cost), then the in-process backends:
+        # the one that worked last time for this format, or a one-time probe in order of preference
+        registry = build_backend_registry()
+        cached_backend = registry.cached_backend(file_format(ringtone_path))
+        methods = [("daemon", play_ringtone_with_daemon)]
+        methods += [(backend.name, backend.play) for backend in registry.candidates(ringtone_path)]
         
         for method_name, method_func in methods:
+            if method_name != "daemon" and slot is None:
+                slot = PlaybackSlot(max_wait=0 if TEST_RUN else QUEUE_MAX_WAIT)
+                if not slot.acquire():
+                    if TEST_RUN:
+                        logger.error("Test playback skipped: another ringtone is playing")
+                        sys.exit(1)
+                    logger.error(f"Dropped ringtone: another ringtone kept playing for more than {slot.max_wait}s")
+                    record_playback_stat('dropped', ringtone=ringtone_name)
+                    if timer:
+                        timer.record(args.ringtone_path, None, False)
+                    sys.exit(1)
+                if slot.status == 'queued':
+                    logger.info(f"Waited {slot.waited:.1f}s for the previous ringtone to finish")
+                    record_playback_stat('queued', ringtone=ringtone_name, waited=round(slot.waited, 3))
+            
             if not silent_mode:
                 logger.info(f"Trying {method_name} method...")
-            if method_func(ringtone_path):
+            if method_func(ringtone_path, timer):
                 if not silent_mode:
                     logger.info(f"Successfully played ringtone using {method_name}")
+                if method_name != "daemon" and method_name != cached_backend:
+                    registry.record_success(ringtone_path, method_name)
+                record_playback_stat('played', ringtone=ringtone_name, backend=method_name)
+                if timer:
+                    timer.mark('finished')
+                    timer.record(args.ringtone_path, method_name, True)
                 sys.exit(0)
+            if method_name != "daemon":
+                registry.record_failure(ringtone_path, method_name)
+            if timer:
+                # Marks of a failed backend must not count for the next one
+                timer.reset('mixer_ready', 'first_buffer')
         
         # If all methods failed
         logger.error("All playback methods failed")
+        # The audio setup may change (device plugged in, driver installed): probe again next time
+        registry.forget(ringtone_path)
+        record_playback_stat('failed', ringtone=ringtone_name)
+        if timer:
+            timer.record(args.ringtone_path, None, False)
         sys.exit(1)
         
     finally:
-        # Clean up lock file
-        try:
-            if os.path.exists(lock_file):
-                os.remove(lock_file)
-        except:
-            pass
+        if slot is not None:
+            slot.release()
 
 if __name__ == "__main__":
     main()
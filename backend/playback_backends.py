@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Playback backend registry with cached capability probing.
+
+Each in-process playback backend (winsound, PulseAudio, ALSA, pygame, system
+player) is registered with the platforms it runs on and an availability
+check. The first alarm for a file format tries the available backends in
+order; the one that worked (and the ones that failed) are persisted in
+playback_backends.json so later alarms go straight to the known-good backend.
+
+A cached backend that fails is invalidated and the next candidate is tried;
+a failed backend is skipped with an exponential backoff (one minute after the
+first failure, doubling up to a day), so a transient failure does not disable
+it for long. If every backend fails the format's entry is dropped so the next
+alarm probes again (e.g. after an audio device was plugged in). The cache is
+tied to the platform, Python executable and SDL audio driver, so a copied
+portable install probes afresh.
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+
+from file_lock import InterProcessLock
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_CACHE_FILE = os.path.join(BACKEND_DIR, 'playback_backends.json')
+
+# A backend that failed is skipped before it is probed again: FAILED_RETRY_BASE
+# after the first failure, doubling per consecutive failure up to FAILED_RETRY_MAX (seconds)
+FAILED_RETRY_BASE = 60
+FAILED_RETRY_MAX = 24 * 60 * 60
+
+
+def commands_available(*names):
+    """True if every command is on PATH"""
+    return all(shutil.which(name) for name in names)
+
+
+def file_format(path):
+    """Cache key for a file: its lower-case extension"""
+    return os.path.splitext(path)[1].lower() or '.unknown'
+
+
+def retry_delay(failures):
+    """Seconds a backend with `failures` consecutive failures is skipped"""
+    return min(FAILED_RETRY_BASE * 2 ** (max(failures, 1) - 1), FAILED_RETRY_MAX)
+
+
+def _failure(record):
+    """Failure record as {'count', 'at'} (older caches stored only the timestamp)"""
+    if isinstance(record, dict):
+        return record
+    return {'count': 1, 'at': record}
+
+
+def environment_fingerprint():
+    return '|'.join([sys.platform, sys.executable, os.environ.get('SDL_AUDIODRIVER', '')])
+
+
+class PlaybackBackend:
+    """
+    One way of playing a file.
+
+    play(path, timer) returns True once the sound was played.
+    available(file_format) is a cheap check (no audio is opened).
+    """
+
+    def __init__(self, name, play, platforms=None, available=None):
+        self.name = name
+        self.play = play
+        self.platforms = platforms
+        self._available = available
+
+    def is_available(self, fmt):
+        if self.platforms and not sys.platform.startswith(tuple(self.platforms)):
+            return False
+        return self._available is None or bool(self._available(fmt))
+
+
+class PlaybackBackendRegistry:
+    """Ordered backends plus the persisted probe results per file format"""
+
+    def __init__(self, cache_file=BACKEND_CACHE_FILE):
+        self.cache_file = cache_file
+        self.backends = []
+
+    def register(self, name, play, platforms=None, available=None):
+        self.backends.append(PlaybackBackend(name, play, platforms, available))
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        if cache.get('environment') != environment_fingerprint():
+            cache = {'environment': environment_fingerprint(), 'formats': {}}
+        cache.setdefault('formats', {})
+        return cache
+
+    def _update(self, fmt, change):
+        """Apply change(entry) to one format's entry and write the cache atomically"""
+        try:
+            with InterProcessLock(self.cache_file + '.lock'):
+                cache = self._load()
+                entry = cache['formats'].setdefault(fmt, {'backend': None, 'failed': {}})
+                change(entry)
+                if not entry.get('backend') and not entry.get('failed'):
+                    cache['formats'].pop(fmt, None)
+                tmp_file = self.cache_file + '.tmp'
+                with open(tmp_file, 'w') as f:
+                    json.dump(cache, f, indent=2)
+                os.replace(tmp_file, self.cache_file)
+        except OSError:
+            pass
+
+    def cached_backend(self, fmt):
+        return self._load()['formats'].get(fmt, {}).get('backend')
+
+    def candidates(self, path):
+        """
+        Backends to try for a file, best first: the cached working backend,
+        then available backends that have not failed recently.
+        """
+        fmt = file_format(path)
+        entry = self._load()['formats'].get(fmt, {})
+        now = time.time()
+        failed = {name for name, record in entry.get('failed', {}).items()
+                  if now - _failure(record)['at'] < retry_delay(_failure(record)['count'])}
+
+        ordered = [backend for backend in self.backends if backend.name == entry.get('backend')]
+        ordered += [backend for backend in self.backends
+                    if backend.name != entry.get('backend') and backend.name not in failed]
+        return [backend for backend in ordered if backend.is_available(fmt)]
+
+    def record_success(self, path, name):
+        def change(entry):
+            entry['backend'] = name
+            entry['failed'].pop(name, None)
+            entry['probed'] = round(time.time(), 3)
+        self._update(file_format(path), change)
+
+    def record_failure(self, path, name):
+        def change(entry):
+            if entry.get('backend') == name:
+                entry['backend'] = None
+            previous = _failure(entry['failed'].get(name, {'count': 0, 'at': 0}))
+            entry['failed'][name] = {'count': previous['count'] + 1, 'at': round(time.time(), 3)}
+        self._update(file_format(path), change)
+
+    def forget(self, path):
+        """Drop everything known about a format so the next run probes again"""
+        def change(entry):
+            entry['backend'] = None
+            entry['failed'] = {}
+        self._update(file_format(path), change)
+
+    def reset(self):
+        """Forget all probe results"""
+        try:
+            with InterProcessLock(self.cache_file + '.lock'):
+                if os.path.exists(self.cache_file):
+                    os.remove(self.cache_file)
+        except OSError:
+            pass
+
+    def describe(self):
+        """Cached probe results per format (for the API)"""
+        cache = self._load()
+        return {'platform': sys.platform, 'failed_retry_base': FAILED_RETRY_BASE,
+                'failed_retry_max': FAILED_RETRY_MAX, 'formats': cache['formats']}
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Coordination of overlapping alarms.
+
+With the playback daemon running, overlapping alarms are mixed on separate
+mixer channels. Without it, in-process playback is serialized with an
+inter-process lock: a second alarm waits (queued) up to QUEUE_MAX_WAIT
+seconds for the current one to finish instead of being dropped.
+
+Counters (played/mixed/queued/dropped) are kept in playback_stats.json and
+served by GET /api/playback/stats.
+"""
+
+import json
+import os
+import time
+
+from file_lock import InterProcessLock
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PLAYBACK_LOCK_FILE = os.path.join(BACKEND_DIR, 'play_ringtone.lock')
+STATS_FILE = os.path.join(BACKEND_DIR, 'playback_stats.json')
+STATS_LOCK_FILE = STATS_FILE + '.lock'
+
+# Longest an alarm waits for the one in front of it (seconds)
+QUEUE_MAX_WAIT = int(os.environ.get('RINGTONE_QUEUE_MAX_WAIT', '120'))
+
+STAT_NAMES = ('played', 'mixed', 'queued', 'dropped', 'failed')
+
+
+def load_stats():
+    """Current playback counters"""
+    try:
+        with open(STATS_FILE, 'r') as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        stats = {}
+    for name in STAT_NAMES:
+        stats.setdefault(name, 0)
+    return stats
+
+
+def record_stat(name, **details):
+    """Increment a counter (and remember when it last happened) under the stats lock"""
+    try:
+        with InterProcessLock(STATS_LOCK_FILE):
+            stats = load_stats()
+            stats[name] = stats.get(name, 0) + 1
+            stats[f'last_{name}'] = dict(details, at=round(time.time(), 3))
+            tmp_file = STATS_FILE + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(stats, f, indent=2)
+            os.replace(tmp_file, STATS_FILE)
+    except OSError:
+        pass
+
+
+class PlaybackSlot:
+    """
+    Exclusive in-process playback slot with a bounded wait.
+
+    After acquire(): `status` is 'immediate', 'queued' (had to wait) or
+    'dropped' (timed out; the caller must not play).
+    """
+
+    def __init__(self, max_wait=QUEUE_MAX_WAIT):
+        self.max_wait = max_wait
+        self.lock = InterProcessLock(PLAYBACK_LOCK_FILE)
+        self.status = None
+        self.waited = 0.0
+
+    def acquire(self):
+        if self.lock.acquire(timeout=0):
+            self.status = 'immediate'
+            return True
+        started = time.monotonic()
+        acquired = self.lock.acquire(timeout=self.max_wait)
+        self.waited = time.monotonic() - started
+        self.status = 'queued' if acquired else 'dropped'
+        return acquired
+
+    def release(self):
+        self.lock.release()
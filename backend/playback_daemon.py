@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Resident ringtone playback daemon.
+
+Keeps the pygame mixer open and decoded ringtones cached so a scheduled alarm
+only costs a small local IPC message instead of interpreter startup, pygame
+import, mixer init and decode. play_ringtone.py is the client and falls back
+to in-process playback when the daemon is not running.
+
+Protocol: JSON lines over TCP on 127.0.0.1:PLAYBACK_DAEMON_PORT.
+    {"cmd": "ping"}                 -> {"ok": true, "pid": ..., "cached": ...}
+    {"cmd": "play", "path": "..."}  -> {"ok": true, "event": "started", "length": seconds, "active": n}
+                                       ... {"ok": true, "event": "finished"}
+    {"cmd": "shutdown"}             -> {"ok": true}
+Every request carries "token": a random value generated at each daemon
+start and written to playback_daemon_<port>.token (readable by the user
+only); requests without it are refused. Only audio files can be played.
+A play request keeps its connection open until the sound finished; closing
+the connection early stops that sound.
+
+The server starts the daemon from the process that serves requests and
+stops it on exit; with --parent-pid the daemon also exits once that
+process is gone, so it never holds the port or audio device on its own.
+
+Usage:
+    python playback_daemon.py [--parent-pid PID]
+"""
+
+import argparse
+import hmac
+import json
+import logging
+import os
+import secrets
+import select
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from playback_renditions import MIXER_BUFFER, MIXER_CHANNELS, MIXER_FREQUENCY, MIXER_SIZE
+
+PLAYBACK_DAEMON_HOST = '127.0.0.1'
+PLAYBACK_DAEMON_PORT = int(os.environ.get('RINGTONE_PLAYBACK_PORT', '50505'))
+
+# Simultaneous sounds the daemon can mix
+MIXER_NUM_CHANNELS = 8
+# Decoded sounds kept in memory
+SOUND_CACHE_SIZE = 16
+
+CONNECT_TIMEOUT = 0.25
+
+PLAYABLE_EXTENSIONS = ('.wav', '.mp3', '.ogg')
+
+# How often a daemon started with --parent-pid checks that its server is still alive
+PARENT_CHECK_SECONDS = 2.0
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Daemon process started (and owned) by this process, see start_daemon/stop_daemon
+_owned_process = None
+_owned_lock = threading.Lock()
+
+log_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'playback_daemon.log')
+logger = logging.getLogger('playback_daemon')
+
+
+class SoundCache:
+    """LRU of decoded pygame Sound objects keyed by path (reloaded if the file changed)"""
+
+    def __init__(self, pygame_module, max_entries=SOUND_CACHE_SIZE):
+        self.pygame = pygame_module
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == mtime:
+                self._entries.move_to_end(path)
+                return entry[1]
+        # Decode outside the lock so other requests are not blocked
+        sound = self.pygame.mixer.Sound(path)
+        with self._lock:
+            self._entries[path] = (mtime, sound)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return sound
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class PlaybackRequestHandler(socketserver.StreamRequestHandler):
+    """Handles one client connection (one JSON request per line)"""
+
+    def send(self, payload):
+        self.wfile.write((json.dumps(payload) + '\n').encode('utf-8'))
+        self.wfile.flush()
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                message = json.loads(line.decode('utf-8'))
+            except ValueError:
+                self.send({'ok': False, 'error': 'Invalid JSON'})
+                continue
+            if not isinstance(message, dict) or not hmac.compare_digest(str(message.get('token', '')), self.server.token):
+                self.send({'ok': False, 'error': 'Invalid token'})
+                return
+
+            command = message.get('cmd')
+            if command == 'ping':
+                self.send({'ok': True, 'pid': os.getpid(), 'cached': len(self.server.sounds)})
+            elif command == 'play':
+                self.play(message.get('path', ''))
+                return
+            elif command == 'shutdown':
+                self.send({'ok': True})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            else:
+                self.send({'ok': False, 'error': f'Unknown command: {command}'})
+
+    def play(self, path):
+        if not str(path).lower().endswith(PLAYABLE_EXTENSIONS):
+            self.send({'ok': False, 'error': 'Only audio files can be played'})
+            return
+        if not os.path.isfile(path):
+            self.send({'ok': False, 'error': f'File not found: {path}'})
+            return
+        try:
+            sound = self.server.sounds.get(path)
+        except Exception as e:
+            self.send({'ok': False, 'error': f'Could not decode {path}: {e}'})
+            return
+
+        channel = self.server.pygame.mixer.find_channel()
+        if channel is None:
+            self.send({'ok': False, 'error': 'All mixer channels busy'})
+            return
+        channel.play(sound)
+        mixer = self.server.pygame.mixer
+        active = sum(1 for index in range(mixer.get_num_channels()) if mixer.Channel(index).get_busy())
+        self.send({'ok': True, 'event': 'started', 'length': sound.get_length(), 'active': active})
+        logger.info(f"Playing {path}")
+
+        # Wait for the end of the sound; a closed client connection stops it
+        while channel.get_busy():
+            readable, _, _ = select.select([self.connection], [], [], 0.05)
+            if readable and not self.client_connected():
+                channel.stop()
+                logger.info(f"Client disconnected, stopped {path}")
+                return
+        self.send({'ok': True, 'event': 'finished'})
+
+    def client_connected(self):
+        try:
+            return bool(self.connection.recv(1, socket.MSG_PEEK))
+        except OSError:
+            return False
+
+
+class PlaybackDaemon(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = os.name != 'nt'
+
+    def __init__(self, pygame_module, token, host=PLAYBACK_DAEMON_HOST, port=PLAYBACK_DAEMON_PORT):
+        super().__init__((host, port), PlaybackRequestHandler)
+        self.pygame = pygame_module
+        self.token = token
+        self.sounds = SoundCache(pygame_module)
+
+
+def token_file(port=PLAYBACK_DAEMON_PORT):
+    return os.path.join(BACKEND_DIR, f'playback_daemon_{port}.token')
+
+
+def read_token(port=PLAYBACK_DAEMON_PORT):
+    """Token of the daemon running on `port` ('' if none was written)"""
+    try:
+        with open(token_file(port), 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def _write_token(token, port):
+    """Write the token file readable by the current user only (atomic replace)"""
+    path = token_file(port)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token)
+    os.replace(tmp_path, path)
+
+
+def _remove_token(token, port):
+    if read_token(port) == token:
+        try:
+            os.remove(token_file(port))
+        except OSError:
+            pass
+
+
+def _process_alive(pid):
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def _watch_parent(server, parent_pid):
+    """Shut the daemon down once the server process that started it is gone"""
+    while _process_alive(parent_pid):
+        time.sleep(PARENT_CHECK_SECONDS)
+    logger.info(f"Server process {parent_pid} exited, stopping playback daemon")
+    server.shutdown()
+
+
+def init_mixer():
+    """Import pygame and open the mixer once for the lifetime of the daemon"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    if os.name == 'nt':
+        os.environ.setdefault('SDL_AUDIODRIVER', 'directsound')
+
+    import pygame
+    pygame.mixer.pre_init(frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
+    pygame.mixer.init()
+    pygame.mixer.set_num_channels(MIXER_NUM_CHANNELS)
+    return pygame
+
+
+def send_request(message, timeout=CONNECT_TIMEOUT, host=PLAYBACK_DAEMON_HOST, port=PLAYBACK_DAEMON_PORT):
+    """Send one request (with the daemon's token) and return the first reply (None if not running)"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.sendall((json.dumps(dict(message, token=read_token(port))) + '\n').encode('utf-8'))
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+        return json.loads(line.decode('utf-8')) if line else None
+    except (OSError, ValueError):
+        return None
+
+
+def is_daemon_running():
+    reply = send_request({'cmd': 'ping'})
+    return bool(reply and reply.get('ok'))
+
+
+def start_daemon(python_exe=None, wait=5.0):
+    """
+    Start the daemon in the background unless it is already running. The
+    daemon belongs to this process: it exits when this process is gone, and
+    stop_daemon() (registered with atexit by the server) shuts it down.
+
+    Returns:
+        bool: True if the daemon answers a ping
+    """
+    global _owned_process
+    if is_daemon_running():
+        return True
+
+    popen_kwargs = {}
+    if os.name == 'nt':
+        popen_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        # Own session: a Ctrl+C in the server's console is handled by the server, which stops the daemon
+        popen_kwargs['start_new_session'] = True
+    with _owned_lock:
+        if _owned_process is not None and _owned_process.poll() is None:
+            process = _owned_process
+        else:
+            process = _owned_process = subprocess.Popen(
+                [python_exe or sys.executable, os.path.abspath(__file__), '--parent-pid', str(os.getpid())],
+                cwd=BACKEND_DIR,
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                **popen_kwargs
+            )
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if is_daemon_running():
+            return True
+        if process.poll() is not None:
+            return False
+        time.sleep(0.1)
+    return False
+
+
+def stop_daemon(timeout=5.0):
+    """Shut down the daemon if this process started it"""
+    global _owned_process
+    with _owned_lock:
+        process, _owned_process = _owned_process, None
+    if process is None or process.poll() is not None:
+        return
+    send_request({'cmd': 'shutdown'})
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.FileHandler(log_file, mode='a'), logging.StreamHandler()]
+    )
+    parser = argparse.ArgumentParser(description='Resident ringtone playback daemon')
+    parser.add_argument('--parent-pid', type=int, help='Exit once this process (the server) is gone')
+    args = parser.parse_args()
+
+    try:
+        pygame = init_mixer()
+    except Exception as e:
+        logger.error(f"Cannot open audio mixer: {e}")
+        sys.exit(1)
+
+    token = secrets.token_hex(16)
+    try:
+        server = PlaybackDaemon(pygame, token)
+    except OSError as e:
+        logger.error(f"Playback daemon already running or port {PLAYBACK_DAEMON_PORT} unavailable: {e}")
+        sys.exit(1)
+    # Written only once the port is ours, so a running daemon's token is never replaced
+    _write_token(token, PLAYBACK_DAEMON_PORT)
+    if args.parent_pid:
+        threading.Thread(target=_watch_parent, args=(server, args.parent_pid), name='parent-watch', daemon=True).start()
+
+    logger.info(f"Playback daemon listening on {PLAYBACK_DAEMON_HOST}:{PLAYBACK_DAEMON_PORT} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        _remove_token(token, PLAYBACK_DAEMON_PORT)
+        pygame.mixer.quit()
+
+
+if __name__ == '__main__':
+    main()
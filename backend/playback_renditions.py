@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Playback-ready PCM renditions of scheduled ringtones.
+
+When a schedule is created the server converts its ringtone once to a WAV in
+the mixer's exact format (22050 Hz, signed 16-bit, stereo). At alarm time the
+player loads that file directly (pygame.mixer.Sound or winsound) with no MP3
+decode and no resampling.
+
+The rendition path is derived from the source path, size and mtime, so the
+player can find it without any lookup table and a changed source never uses
+a stale rendition. Renditions are named <stem>_<path hash>_<content hash>.wav:
+files that share a stem (song.wav / song.mp3, or the same name in two
+folders) never replace each other's renditions.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+
+logger = logging.getLogger(__name__)
+
+# Mixer format shared by the playback daemon and the in-process player
+MIXER_FREQUENCY = 22050
+MIXER_SIZE = -16
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 512
+
+RENDITION_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ringtones', 'playback_cache')
+
+
+def rendition_path(source_path, folder=RENDITION_FOLDER):
+    """Deterministic rendition location for a source file (None if the source is missing)"""
+    try:
+        source_stat = os.stat(source_path)
+    except OSError:
+        return None
+    stamp = f"{source_stat.st_size}:{source_stat.st_mtime_ns}"
+    digest = hashlib.md5(stamp.encode('utf-8')).hexdigest()[:10]
+    return os.path.join(folder, f"{_rendition_prefix(source_path)}_{digest}.wav")
+
+
+def _rendition_prefix(source_path):
+    """<stem>_<path hash>: shared by every rendition of one source file"""
+    path_key = os.path.normcase(os.path.abspath(source_path))
+    path_digest = hashlib.md5(path_key.encode('utf-8')).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return f"{stem}_{path_digest}"
+
+
+def is_mixer_format(wav_path):
+    """True if a WAV file already matches the mixer format"""
+    try:
+        with wave.open(wav_path, 'rb') as wav_file:
+            return (wav_file.getframerate() == MIXER_FREQUENCY
+                    and wav_file.getsampwidth() == abs(MIXER_SIZE) // 8
+                    and wav_file.getnchannels() == MIXER_CHANNELS)
+    except (OSError, EOFError, wave.Error):
+        return False
+
+
+def find_rendition(source_path):
+    """
+    Return the file the player should load for source_path: an up-to-date
+    rendition, the source itself if it already is in mixer format, or None.
+    """
+    path = rendition_path(source_path)
+    if path and os.path.exists(path):
+        return path
+    if source_path.lower().endswith('.wav') and is_mixer_format(source_path):
+        return source_path
+    return None
+
+
+def _convert_with_ffmpeg(source_path, target_path):
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        return False
+    result = subprocess.run(
+        [ffmpeg, '-v', 'error', '-nostdin', '-y', '-i', source_path, '-vn',
+         '-ar', str(MIXER_FREQUENCY), '-ac', str(MIXER_CHANNELS), '-c:a', 'pcm_s16le', '-f', 'wav', target_path],
+        capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        logger.warning(f"FFmpeg rendition failed for {source_path}: {result.stderr.strip()}")
+    return result.returncode == 0
+
+
+def _convert_with_pydub(source_path, target_path):
+    try:
+        from pydub import AudioSegment
+    except ImportError:
+        return False
+    segment = AudioSegment.from_file(source_path)
+    segment = segment.set_frame_rate(MIXER_FREQUENCY).set_channels(MIXER_CHANNELS).set_sample_width(abs(MIXER_SIZE) // 8)
+    segment.export(target_path, format='wav')
+    return True
+
+
+def create_rendition(source_path):
+    """
+    Create (or reuse) the playback rendition for a ringtone.
+
+    Returns:
+        Path the player will use, or None if no conversion was possible
+    """
+    existing = find_rendition(source_path)
+    if existing:
+        return existing
+
+    target_path = rendition_path(source_path)
+    if not target_path:
+        return None
+    folder = os.path.dirname(target_path)
+    os.makedirs(folder, exist_ok=True)
+    # Own temp file per writer: the create/batch endpoints and the reconciler may convert the same source at once
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=os.path.basename(target_path)[:-4] + '.', suffix='.tmp.wav')
+    os.close(fd)
+
+    try:
+        converted = _convert_with_ffmpeg(source_path, tmp_path) or _convert_with_pydub(source_path, tmp_path)
+    except Exception as e:
+        logger.warning(f"Could not create playback rendition for {source_path}: {e}")
+        converted = False
+    if not converted:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+    os.replace(tmp_path, target_path)
+    _remove_stale_renditions(source_path, target_path)
+    logger.info(f"✅ Created playback rendition: {target_path}")
+    return target_path
+
+
+def remove_renditions(source_path, folder=RENDITION_FOLDER):
+    """Delete every rendition of a source file (after the ringtone itself was deleted)"""
+    prefix = _rendition_prefix(source_path)
+    removed = 0
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return 0
+    for name in names:
+        if name.endswith('.wav') and '.tmp.' not in name and name[:-4].rsplit('_', 1)[0] == prefix:
+            try:
+                os.remove(os.path.join(folder, name))
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def _remove_stale_renditions(source_path, current_path):
+    """
+    Delete older renditions of the same source file (same stem and path hash,
+    other content hash), and <stem>_<hash>.wav renditions of the old naming.
+    """
+    folder = os.path.dirname(current_path)
+    prefix = _rendition_prefix(source_path)
+    legacy_stem = os.path.splitext(os.path.basename(source_path))[0]
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if path == current_path or not name.endswith('.wav') or '.tmp.' in name:
+            continue
+        head = name[:-4].rsplit('_', 1)[0]
+        if head == prefix or head == legacy_stem:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
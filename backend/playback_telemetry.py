@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Trigger-latency telemetry for scheduled ringtone playback.
+
+play_ringtone.py records, per run, the scheduled fire time, the process start
+time, when the audio output was ready and when the first buffer was handed to
+the device. Each run is appended as one compact JSON line to
+playback_latency.jsonl; the server summarizes the log into percentiles and
+histograms per ringtone and per playback backend.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+LATENCY_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'playback_latency.jsonl')
+# Rotate the log by keeping the newest records once it grows past this size
+MAX_LOG_BYTES = 2 * 1024 * 1024
+KEEP_RECORDS = 5000
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+HISTOGRAM_BOUNDS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 60000]
+
+# Derived metrics: name -> (from mark, to mark)
+LATENCY_METRICS = {
+    'audible_delay_ms': ('scheduled', 'first_buffer'),   # what the user hears
+    'trigger_delay_ms': ('scheduled', 'process_start'),  # scheduler / missed fires
+    'startup_ms': ('process_start', 'mixer_ready'),      # cold start cost
+    'time_to_audio_ms': ('process_start', 'first_buffer'),
+}
+
+
+def process_start_time():
+    """Creation time of the current process (falls back to now without psutil)"""
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).create_time()
+    except Exception:
+        return time.time()
+
+
+def parse_scheduled_time(value, now=None):
+    """
+    Turn --scheduled-time into an epoch timestamp.
+    Accepts an ISO timestamp or HH:MM (the most recent occurrence of that time).
+    A comma-separated HH:MM list (one task with several triggers) resolves to
+    the most recent of those times.
+    """
+    if not value:
+        return None
+    now = now or datetime.now()
+    if ',' in value:
+        times = [parse_scheduled_time(part.strip(), now) for part in value.split(',') if part.strip()]
+        times = [scheduled for scheduled in times if scheduled is not None]
+        return max(times) if times else None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        pass
+    try:
+        hours, minutes = (int(part) for part in value.split(':')[:2])
+    except ValueError:
+        return None
+    scheduled = now.replace(hour=hours, minute=minutes, second=0, microsecond=0)
+    # Allow a minute of clock skew before assuming the time refers to yesterday
+    if scheduled > now + timedelta(minutes=1):
+        scheduled -= timedelta(days=1)
+    return scheduled.timestamp()
+
+
+class PlaybackTimer:
+    """Collects the timestamps of one playback run"""
+
+    def __init__(self, scheduled=None, script_start=None):
+        script_start = script_start or time.time()
+        self.marks = {
+            'scheduled': scheduled,
+            # create_time() has coarse (clock tick) resolution and can land after script start
+            'process_start': min(process_start_time(), script_start),
+            'script_start': script_start,
+        }
+
+    def mark(self, name):
+        # Keep the first occurrence (a fallback backend must not overwrite it)
+        self.marks.setdefault(name, time.time())
+
+    def reset(self, *names):
+        """Forget marks of a backend that failed before producing sound"""
+        for name in names:
+            self.marks.pop(name, None)
+
+    def record(self, ringtone_path, backend, success, log_path=LATENCY_LOG):
+        """Append this run to the latency log (never raises)"""
+        entry = {
+            'ringtone': os.path.basename(ringtone_path),
+            'backend': backend,
+            'ok': bool(success),
+        }
+        entry.update({name: round(value, 3) for name, value in self.marks.items() if value is not None})
+        try:
+            _rotate_if_needed(log_path)
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        except OSError:
+            pass
+        return entry
+
+
+def _rotate_if_needed(log_path):
+    try:
+        if os.path.getsize(log_path) <= MAX_LOG_BYTES:
+            return
+    except OSError:
+        return
+    records = load_records(log_path)[-KEEP_RECORDS:]
+    tmp_path = log_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+    os.replace(tmp_path, log_path)
+
+
+def load_records(log_path=LATENCY_LOG, limit=None):
+    """Read latency records (newest last), skipping damaged lines"""
+    records = []
+    try:
+        with open(log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        return []
+    return records[-limit:] if limit else records
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _describe(values):
+    values = sorted(values)
+    histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for value in values:
+        for index, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if value <= bound:
+                histogram[index] += 1
+                break
+        else:
+            histogram[-1] += 1
+    return {
+        'count': len(values),
+        'p50': round(_percentile(values, 0.50), 1),
+        'p90': round(_percentile(values, 0.90), 1),
+        'p99': round(_percentile(values, 0.99), 1),
+        'max': round(values[-1], 1),
+        'histogram': histogram,
+    }
+
+
+def _metrics(records):
+    result = {}
+    for metric, (start, end) in LATENCY_METRICS.items():
+        values = [
+            (record[end] - record[start]) * 1000
+            for record in records
+            if record.get(start) is not None and record.get(end) is not None
+        ]
+        if values:
+            result[metric] = _describe(values)
+    return result
+
+
+def summarize_latency(log_path=LATENCY_LOG, limit=None):
+    """Percentiles and histograms per ringtone and per backend"""
+    records = load_records(log_path, limit)
+    by_ringtone, by_backend = {}, {}
+    for record in records:
+        by_ringtone.setdefault(record.get('ringtone', 'unknown'), []).append(record)
+        by_backend.setdefault(record.get('backend') or 'none', []).append(record)
+
+    return {
+        'records': len(records),
+        'failed': sum(1 for record in records if not record.get('ok')),
+        'histogram_bounds_ms': HISTOGRAM_BOUNDS_MS,
+        'overall': _metrics(records),
+        'by_backend': {name: _metrics(items) for name, items in by_backend.items()},
+        'by_ringtone': {name: _metrics(items) for name, items in by_ringtone.items()},
+    }
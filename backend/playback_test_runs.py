@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Non-blocking test playback ("Test" button of a schedule).
+
+A test run starts play_ringtone.py as a child process and returns at once
+with a playback id; a watcher thread collects its exit status. While a
+ringtone is being tested, further test requests for the same file get the
+running playback back instead of a second player. Stopping a run terminates
+the player's process tree (with the playback daemon, closing the player's
+connection stops the sound as well).
+
+Finished runs are kept for a while so the UI can fetch their result.
+"""
+
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# play_ringtone.py caps playback at 10 minutes; a test run is killed after this long
+TEST_PLAYBACK_MAX_SECONDS = float(os.environ.get('RINGTONE_TEST_PLAYBACK_MAX_SECONDS', '660'))
+
+# Finished runs remembered for status requests
+FINISHED_RUNS_KEPT = 50
+
+# A player that ignores the stop request (SDL turns SIGTERM into a quit event) is killed after this long
+STOP_GRACE_SECONDS = 2.0
+
+# Last characters of the player's stderr reported for a failed run
+ERROR_TAIL_CHARS = 2000
+
+
+def _kill_process_tree(process, force=False):
+    """Terminate a player started by TestPlaybackManager (in its own session / process group)"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == 'nt':
+            args = ['taskkill', '/T', '/PID', str(process.pid)] + (['/F'] if force else [])
+            subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10,
+                           creationflags=subprocess.CREATE_NO_WINDOW)
+            if force:
+                process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (OSError, subprocess.SubprocessError):
+        process.kill()
+
+
+class TestPlaybackManager:
+    """Test playbacks by id, at most one running per ringtone file"""
+
+    def __init__(self, max_seconds: float = TEST_PLAYBACK_MAX_SECONDS, kept: int = FINISHED_RUNS_KEPT):
+        self.max_seconds = max_seconds
+        self.kept = kept
+        self._lock = threading.Lock()
+        self._runs = OrderedDict()
+        self._running_by_path = {}
+
+    @staticmethod
+    def _path_key(ringtone_path):
+        return os.path.normcase(os.path.abspath(ringtone_path))
+
+    @staticmethod
+    def _public(run):
+        info = {key: value for key, value in run.items() if key != 'process'}
+        end = run['ended_at'] or time.time()
+        info['elapsed_ms'] = round((end - run['started_at']) * 1000)
+        return info
+
+    def start(self, ringtone_path, command):
+        """
+        Start a test playback, or join the one already running for this file.
+
+        Args:
+            ringtone_path: ringtone to play
+            command: player command line (list) with --test, see SchedulerBackend.player_command
+
+        Returns:
+            (run info dict, started: False if an existing run was returned)
+        """
+        key = self._path_key(ringtone_path)
+        with self._lock:
+            running_id = self._running_by_path.get(key)
+            if running_id:
+                return self._public(self._runs[running_id]), False
+
+            popen_kwargs = {}
+            if os.name == 'nt':
+                popen_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
+            else:
+                popen_kwargs['start_new_session'] = True
+            process = subprocess.Popen(command, cwd=BACKEND_DIR, stdin=subprocess.DEVNULL,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                       text=True, errors='replace', **popen_kwargs)
+
+            playback_id = uuid.uuid4().hex[:12]
+            run = {
+                'playback_id': playback_id,
+                'ringtone_path': ringtone_path,
+                'status': 'playing',
+                'started_at': time.time(),
+                'ended_at': None,
+                'returncode': None,
+                'error': None,
+                'process': process,
+            }
+            self._runs[playback_id] = run
+            self._running_by_path[key] = playback_id
+            self._trim()
+
+        threading.Thread(target=self._watch, args=(playback_id, key, process),
+                         name=f'test-playback-{playback_id}', daemon=True).start()
+        logger.info(f"🔊 Started test playback {playback_id}: {ringtone_path}")
+        return self._public(run), True
+
+    def _watch(self, playback_id, key, process):
+        """Wait for the player (killing it after max_seconds) and record the outcome"""
+        timed_out = False
+        try:
+            _, stderr = process.communicate(timeout=self.max_seconds)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            _kill_process_tree(process, force=True)
+            _, stderr = process.communicate()
+
+        with self._lock:
+            run = self._runs.get(playback_id)
+            if self._running_by_path.get(key) == playback_id:
+                del self._running_by_path[key]
+            if run is None:
+                return
+            run['ended_at'] = time.time()
+            run['returncode'] = process.returncode
+            run['process'] = None
+            if run['status'] == 'stopping':
+                run['status'] = 'stopped'
+            elif timed_out:
+                run['status'] = 'failed'
+                run['error'] = f'Playback did not finish within {self.max_seconds:.0f}s'
+            elif process.returncode == 0:
+                run['status'] = 'finished'
+            else:
+                run['status'] = 'failed'
+                run['error'] = (stderr or '').strip()[-ERROR_TAIL_CHARS:] or f'Player exited with code {process.returncode}'
+            status = run['status']
+
+        if status == 'failed':
+            logger.error(f"❌ Test playback {playback_id} failed: {run['error']}")
+        else:
+            logger.info(f"✅ Test playback {playback_id} {status}")
+
+    def _trim(self):
+        """Forget the oldest finished runs beyond `kept` (caller holds the lock)"""
+        finished = [playback_id for playback_id, run in self._runs.items() if run['process'] is None]
+        for playback_id in finished[:max(0, len(finished) - self.kept)]:
+            del self._runs[playback_id]
+
+    def get(self, playback_id):
+        """Run info, or None for an unknown (or long forgotten) playback id"""
+        with self._lock:
+            run = self._runs.get(playback_id)
+            return self._public(run) if run else None
+
+    def stop(self, playback_id):
+        """
+        Stop a running test playback.
+
+        Returns:
+            run info (status 'stopping' until the player exited), or None if unknown
+        """
+        with self._lock:
+            run = self._runs.get(playback_id)
+            if run is None:
+                return None
+            process = run['process']
+            if process is not None and run['status'] == 'playing':
+                run['status'] = 'stopping'
+            else:
+                process = None
+        if process is not None:
+            _kill_process_tree(process)
+            escalate = threading.Timer(STOP_GRACE_SECONDS, _kill_process_tree, args=(process,), kwargs={'force': True})
+            escalate.daemon = True
+            escalate.start()
+            logger.info(f"⏹️ Stopping test playback {playback_id}")
+        return self.get(playback_id)
+
+
+test_playback_manager = TestPlaybackManager()
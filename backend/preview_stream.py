@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Streaming trim previews for uploaded sources.
+
+FFmpeg seeks on the input (-ss before -i), so start-of-playback latency does
+not depend on how far into the source the range starts. It encodes only the
+requested range to a low-bitrate MP3 or Opus stream on stdout, and the chunks
+are forwarded to the client as they are produced. Completed previews are kept
+in a small in-memory LRU; nothing is written to disk.
+"""
+
+import logging
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_FORMATS = {
+    'mp3': {
+        'mimetype': 'audio/mpeg',
+        'args': ['-c:a', 'libmp3lame', '-b:a', '64k', '-f', 'mp3'],
+    },
+    'opus': {
+        'mimetype': 'audio/ogg',
+        'args': ['-c:a', 'libopus', '-b:a', '48k', '-f', 'ogg'],
+    },
+}
+
+MAX_PREVIEW_SECONDS = 600
+CHUNK_SIZE = 16 * 1024
+
+# LRU limits for completed previews
+PREVIEW_CACHE_ENTRIES = 16
+PREVIEW_CACHE_BYTES = 32 * 1024 * 1024
+
+
+class PreviewCache:
+    """Thread-safe LRU of encoded previews bounded by entry count and total size"""
+
+    def __init__(self, max_entries=PREVIEW_CACHE_ENTRIES, max_bytes=PREVIEW_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = data
+            self._size += len(data)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size}
+
+
+preview_cache = PreviewCache()
+
+
+def ffmpeg_available():
+    return shutil.which('ffmpeg') is not None
+
+
+def build_preview_command(source_path, start, end, fmt):
+    """FFmpeg command encoding source_path[start:end] to stdout"""
+    return (
+        [shutil.which('ffmpeg') or 'ffmpeg', '-v', 'error', '-nostdin',
+         '-ss', f"{start:.3f}", '-t', f"{end - start:.3f}", '-i', source_path,
+         '-vn', '-ac', '1']
+        + PREVIEW_FORMATS[fmt]['args']
+        + ['pipe:1']
+    )
+
+
+def stream_preview(source_path, start, end, fmt, cache_key=None, cache=preview_cache):
+    """
+    Generator yielding encoded preview chunks as FFmpeg produces them.
+    A fully streamed preview is stored in the cache; if the client goes away
+    the generator is closed and FFmpeg is stopped.
+    """
+    process = subprocess.Popen(
+        build_preview_command(source_path, start, end, fmt),
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0
+    )
+    chunks = []
+    completed = False
+    try:
+        while True:
+            chunk = process.stdout.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            yield chunk
+        completed = process.wait() == 0
+        if not completed:
+            logger.warning(f"Preview encoding failed: {process.stderr.read().decode(errors='replace').strip()}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+        if completed and cache_key is not None:
+            cache.put(cache_key, b''.join(chunks))
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Production WSGI serving for the Ringtone Creator backend.
+Used by `python server.py --production` instead of Flask's development server
+(no reloader, no debugger, bounded worker threads).
+
+Uses waitress when it is installed; otherwise falls back to a Werkzeug server
+that dispatches connections to a fixed-size thread pool with HTTP/1.1
+keep-alive and a connection limit. A kept-alive connection holds a worker
+while it waits for its next request, so that wait is short (keepalive_timeout)
+and separate from the read timeout of a request in progress (channel_timeout);
+it is cut short when other connections are waiting for a worker.
+"""
+
+import logging
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+logger = logging.getLogger(__name__)
+
+# waitress is optional - the pooled Werkzeug server is used without it
+try:
+    from waitress import serve as waitress_serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    waitress_serve = None
+    WAITRESS_AVAILABLE = False
+
+DEFAULT_THREADS = 8
+# Open connections accepted at once (active + waiting for a worker)
+DEFAULT_CONNECTION_LIMIT = 100
+# Seconds a request may stall while it is being read or written (socket timeout)
+DEFAULT_CHANNEL_TIMEOUT = 30
+# Seconds an idle keep-alive connection may hold a worker waiting for its next request
+DEFAULT_KEEPALIVE_TIMEOUT = 2
+
+SERVICE_UNAVAILABLE_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Type: text/plain\r\n"
+    b"Content-Length: 19\r\n"
+    b"Connection: close\r\n\r\n"
+    b"Service Unavailable"
+)
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """
+    HTTP/1.1 handler: waits at most keepalive_timeout for the next request,
+    then reads and writes it with the channel_timeout socket timeout.
+    """
+
+    protocol_version = "HTTP/1.1"
+    keepalive_timeout = DEFAULT_KEEPALIVE_TIMEOUT
+
+    def _wait_for_request(self):
+        """True once request bytes arrived; False on idle timeout or a closed connection"""
+        try:
+            self.connection.settimeout(self.keepalive_timeout)
+            return bool(self.rfile.peek(1))
+        except (socket.timeout, OSError):
+            return False
+        finally:
+            try:
+                self.connection.settimeout(self.timeout)
+            except OSError:
+                pass
+
+    def handle_one_request(self):
+        if not self._wait_for_request():
+            self.close_connection = True
+            return
+        super().handle_one_request()
+        # Give the worker to a waiting connection instead of idling on this one
+        if getattr(self.server, "connections_waiting", 0):
+            self.close_connection = True
+
+    def log_request(self, code="-", size="-"):
+        # Request logging on every hit is too noisy (and slow) in production
+        pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    Werkzeug server that hands accepted connections to a bounded thread pool.
+    Connections beyond connection_limit are answered with 503 right away.
+    """
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads=DEFAULT_THREADS,
+                 connection_limit=DEFAULT_CONNECTION_LIMIT,
+                 channel_timeout=DEFAULT_CHANNEL_TIMEOUT,
+                 keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT):
+        handler = type("ConfiguredRequestHandler", (KeepAliveRequestHandler,),
+                       {"timeout": channel_timeout, "keepalive_timeout": keepalive_timeout})
+        super().__init__(host, port, app, handler=handler)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi-worker")
+        self.connection_slots = threading.BoundedSemaphore(connection_limit)
+        # Accepted connections not yet picked up by a worker
+        self.connections_waiting = 0
+        self._waiting_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        if not self.connection_slots.acquire(blocking=False):
+            try:
+                request.sendall(SERVICE_UNAVAILABLE_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        with self._waiting_lock:
+            self.connections_waiting += 1
+        self.executor.submit(self._process_in_worker, request, client_address)
+
+    def _process_in_worker(self, request, client_address):
+        with self._waiting_lock:
+            self.connections_waiting -= 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.connection_slots.release()
+
+    def server_close(self):
+        super().server_close()
+        executor = getattr(self, "executor", None)
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def serve_production(app, host="0.0.0.0", port=5000, threads=DEFAULT_THREADS,
+                     connection_limit=DEFAULT_CONNECTION_LIMIT,
+                     channel_timeout=DEFAULT_CHANNEL_TIMEOUT,
+                     keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT, use_waitress=True):
+    """
+    Serve a WSGI app with a production server (blocks until interrupted).
+
+    Args:
+        app: WSGI application (the Flask app)
+        threads: Worker threads handling requests
+        connection_limit: Maximum simultaneously open connections
+        channel_timeout: Seconds before a stalled request is closed
+        keepalive_timeout: Seconds an idle keep-alive connection is kept (pooled server only;
+            waitress does not hold a thread for idle connections)
+        use_waitress: Prefer waitress when installed
+    """
+    if use_waitress and WAITRESS_AVAILABLE:
+        logger.info(f"🚀 Serving with waitress on http://{host}:{port} "
+                    f"(threads={threads}, connection_limit={connection_limit}, channel_timeout={channel_timeout}s)")
+        waitress_serve(app, host=host, port=port, threads=threads,
+                       connection_limit=connection_limit, channel_timeout=channel_timeout,
+                       ident="RingtoneCreator")
+        return
+
+    logger.info(f"🚀 Serving with pooled Werkzeug server on http://{host}:{port} "
+                f"(threads={threads}, connection_limit={connection_limit}, channel_timeout={channel_timeout}s, "
+                f"keepalive_timeout={keepalive_timeout}s)")
+    if use_waitress:
+        logger.info("💡 Install waitress for a faster production server")
+    server = PooledWSGIServer(host, port, app, threads=threads, connection_limit=connection_limit,
+                              channel_timeout=channel_timeout, keepalive_timeout=keepalive_timeout)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Overlap detection for weekly schedules.
+
+Every active weekly schedule rings for the duration of its ringtone on each of
+its days. Those windows are kept as seconds-of-week intervals in a centered
+interval tree, so "what else is ringing between Mon 08:00:00 and 08:00:30" is
+O(log n + k) instead of a scan over all schedules. A window that runs past
+Saturday midnight is split into two intervals at the week wrap.
+
+The ringtone duration comes from the schedule's own `duration`, else the
+metadata JSON next to the ringtone file (duration, or end_time - start_time),
+else the WAV header, else DEFAULT_RINGTONE_SECONDS.
+
+Store changes mark schedules dirty (checked directly by queries) and the tree
+is rebuilt once enough of them piled up. Schedules with a custom `rrule` are
+not weekly and are left out.
+"""
+
+import json
+import logging
+import os
+import threading
+import wave
+
+from schedule_store import schedule_store
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 24 * 60 * 60
+WEEK_SECONDS = 7 * DAY_SECONDS
+
+# Used when no duration is known for a ringtone
+DEFAULT_RINGTONE_SECONDS = 30.0
+
+DAY_NAMES = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+
+
+def _metadata_duration(path):
+    try:
+        with open(os.path.splitext(path)[0] + '.json', 'r') as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None
+    duration = metadata.get('duration')
+    if not duration and metadata.get('end_time') is not None and metadata.get('start_time') is not None:
+        duration = float(metadata['end_time']) - float(metadata['start_time'])
+    return float(duration) if duration else None
+
+
+def _wav_duration(path):
+    try:
+        with wave.open(path, 'rb') as wav_file:
+            return wav_file.getnframes() / float(wav_file.getframerate())
+    except (OSError, EOFError, wave.Error, ZeroDivisionError):
+        return None
+
+
+_duration_cache = {}
+_duration_lock = threading.Lock()
+
+
+def ringtone_duration(schedule):
+    """Seconds a schedule's ringtone plays for"""
+    try:
+        if schedule.get('duration'):
+            return float(schedule['duration'])
+    except (TypeError, ValueError):
+        pass
+
+    path = schedule.get('ringtoneFilePath') or schedule.get('ringtoneUrl')
+    if not path:
+        return DEFAULT_RINGTONE_SECONDS
+    path = os.path.abspath(path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+
+    with _duration_lock:
+        cached = _duration_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    duration = None
+    try:
+        duration = _metadata_duration(path)
+    except (TypeError, ValueError):
+        pass
+    if not duration and path.lower().endswith('.wav'):
+        duration = _wav_duration(path)
+    duration = duration if duration and duration > 0 else DEFAULT_RINGTONE_SECONDS
+    with _duration_lock:
+        _duration_cache[path] = (mtime, duration)
+    return duration
+
+
+def weekly_windows(schedule, duration):
+    """
+    Ringing windows of a weekly schedule as (day, start, end) seconds-of-week,
+    split at the week wrap (end is exclusive).
+    """
+    hours, minutes = (int(part) for part in str(schedule.get('time', '00:00')).split(':')[:2])
+    duration = min(duration, WEEK_SECONDS)
+    windows = []
+    for day in sorted({int(day) for day in schedule.get('days') or range(7)}):
+        if day < 0 or day > 6:
+            raise ValueError(f'Invalid day: {day}')
+        start = day * DAY_SECONDS + hours * 3600 + minutes * 60
+        end = start + duration
+        if end <= WEEK_SECONDS:
+            windows.append((day, start, end))
+        else:
+            windows.append((day, start, WEEK_SECONDS))
+            windows.append((day, 0, end - WEEK_SECONDS))
+    return windows
+
+
+def format_week_seconds(seconds):
+    """Seconds-of-week -> 'Monday 08:00:30'"""
+    seconds = int(seconds) % WEEK_SECONDS
+    day, rest = divmod(seconds, DAY_SECONDS)
+    return f"{DAY_NAMES[day]} {rest // 3600:02d}:{rest % 3600 // 60:02d}:{rest % 60:02d}"
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over half-open [start, end) intervals.
+
+    Each node keeps the intervals containing its center, sorted by start and by
+    end, so a query reports every overlapping interval of a node without
+    looking at the others.
+    """
+
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, intervals):
+        """intervals: list of (start, end, item) with start < end"""
+        # The median start keeps the tree balanced and always leaves at least one interval here
+        starts = sorted(interval[0] for interval in intervals)
+        self.center = starts[len(starts) // 2] if starts else 0
+        here, left, right = [], [], []
+        for interval in intervals:
+            if interval[1] <= self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        self.by_start = sorted(here, key=lambda interval: interval[0])
+        self.by_end = sorted(here, key=lambda interval: interval[1], reverse=True)
+        self.left = IntervalTree(left) if left else None
+        self.right = IntervalTree(right) if right else None
+
+    def overlapping(self, start, end):
+        """Intervals overlapping [start, end)"""
+        found = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if end <= node.center:
+                # Node intervals reach the center; they overlap if they start before `end`
+                for interval in node.by_start:
+                    if interval[0] >= end:
+                        break
+                    found.append(interval)
+                if node.left:
+                    stack.append(node.left)
+            elif start >= node.center:
+                # Node intervals start at or before the center; they overlap if they end after `start`
+                for interval in node.by_end:
+                    if interval[1] <= start:
+                        break
+                    found.append(interval)
+                if node.right:
+                    stack.append(node.right)
+            else:
+                # The query contains the center, so does every node interval
+                found.extend(node.by_start)
+                if node.left:
+                    stack.append(node.left)
+                if node.right:
+                    stack.append(node.right)
+        return found
+
+
+class ConflictIndex:
+    """
+    Interval tree over the ringing windows of the stored schedules.
+
+    Store changes only mark schedule ids dirty; queries skip the tree entries of
+    dirty schedules and check their current windows directly, and the tree is
+    rebuilt once more than REBUILD_AFTER schedules are dirty (or the store was
+    reloaded).
+    """
+
+    REBUILD_AFTER = 64
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._tree = None
+        self._windows = {}
+        self._dirty = set()
+        self._stale = True
+        store.subscribe(self._changed)
+
+    def _changed(self, schedule_id):
+        with self._lock:
+            if schedule_id is None:
+                self._stale = True
+            else:
+                self._dirty.add(schedule_id)
+
+    @staticmethod
+    def _schedule_windows(schedule):
+        if not schedule or not schedule.get('isActive', True) or schedule.get('rrule'):
+            return []
+        return weekly_windows(schedule, ringtone_duration(schedule))
+
+    def _build(self):
+        """Rebuild the tree from the whole store; returns (tree, {schedule id: (schedule, windows)})"""
+        with self._lock:
+            self._dirty = set()
+            self._stale = False
+        # Changes from here on are marked dirty again, so nothing is missed
+        _, schedules = self.store.snapshot()
+
+        intervals, windows = [], {}
+        for schedule in schedules:
+            try:
+                schedule_windows = self._schedule_windows(schedule)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"⚠️ Skipping schedule {schedule.get('id')} in conflict index: {e}")
+                continue
+            if schedule_windows:
+                windows[schedule.get('id')] = (schedule, schedule_windows)
+                intervals += [(start, end, schedule) for day, start, end in schedule_windows]
+
+        tree = IntervalTree(intervals)
+        with self._lock:
+            self._tree, self._windows = tree, windows
+        return tree, windows
+
+    def _current(self):
+        """
+        The tree plus the dirty schedules it does not reflect.
+
+        Returns:
+            (tree, dirty ids, [(start, end, schedule)] of the dirty schedules' current windows)
+        """
+        self.store.refresh()
+        with self._lock:
+            needs_build = self._stale or self._tree is None or len(self._dirty) > self.REBUILD_AFTER
+            tree, dirty = self._tree, set(self._dirty)
+        if needs_build:
+            tree, dirty = self._build()[0], set()
+
+        extra = []
+        for schedule_id in dirty:
+            schedule = self.store.get(schedule_id)
+            try:
+                extra += [(start, end, schedule) for day, start, end in self._schedule_windows(schedule)]
+            except (TypeError, ValueError):
+                continue
+        return tree, dirty, extra
+
+    def _overlapping(self, current, start, end):
+        tree, dirty, extra = current
+        found = [interval for interval in tree.overlapping(start, end) if interval[2].get('id') not in dirty]
+        found += [interval for interval in extra if interval[0] < end and interval[1] > start]
+        return found
+
+    def conflicts_for(self, schedule):
+        """
+        Stored schedules that ring while `schedule` does (it need not be stored yet).
+
+        Returns:
+            list of dicts: schedule_id, ringtone_name, day, start, end (overlap)
+        """
+        windows = self._schedule_windows(schedule)
+        if not windows:
+            return []
+        current = self._current()
+        conflicts = []
+        for day, start, end in windows:
+            for other_start, other_end, other in self._overlapping(current, start, end):
+                if other.get('id') == schedule.get('id'):
+                    continue
+                conflicts.append({
+                    'schedule_id': other.get('id'),
+                    'ringtone_name': other.get('ringtoneName'),
+                    'day': day,
+                    'start': format_week_seconds(max(start, other_start)),
+                    'end': format_week_seconds(min(end, other_end)),
+                })
+        return conflicts
+
+    def report(self):
+        """
+        All overlapping pairs of stored schedules, with the windows where they overlap.
+
+        Returns:
+            list of dicts: schedules (two ids), ringtone_names, overlaps [{day, start, end}]
+        """
+        # A full report visits every schedule anyway, so start from a clean tree
+        self.store.refresh()
+        with self._lock:
+            clean = not self._stale and not self._dirty and self._tree is not None
+            tree, windows = self._tree, self._windows
+        if not clean:
+            tree, windows = self._build()
+        pairs = {}
+        for schedule_id, (schedule, schedule_windows) in windows.items():
+            for day, start, end in schedule_windows:
+                for other_start, other_end, other in tree.overlapping(start, end):
+                    other_id = other.get('id')
+                    # Each pair is found from both sides; keep the one seen from the smaller id
+                    if other_id == schedule_id or str(other_id) < str(schedule_id):
+                        continue
+                    pair = pairs.setdefault((schedule_id, other_id), (schedule, other, []))
+                    pair[2].append({
+                        'day': day,
+                        'start': format_week_seconds(max(start, other_start)),
+                        'end': format_week_seconds(min(end, other_end)),
+                    })
+
+        return [
+            {
+                'schedules': [first.get('id'), second.get('id')],
+                'ringtone_names': [first.get('ringtoneName'), second.get('ringtoneName')],
+                'overlaps': overlaps,
+            }
+            for first, second, overlaps in (pairs[key] for key in sorted(pairs, key=str))
+        ]
+
+
+conflict_index = ConflictIndex(schedule_store)
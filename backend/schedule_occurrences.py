@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Upcoming occurrences of the schedules in schedules.json.
+
+Each schedule is compiled once into a dateutil rrule (cached by schedule id
+and invalidated when its time/days/rrule change): weekly on `days` at `time`,
+or the schedule's own `rrule` string (e.g. "FREQ=MONTHLY;BYMONTHDAY=1") for
+recurrences the weekly day list cannot express. The rule starts at the
+schedule's createdAt, so nothing is reported before a schedule existed. A
+DTSTART/UNTIL given in UTC or with a TZID is converted to local time, like
+every other time here.
+
+upcoming() merges the lazy occurrence streams of all active schedules with a
+heap, so "what rings in the next 24 hours" only generates the occurrences it
+returns.
+
+Without python-dateutil, weekly schedules are expanded by a small built-in
+generator and `rrule` schedules are skipped.
+"""
+
+import heapq
+import logging
+import threading
+from datetime import datetime, time as dtime, timedelta
+from itertools import islice
+
+try:
+    from dateutil.rrule import rrule, rruleset, rrulestr, WEEKLY, MO, TU, WE, TH, FR, SA, SU
+    DATEUTIL_AVAILABLE = True
+except ImportError:
+    DATEUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Used as the rule start when a schedule has no (parseable) createdAt
+DEFAULT_ANCHOR = datetime(2024, 1, 1)
+
+if DATEUTIL_AVAILABLE:
+    # Schedule days are 0=Sunday ... 6=Saturday
+    WEEKDAYS = [SU, MO, TU, WE, TH, FR, SA]
+
+
+def parse_time_of_day(value):
+    hours, minutes = (int(part) for part in str(value).split(':')[:2])
+    return dtime(hours, minutes)
+
+
+def to_naive_local(value):
+    """Aware datetime -> naive local datetime (naive values are returned as they are)"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def parse_datetime(value):
+    """ISO timestamp -> naive local datetime (aware values are converted to local time)"""
+    return to_naive_local(datetime.fromisoformat(str(value).replace('Z', '+00:00')))
+
+
+def _naive_rule(rule):
+    """
+    An rrule (or rruleset) with DTSTART, UNTIL, RDATE and EXDATE in naive local
+    time, as every query window is. Schedules ring at local wall-clock time.
+    """
+    if isinstance(rule, rruleset):
+        naive = rruleset(cache=True)
+        for member in rule._rrule:
+            naive.rrule(_naive_rule(member))
+        for member in rule._exrule:
+            naive.exrule(_naive_rule(member))
+        for when in rule._rdate:
+            naive.rdate(to_naive_local(when))
+        for when in rule._exdate:
+            naive.exdate(to_naive_local(when))
+        return naive
+    if rule._dtstart.tzinfo is None and (rule._until is None or rule._until.tzinfo is None):
+        return rule
+    return rule.replace(dtstart=to_naive_local(rule._dtstart), until=to_naive_local(rule._until))
+
+
+def _anchor(schedule, time_of_day):
+    try:
+        created = parse_datetime(schedule['createdAt'])
+    except (KeyError, TypeError, ValueError):
+        created = DEFAULT_ANCHOR
+    anchor = datetime.combine(created.date(), time_of_day)
+    # The first occurrence may be later on the creation day, never before it
+    return anchor if anchor >= created else anchor + timedelta(days=1)
+
+
+def compile_rule(schedule, near=None):
+    """
+    Build the recurrence for one schedule.
+
+    Weekly day-list rules have no phase, so with `near` they start at that day
+    (but never before createdAt) instead of iterating from the creation date.
+
+    Raises:
+        ValueError: invalid time or rrule string
+    """
+    time_of_day = parse_time_of_day(schedule.get('time', '00:00'))
+    anchor = _anchor(schedule, time_of_day)
+    rule_text = schedule.get('rrule')
+
+    if rule_text:
+        if not DATEUTIL_AVAILABLE:
+            raise ValueError('rrule schedules need python-dateutil')
+        # An RRULE without DTSTART starts at createdAt and takes the schedule's time of day
+        try:
+            rule = rrulestr(rule_text, dtstart=anchor, cache=True)
+        except ValueError:
+            # UNTIL in UTC (the RFC 5545 form) needs an aware start
+            rule = rrulestr(rule_text, dtstart=anchor.astimezone(), cache=True)
+        return _naive_rule(rule)
+
+    days = sorted({int(day) for day in schedule.get('days') or range(7)})
+    if any(day < 0 or day > 6 for day in days):
+        raise ValueError(f'Invalid days: {days}')
+    if near is not None:
+        anchor = max(anchor, datetime.combine(near.date(), time_of_day))
+    if DATEUTIL_AVAILABLE:
+        return rrule(WEEKLY, byweekday=[WEEKDAYS[day] for day in days], dtstart=anchor, cache=True)
+    return WeeklyRule(days, anchor)
+
+
+class WeeklyRule:
+    """Minimal stand-in for rrule(WEEKLY, byweekday=...) when dateutil is missing"""
+
+    def __init__(self, days, dtstart):
+        self.days = set(days)
+        self.dtstart = dtstart
+
+    def xafter(self, dt, inc=False):
+        current = max(dt, self.dtstart)
+        candidate = datetime.combine(current.date(), self.dtstart.time())
+        while True:
+            if (candidate > current or (inc and candidate == current)) and (candidate.weekday() + 1) % 7 in self.days:
+                yield candidate
+            candidate += timedelta(days=1)
+
+
+def validate_rrule(rule_text):
+    """Error message for an invalid rrule string, or None"""
+    try:
+        compile_rule({'time': '00:00', 'rrule': rule_text})
+        return None
+    except (ValueError, TypeError) as e:
+        return str(e)
+
+
+def _signature(schedule):
+    return (schedule.get('time'), tuple(schedule.get('days') or ()), schedule.get('rrule'), schedule.get('createdAt'))
+
+
+# A cached weekly rule is re-anchored once queries start this far after its start
+REANCHOR_AFTER = timedelta(days=7)
+
+
+def _tagged(rule, start, end, position, schedule_id):
+    """
+    Occurrences of one rule in [start, end] tagged with the schedule's position.
+    A rule that fails while iterating ends its own stream, not the whole query.
+    """
+    try:
+        for when in rule.xafter(start, inc=True):
+            when = to_naive_local(when)
+            if when > end:
+                return
+            yield when, position
+    except (TypeError, ValueError, OverflowError) as e:
+        logger.warning(f"⚠️ Stopped occurrences of schedule {schedule_id}: {e}")
+
+
+class OccurrenceIndex:
+    """Compiled rules cached per schedule id"""
+
+    def __init__(self):
+        self._rules = {}
+        self._lock = threading.Lock()
+
+    def rule_for(self, schedule, start):
+        schedule_id = schedule.get('id')
+        signature = _signature(schedule)
+        with self._lock:
+            cached = self._rules.get(schedule_id)
+        if cached and cached[0] == signature:
+            signature, rule, anchored_near = cached
+            # rrule strings keep their phase; weekly rules are moved next to the queried window
+            if anchored_near is None or anchored_near <= start <= anchored_near + REANCHOR_AFTER:
+                return rule
+        anchored_near = None if schedule.get('rrule') else start - timedelta(days=1)
+        rule = compile_rule(schedule, near=anchored_near)
+        with self._lock:
+            self._rules[schedule_id] = (signature, rule, anchored_near)
+        return rule
+
+    def prune(self, schedule_ids):
+        """Drop rules of schedules that no longer exist"""
+        with self._lock:
+            for schedule_id in list(self._rules):
+                if schedule_id not in schedule_ids:
+                    del self._rules[schedule_id]
+
+    def upcoming(self, schedules, start, end, limit=100):
+        """
+        Occurrences of all active schedules in [start, end], earliest first.
+
+        Returns:
+            list of (datetime, schedule) tuples, at most `limit`
+        """
+        streams = []
+        for position, schedule in enumerate(schedules):
+            if not schedule.get('isActive', True):
+                continue
+            try:
+                rule = self.rule_for(schedule, start)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"⚠️ Skipping schedule {schedule.get('id')}: {e}")
+                continue
+            # position breaks ties without comparing schedule dicts
+            streams.append(_tagged(rule, start, end, position, schedule.get('id')))
+
+        self.prune({schedule.get('id') for schedule in schedules})
+        merged = heapq.merge(*streams)
+        return [(when, schedules[position]) for when, position in islice(merged, limit)]
+
+
+occurrence_index = OccurrenceIndex()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Schedule store: schedules.json plus an append-only journal.
+
+The schedules are held in memory in a dict keyed by id (insertion order is the
+list order), so lookup, upsert and delete are O(1). A change is appended to
+schedules.json.journal as one JSON line instead of rewriting the whole file;
+once the journal outgrows the snapshot it is compacted into schedules.json
+(written to a temp file and swapped in with os.replace) and truncated.
+
+Writers hold an inter-process lock (schedules.json.lock) and first replay what
+other processes appended, so concurrent clients never overwrite each other.
+Readers only take the lock when the files changed since the last replay.
+
+A line torn by a crash mid-write is never applied; the next writer truncates
+it away before appending.
+"""
+
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+from file_lock import InterProcessLock
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEDULES_FILE = os.path.join(BACKEND_DIR, 'schedules.json')
+
+# The journal is compacted once it is larger than the snapshot and at least this big (bytes)
+COMPACT_MIN_BYTES = 256 * 1024
+
+
+def _file_signature(path):
+    """(inode, size, mtime) or None; changes when the file is replaced or rewritten"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class ScheduleStore:
+    """Schedules indexed by id, persisted as snapshot + journal"""
+
+    def __init__(self, snapshot_file=SCHEDULES_FILE):
+        self.snapshot_file = snapshot_file
+        self.journal_file = snapshot_file + '.journal'
+        self._file_lock = InterProcessLock(snapshot_file + '.lock')
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._schedules = {}
+        self._snapshot_signature = None
+        self._snapshot_size = 0
+        self._journal_offset = 0
+        self._loaded = False
+        # Bumped on every change seen (ours or replayed), so derived indexes know when to rebuild
+        self.version = 0
+        self._listeners = []
+
+    # ----- locking and replay -----
+
+    @contextmanager
+    def locked(self):
+        """
+        Hold the store lock (threads and processes) with the in-memory state
+        up to date. Re-entrant within a thread.
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._file_lock.acquire()
+            self._depth += 1
+            try:
+                if self._depth == 1:
+                    self._refresh()
+                yield self
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._file_lock.release()
+
+    def _changed(self):
+        if not self._loaded or _file_signature(self.snapshot_file) != self._snapshot_signature:
+            return True
+        try:
+            return os.path.getsize(self.journal_file) != self._journal_offset
+        except OSError:
+            return self._journal_offset != 0
+
+    def subscribe(self, listener):
+        """
+        Call listener(schedule_id) after every change to a schedule, ours or
+        replayed from another process; listener(None) means everything may have
+        changed (snapshot reloaded). Runs under the store lock: keep it cheap and
+        do not call back into the store.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, schedule_id):
+        for listener in self._listeners:
+            listener(schedule_id)
+
+    def refresh(self):
+        """Replay other processes' changes before a read (lock-free when nothing changed)"""
+        with self._lock:
+            if self._depth == 0 and self._changed():
+                with self.locked():
+                    pass
+
+    def _refresh(self):
+        """Load the snapshot if it was replaced, then replay new journal lines (caller holds the lock)"""
+        signature = _file_signature(self.snapshot_file)
+        try:
+            journal_size = os.path.getsize(self.journal_file)
+        except OSError:
+            journal_size = 0
+        # A shorter journal means another process compacted it
+        if not self._loaded or signature != self._snapshot_signature or journal_size < self._journal_offset:
+            self._load_snapshot(signature)
+        self._replay_journal()
+        self._loaded = True
+
+    def _load_snapshot(self, signature):
+        schedules = []
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                schedules = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading schedules from file: {e}")
+        self._schedules = {}
+        self.version += 1
+        self._notify(None)
+        for schedule in schedules if isinstance(schedules, list) else []:
+            if isinstance(schedule, dict):
+                self._schedules[schedule.get('id')] = schedule
+        self._snapshot_signature = signature
+        self._snapshot_size = signature[1] if signature else 0
+        # The journal only holds changes made after this snapshot
+        self._journal_offset = 0
+
+    def _replay_journal(self):
+        try:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(self._journal_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        complete = data.rfind(b'\n') + 1
+        for line in data[:complete].splitlines():
+            try:
+                self._apply_entry(json.loads(line))
+            except (ValueError, TypeError, KeyError) as e:
+                logger.warning(f"⚠️ Skipping unreadable schedule journal entry: {e}")
+        self._journal_offset += complete
+
+        if complete < len(data):
+            # A writer died mid-line; nobody else can be writing while we hold the lock
+            logger.warning("⚠️ Dropping torn entry at the end of the schedule journal")
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(self._journal_offset)
+
+    def _apply_entry(self, entry):
+        self.version += 1
+        if entry['op'] == 'put':
+            schedule = entry['schedule']
+            self._schedules[schedule.get('id')] = schedule
+            self._notify(schedule.get('id'))
+        elif entry['op'] == 'delete':
+            self._schedules.pop(entry['id'], None)
+            self._notify(entry['id'])
+
+    # ----- writes -----
+
+    def _append(self, entries):
+        """Write entries as one append to the journal (caller holds the lock)"""
+        payload = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries).encode('utf-8')
+        with open(self.journal_file, 'ab') as f:
+            f.write(payload)
+            f.flush()
+        self._journal_offset += len(payload)
+        for entry in entries:
+            self._apply_entry(entry)
+        if self._journal_offset > max(COMPACT_MIN_BYTES, self._snapshot_size):
+            self.compact()
+
+    def apply(self, puts=(), deletes=()):
+        """
+        Upsert and delete many schedules with one journal append.
+
+        Returns:
+            int: number of changes written
+        """
+        with self.locked():
+            entries = [{'op': 'put', 'schedule': schedule} for schedule in puts]
+            entries += [{'op': 'delete', 'id': schedule_id} for schedule_id in deletes
+                        if schedule_id in self._schedules]
+            if entries:
+                self._append(entries)
+            return len(entries)
+
+    def upsert(self, schedule):
+        """
+        Insert or replace a schedule (by its 'id').
+
+        Returns:
+            bool: True if the schedule is new
+        """
+        with self.locked():
+            created = schedule.get('id') not in self._schedules
+            self._append([{'op': 'put', 'schedule': schedule}])
+            return created
+
+    def delete(self, schedule_id):
+        """Returns True if the schedule existed"""
+        with self.locked():
+            if schedule_id not in self._schedules:
+                return False
+            self._append([{'op': 'delete', 'id': schedule_id}])
+            return True
+
+    def compact(self):
+        """Fold the journal into schedules.json and empty it"""
+        with self.locked():
+            tmp_file = self.snapshot_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(list(self._schedules.values()), f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+            # Snapshot first: a crash before the truncate only replays idempotent puts/deletes
+            with open(self.journal_file, 'wb'):
+                pass
+            self._snapshot_signature = _file_signature(self.snapshot_file)
+            self._snapshot_size = self._snapshot_signature[1] if self._snapshot_signature else 0
+            self._journal_offset = 0
+            logger.info(f"💾 Compacted schedule journal: {len(self._schedules)} schedules")
+
+    # ----- reads -----
+
+    def get(self, schedule_id):
+        """The stored schedule or None (do not mutate the returned dict)"""
+        self.refresh()
+        with self._lock:
+            return self._schedules.get(schedule_id)
+
+    def all(self):
+        """All schedules in insertion order (do not mutate the returned dicts)"""
+        self.refresh()
+        with self._lock:
+            return list(self._schedules.values())
+
+    def snapshot(self):
+        """(version, all schedules) read together, for indexes derived from the store"""
+        self.refresh()
+        with self._lock:
+            return self.version, list(self._schedules.values())
+
+    def __contains__(self, schedule_id):
+        return self.get(schedule_id) is not None
+
+    def __len__(self):
+        self.refresh()
+        with self._lock:
+            return len(self._schedules)
+
+
+schedule_store = ScheduleStore()
@@ -0,0 +1,81 @@
+# Rules applied
+"""
+Scheduler backend interface behind `task_scheduler_service`.
+
+Two implementations:
+    windows    WindowsTaskSchedulerService (schtasks; taskSchedulerService.py)
+    inprocess  InProcessSchedulerService (timer heap in the server process;
+               inProcessSchedulerService.py) for machines without an OS scheduler
+
+The backend is chosen by os.name (Windows -> windows, otherwise inprocess) and
+can be overridden with RINGTONE_SCHEDULER_BACKEND=windows|inprocess.
+"""
+
+import os
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_BACKENDS = ("windows", "inprocess")
+
+
+class SchedulerBackend(ABC):
+    """Operations the server needs from a scheduler (task names are given without the Ringtone_ prefix)"""
+
+    name = "base"
+
+    @abstractmethod
+    def create_scheduled_task(self, task_name: str, ringtone_path: str, time: str, days: List[int]) -> bool:
+        """Create (or replace) a weekly task; days use 0=Sunday ... 6=Saturday"""
+
+    @abstractmethod
+    def delete_scheduled_task(self, task_name: str) -> bool:
+        """Delete a task"""
+
+    @abstractmethod
+    def enable_scheduled_task(self, task_name: str) -> bool:
+        """Enable a task"""
+
+    @abstractmethod
+    def disable_scheduled_task(self, task_name: str) -> bool:
+        """Disable a task"""
+
+    @abstractmethod
+    def get_task_status(self, task_name: str) -> Optional[str]:
+        """Task status (Ready, Running, Disabled, ...) or None if not found"""
+
+    @abstractmethod
+    def list_all_tasks(self, refresh: bool = False) -> List[Dict]:
+        """All ringtone tasks; refresh=True bypasses any cached snapshot"""
+
+    @abstractmethod
+    def player_command(self, ringtone_path: str) -> List[str]:
+        """Command line that plays a ringtone now (started by playback_test_runs)"""
+
+    def start(self):
+        """Background work started with the server (optional)"""
+
+    def snapshot_age(self) -> Optional[float]:
+        """Seconds since the task list was read from the scheduler (None if live)"""
+        return None
+
+
+def scheduler_backend_name() -> str:
+    name = os.environ.get("RINGTONE_SCHEDULER_BACKEND", "").strip().lower()
+    if name in SCHEDULER_BACKENDS:
+        return name
+    if name:
+        logger.warning(f"⚠️ Unknown RINGTONE_SCHEDULER_BACKEND '{name}', using the platform default")
+    return "windows" if os.name == "nt" else "inprocess"
+
+
+def create_scheduler_backend(name: Optional[str] = None) -> SchedulerBackend:
+    """Instantiate the configured scheduler backend"""
+    name = name or scheduler_backend_name()
+    if name == "windows":
+        from taskSchedulerService import WindowsTaskSchedulerService
+        return WindowsTaskSchedulerService()
+    from inProcessSchedulerService import InProcessSchedulerService
+    return InProcessSchedulerService()
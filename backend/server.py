@@ -1,4 +1,15 @@
 # Rules applied
+import time
+# Startup phase timings (exposed via /health for the startup benchmark)
+STARTUP_EPOCH = time.time()
+_startup_t0 = time.perf_counter()
+STARTUP_PHASES = {}
+
+def mark_startup_phase(name, started_at):
+    """Record how long a startup phase took (in milliseconds)"""
+    STARTUP_PHASES[name] = round((time.perf_counter() - started_at) * 1000, 2)
+    return time.perf_counter()
+
 # Import local packages handler first
 try:
     from local_imports import import_required_packages, safe_import
@@ -36,11 +47,15 @@ except ImportError as e:
     else:
         print("⚠️ Flask-CORS not available, CORS functionality may be limited")
 
+import atexit
 import os
 import uuid
-from datetime import datetime
+import mimetypes
+import threading
+from datetime import datetime, timedelta
 import logging
 import json
+from werkzeug.security import safe_join
 
 # Safe hashlib import with fallback
 try:
@@ -61,6 +76,8 @@ except ImportError as e:
     })()
     print("🔄 Using fallback hash function")
 
+_phase_start = mark_startup_phase('imports', _startup_t0)
+
 # Configure ffmpeg path for pydub
 def find_ffmpeg_path():
     """Find FFmpeg installation path dynamically"""
@@ -183,6 +200,25 @@ if ffmpeg_path:
 else:
     logging.warning("FFmpeg not found - MP3 conversion may not work")
 
+_phase_start = mark_startup_phase('ffmpeg_probe', _phase_start)
+
+from frontend_build import (
+    DEFAULT_BUILD_FOLDER, IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL,
+    choose_encoded_variant, is_hashed_asset
+)
+from waveform_peaks import compute_peaks_async, ensure_peaks, find_source_file, read_peaks_index, read_peaks_level
+from playback_daemon import send_request as send_playback_request, start_daemon as start_playback_daemon, stop_daemon as stop_playback_daemon
+from playback_renditions import create_rendition, remove_renditions
+from playback_telemetry import summarize_latency
+from playback_coordinator import QUEUE_MAX_WAIT, load_stats as load_playback_stats
+from playback_backends import PlaybackBackendRegistry
+from schedule_occurrences import occurrence_index, parse_datetime, validate_rrule
+from schedule_store import schedule_store
+from schedule_conflicts import conflict_index
+from playback_test_runs import test_playback_manager
+from task_reconciler import apply_actions as apply_task_actions, desired_tasks, reconcile as reconcile_tasks
+from preview_stream import MAX_PREVIEW_SECONDS, PREVIEW_FORMATS, ffmpeg_available, preview_cache, stream_preview
+
 # Import the Windows Task Scheduler service
 try:
     from taskSchedulerService import task_scheduler_service
@@ -207,6 +243,10 @@ except ImportError as e:
         PYDUB_AVAILABLE = False
         print("❌ pydub not available from system or local packages")
 
+# Scheduler and pydub imports count towards the import phase
+STARTUP_PHASES['imports'] += round((time.perf_counter() - _phase_start) * 1000, 2)
+_phase_start = time.perf_counter()
+
 # Initialize PYDUB_FULLY_WORKING
 PYDUB_FULLY_WORKING = False
 
@@ -240,11 +280,14 @@ if PYDUB_AVAILABLE:
         PYDUB_FULLY_WORKING = False
         logging.warning(f"pydub is available but audio conversion test failed: {e}")
 
+_phase_start = mark_startup_phase('pydub_self_test', _phase_start)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
+# No Flask static route: /static/* belongs to the React build (see serve_frontend)
+app = Flask(__name__, static_folder=None)
 # Rules applied
 # Configure CORS with specific settings for React frontend
 # Allow localhost and network access - use regex pattern for network IPs
@@ -281,7 +324,7 @@ def add_cors_headers(response):
             
             if origin in localhost_origins or re.match(network_ip_pattern, origin):
                 response.headers['Access-Control-Allow-Origin'] = origin
-                response.headers['Vary'] = 'Origin'
+                response.vary.add('Origin')
                 response.headers['Access-Control-Allow-Credentials'] = 'true'
                 response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With'
                 response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
@@ -310,6 +353,8 @@ logger.info(f"WAV_RINGTONES_FOLDER: {os.path.abspath(WAV_RINGTONES_FOLDER)}")
 logger.info(f"MP3_RINGTONES_FOLDER: {os.path.abspath(MP3_RINGTONES_FOLDER)}")
 logger.info(f"UPLOAD_FOLDER: {os.path.abspath(UPLOAD_FOLDER)}")
 
+_phase_start = mark_startup_phase('flask_app', _phase_start)
+
 def convert_wav_to_mp3(wav_path, mp3_path):
     """Convert WAV file to MP3 format"""
     try:
@@ -338,6 +383,8 @@ def health_check():
             'ffmpeg_path': ffmpeg_path,
             'pydub_available': PYDUB_AVAILABLE,
             'pydub_working': PYDUB_FULLY_WORKING,
+            'startup_epoch': STARTUP_EPOCH,
+            'startup_phases': STARTUP_PHASES,
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
@@ -407,6 +454,13 @@ def install_ffmpeg():
         logger.error(f"Error installing FFmpeg: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Cache-Control for ringtone URLs carrying the current ?v= content version
+RINGTONE_IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+def ringtone_content_version(file_stat):
+    """Short content version token for a ringtone file (changes when the file is rewritten)"""
+    return hashlib.md5(f"{file_stat.st_size}:{file_stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
 @app.route('/api/ringtones', methods=['GET'])
 def list_ringtones():
     """List all ringtones in the ringtones folders"""
@@ -443,7 +497,8 @@ def list_ringtones():
                         'modified': datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
                         'file_path': file_path,
                         'format': 'wav',
-                        'folder': 'wav_ringtones'
+                        'folder': 'wav_ringtones',
+                        'version': ringtone_content_version(file_stat)
                     }
                     
                     # Add metadata if available
@@ -487,7 +542,8 @@ def list_ringtones():
                         'modified': datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
                         'file_path': file_path,
                         'format': 'mp3',
-                        'folder': 'mp3_ringtones'
+                        'folder': 'mp3_ringtones',
+                        'version': ringtone_content_version(file_stat)
                     }
                     
                     # Add metadata if available
@@ -827,17 +883,35 @@ def save_ringtone():
 
 @app.route('/api/ringtones/<folder>/<filename>', methods=['GET'])
 def download_ringtone(folder, filename):
-    """Download a ringtone file from the specified folder"""
+    """
+    Download a ringtone file from the specified folder.
+    
+    Query parameters:
+        inline=1: serve for playback (<audio>) instead of as an attachment
+        v=<version>: content version from /api/ringtones; a matching version
+                     makes the response cacheable forever
+    
+    Supports Range requests (206) and conditional GETs (ETag/Last-Modified -> 304).
+    """
     try:
         # Validate folder name for security
         if folder not in ['wav_ringtones', 'mp3_ringtones']:
             return jsonify({'success': False, 'error': 'Invalid folder'}), 400
         
-        file_path = os.path.join(RINGTONES_FOLDER, folder, filename)
-        if not os.path.exists(file_path):
+        file_path = safe_join(RINGTONES_FOLDER, folder, filename)
+        if not file_path or not os.path.isfile(file_path):
             return jsonify({'success': False, 'error': 'File not found'}), 404
         
-        return send_file(file_path, as_attachment=True)
+        inline = request.args.get('inline', '').lower() in ('1', 'true')
+        response = send_file(file_path, as_attachment=not inline, conditional=True, etag=True)
+        
+        # Versioned URLs change whenever the content does; others must revalidate
+        requested_version = request.args.get('v')
+        if requested_version and requested_version == ringtone_content_version(os.stat(file_path)):
+            response.headers['Cache-Control'] = RINGTONE_IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         logger.error(f"Error downloading ringtone: {e}")
@@ -855,8 +929,9 @@ def delete_ringtone(folder, filename):
         if not os.path.exists(file_path):
             return jsonify({'success': False, 'error': 'File not found'}), 404
         
-        # Delete the main file
+        # Delete the main file (and its playback renditions)
         os.remove(file_path)
+        remove_renditions(file_path)
         
         # Try to delete metadata file
         metadata_filename = filename.rsplit('.', 1)[0] + '.json'
@@ -871,6 +946,7 @@ def delete_ringtone(folder, filename):
             mp3_path = os.path.join(MP3_RINGTONES_FOLDER, mp3_filename)
             if os.path.exists(mp3_path):
                 os.remove(mp3_path)
+                remove_renditions(mp3_path)
                 logger.info(f"Corresponding MP3 deleted: {mp3_filename}")
                 
                 # Also delete MP3 metadata
@@ -886,6 +962,7 @@ def delete_ringtone(folder, filename):
             wav_path = os.path.join(WAV_RINGTONES_FOLDER, wav_filename)
             if os.path.exists(wav_path):
                 os.remove(wav_path)
+                remove_renditions(wav_path)
                 logger.info(f"Corresponding WAV deleted: {wav_filename}")
                 
                 # Also delete WAV metadata
@@ -933,19 +1010,172 @@ def upload_audio():
         
         logger.info(f"{file_ext.upper()} audio file uploaded successfully: {file.filename}")
         
+        # Waveform peaks are computed once per upload, off the request thread
+        source_id = compute_peaks_async(UPLOAD_FOLDER, file.filename)
+        
         return jsonify({
             'success': True,
             'message': f'{file_ext.upper()} audio file uploaded successfully',
             'filename': file.filename,
             'file_path': file_path,
             'size': file_stat.st_size,
-            'uploaded': datetime.fromtimestamp(file_stat.st_ctime).isoformat()
+            'uploaded': datetime.fromtimestamp(file_stat.st_ctime).isoformat(),
+            'source_id': source_id,
+            'waveform_url': f'/api/waveform/{source_id}'
         })
         
     except Exception as e:
         logger.error(f"Error uploading audio file: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/waveform/<source_id>', methods=['GET'])
+def get_waveform(source_id):
+    """
+    Waveform peaks for an uploaded source.
+    Without ?level= returns the available zoom levels as JSON; with ?level=N
+    returns that level as binary min/max pairs (see waveform_peaks.py).
+    """
+    try:
+        peaks_path = ensure_peaks(UPLOAD_FOLDER, source_id)
+        if not peaks_path:
+            return jsonify({'success': False, 'error': 'Source not found'}), 404
+        
+        level = request.args.get('level')
+        if level is None:
+            index = read_peaks_index(peaks_path)
+            return jsonify({'success': True, 'source_id': source_id, **index})
+        
+        try:
+            data = read_peaks_level(peaks_path, int(level))
+        except (ValueError, IndexError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        response = make_response(data)
+        response.mimetype = 'application/octet-stream'
+        peaks_stat = os.stat(peaks_path)
+        response.set_etag(f"{source_id}-{level}-{peaks_stat.st_mtime_ns}")
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        logger.error(f"Error getting waveform: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/preview', methods=['GET'])
+def preview_trim():
+    """
+    Stream a trim preview of an uploaded source without saving a ringtone.
+    Query parameters: source=<source_id>, start=<seconds>, end=<seconds>, format=mp3|opus
+    """
+    try:
+        source_id = request.args.get('source', '')
+        fmt = request.args.get('format', 'mp3').lower()
+        try:
+            start = float(request.args.get('start', 0))
+            end = float(request.args.get('end'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'start and end must be numbers (seconds)'}), 400
+        
+        if fmt not in PREVIEW_FORMATS:
+            return jsonify({'success': False, 'error': f"format must be one of {', '.join(PREVIEW_FORMATS)}"}), 400
+        if start < 0 or end <= start:
+            return jsonify({'success': False, 'error': 'Start time must be before end time'}), 400
+        if end - start > MAX_PREVIEW_SECONDS:
+            return jsonify({'success': False, 'error': f'Preview is limited to {MAX_PREVIEW_SECONDS} seconds'}), 400
+        
+        source_path = find_source_file(UPLOAD_FOLDER, source_id)
+        if not source_path:
+            return jsonify({'success': False, 'error': 'Source not found'}), 404
+        
+        mimetype = PREVIEW_FORMATS[fmt]['mimetype']
+        cache_key = (source_id, os.stat(source_path).st_mtime_ns, round(start, 3), round(end, 3), fmt)
+        cached = preview_cache.get(cache_key)
+        if cached is not None:
+            response = make_response(cached)
+            response.mimetype = mimetype
+            response.headers['X-Preview-Cache'] = 'hit'
+            return response
+        
+        if not ffmpeg_available():
+            return jsonify({'success': False, 'error': 'FFmpeg is required for previews'}), 503
+        
+        # Chunked response: playback can start as soon as the first frames are encoded
+        response = app.response_class(stream_preview(source_path, start, end, fmt, cache_key), mimetype=mimetype)
+        response.headers['X-Preview-Cache'] = 'miss'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error streaming preview: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/playback/daemon', methods=['GET'])
+def playback_daemon_status():
+    """Status of the resident playback daemon used by scheduled ringtones"""
+    try:
+        reply = send_playback_request({'cmd': 'ping'})
+        return jsonify({
+            'success': True,
+            'running': bool(reply and reply.get('ok')),
+            'pid': reply.get('pid') if reply else None,
+            'cached_sounds': reply.get('cached') if reply else 0
+        })
+    except Exception as e:
+        logger.error(f"Error checking playback daemon: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/playback/daemon', methods=['POST'])
+def playback_daemon_start():
+    """Start the resident playback daemon if it is not running"""
+    try:
+        running = start_playback_daemon()
+        return jsonify({'success': running, 'running': running})
+    except Exception as e:
+        logger.error(f"Error starting playback daemon: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/playback/latency', methods=['GET'])
+def playback_latency():
+    """
+    Alarm latency telemetry (scheduled time vs audible time) recorded by play_ringtone.py.
+    Optional ?limit=N restricts the summary to the newest N runs.
+    """
+    try:
+        limit = request.args.get('limit', type=int)
+        return jsonify({'success': True, **summarize_latency(limit=limit)})
+    except Exception as e:
+        logger.error(f"Error summarizing playback latency: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/playback/stats', methods=['GET'])
+def playback_stats():
+    """Counters for overlapping alarms: played, mixed (daemon), queued, dropped, failed"""
+    try:
+        return jsonify({'success': True, 'queue_max_wait': QUEUE_MAX_WAIT, **load_playback_stats()})
+    except Exception as e:
+        logger.error(f"Error loading playback stats: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/playback/backends', methods=['GET'])
+def playback_backends():
+    """Playback backend that play_ringtone.py settled on per file format"""
+    try:
+        return jsonify({'success': True, **PlaybackBackendRegistry().describe()})
+    except Exception as e:
+        logger.error(f"Error loading playback backends: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/playback/backends', methods=['DELETE'])
+def reset_playback_backends():
+    """Forget the probe results so the next alarm probes the backends again"""
+    try:
+        PlaybackBackendRegistry().reset()
+        logger.info("✅ Playback backend cache cleared")
+        return jsonify({'success': True})
+    except Exception as e:
+        logger.error(f"Error clearing playback backends: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # Windows Task Scheduler endpoints
 @app.route('/api/task-scheduler/status', methods=['GET'])
 def task_scheduler_status():
@@ -954,7 +1184,10 @@ def task_scheduler_status():
         return jsonify({
             'success': True,
             'available': TASK_SCHEDULER_AVAILABLE,
-            'message': 'Windows Task Scheduler service is available' if TASK_SCHEDULER_AVAILABLE else 'Windows Task Scheduler service is not available'
+            'backend': task_scheduler_service.name if TASK_SCHEDULER_AVAILABLE else None,
+            'message': ('Windows Task Scheduler service is available' if task_scheduler_service.name == 'windows'
+                        else 'In-process scheduler is available') if TASK_SCHEDULER_AVAILABLE
+                       else 'Windows Task Scheduler service is not available'
         })
     except Exception as e:
         logger.error(f"Error checking task scheduler status: {e}")
@@ -997,6 +1230,9 @@ def create_scheduled_task():
         # Use the resolved path for the task creation
         ringtone_path = resolved_path
         
+        # Decode once now so the alarm plays mixer-ready PCM (off the request thread)
+        threading.Thread(target=create_rendition, args=(ringtone_path,), name='playback-rendition', daemon=True).start()
+        
         # Create the scheduled task
         success = task_scheduler_service.create_scheduled_task(task_name, ringtone_path, time, days)
         
@@ -1112,7 +1348,11 @@ def disable_scheduled_task():
 
 @app.route('/api/task-scheduler/test', methods=['POST'])
 def test_ringtone_playback():
-    """Test playing a ringtone immediately"""
+    """
+    Start playing a ringtone immediately and return its playback id without
+    waiting for it. A second request for a ringtone that is still being tested
+    returns the running playback (deduplicated: true).
+    """
     try:
         if not TASK_SCHEDULER_AVAILABLE:
             return jsonify({'success': False, 'error': 'Windows Task Scheduler service is not available'}), 503
@@ -1127,72 +1367,104 @@ def test_ringtone_playback():
         if not os.path.exists(ringtone_path):
             return jsonify({'success': False, 'error': 'Ringtone file not found'}), 404
         
-        # Test playing the ringtone
-        success = task_scheduler_service.test_ringtone_playback(ringtone_path)
-        
-        if success:
-            logger.info(f"✅ Tested ringtone playback: {ringtone_path}")
-            return jsonify({
-                'success': True,
-                'message': 'Ringtone test played successfully',
-                'ringtone_path': ringtone_path
-            })
-        else:
-            return jsonify({'success': False, 'error': 'Failed to play ringtone test'}), 500
+        playback, started = test_playback_manager.start(
+            ringtone_path, task_scheduler_service.player_command(ringtone_path) + ['--test'])
+        return jsonify({
+            'success': True,
+            'message': 'Ringtone test started' if started else 'Ringtone test already playing',
+            'deduplicated': not started,
+            **playback
+        }), 202
             
     except Exception as e:
         logger.error(f"Error testing ringtone playback: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/task-scheduler/test/<playback_id>', methods=['GET'])
+def get_test_playback(playback_id):
+    """Status of a test playback: playing, stopping, finished, stopped or failed"""
+    playback = test_playback_manager.get(playback_id)
+    if playback is None:
+        return jsonify({'success': False, 'error': 'Unknown playback id'}), 404
+    return jsonify({'success': True, **playback})
+
+@app.route('/api/task-scheduler/test/<playback_id>/stop', methods=['POST'])
+def stop_test_playback(playback_id):
+    """Stop a running test playback"""
+    try:
+        playback = test_playback_manager.stop(playback_id)
+        if playback is None:
+            return jsonify({'success': False, 'error': 'Unknown playback id'}), 404
+        return jsonify({'success': True, **playback})
+    except Exception as e:
+        logger.error(f"Error stopping test playback: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/task-scheduler/list', methods=['GET'])
 def list_scheduled_tasks():
-    """List all ringtone scheduler tasks"""
+    """
+    List all ringtone scheduler tasks (Windows: from the cached task registry).
+    refresh=1 queries schtasks before answering.
+    """
     try:
         if not TASK_SCHEDULER_AVAILABLE:
             return jsonify({'success': False, 'error': 'Windows Task Scheduler service is not available'}), 503
         
         # List all tasks
-        tasks = task_scheduler_service.list_all_tasks()
+        tasks = task_scheduler_service.list_all_tasks(refresh=request.args.get('refresh') == '1')
+        age = task_scheduler_service.snapshot_age()
         
         logger.info(f"✅ Listed {len(tasks)} scheduled tasks")
         return jsonify({
             'success': True,
             'tasks': tasks,
-            'count': len(tasks)
+            'count': len(tasks),
+            'age_seconds': round(age, 1) if age is not None else None
         })
             
     except Exception as e:
         logger.error(f"Error listing scheduled tasks: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
-# Schedule data management endpoints (for cross-origin localStorage sync)
-SCHEDULES_FILE = os.path.join(os.path.dirname(__file__), 'schedules.json')
-
-def load_schedules_from_file():
-    """Load schedule data from file"""
+@app.route('/api/task-scheduler/reconcile', methods=['POST'])
+def reconcile_scheduled_tasks():
+    """
+    Bring the scheduler's Ringtone_* tasks in line with the device schedules.
+    Body (optional): {"dry_run": false, "delete_orphans": false}
+    Orphan tasks are deleted only when delete_orphans is true, as at startup.
+    """
     try:
-        if os.path.exists(SCHEDULES_FILE):
-            with open(SCHEDULES_FILE, 'r') as f:
-                return json.load(f)
-        return []
+        if not TASK_SCHEDULER_AVAILABLE:
+            return jsonify({'success': False, 'error': 'Windows Task Scheduler service is not available'}), 503
+        
+        data = request.get_json(silent=True) or {}
+        report = reconcile_tasks(task_scheduler_service, schedule_store.all(),
+                                 dry_run=bool(data.get('dry_run', False)),
+                                 delete_orphans=bool(data.get('delete_orphans', False)))
+        return jsonify({'success': report['failed'] == 0, **report})
     except Exception as e:
-        logger.error(f"Error loading schedules from file: {e}")
-        return []
+        logger.error(f"Error reconciling scheduled tasks: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
-def save_schedules_to_file(schedules):
-    """Save schedule data to file"""
+def reconcile_tasks_at_startup():
+    """
+    Fix drift (tasks deleted by hand, failed creates, ...) once when the server starts.
+    Orphan tasks are only reported; deleting them needs an explicit POST /api/task-scheduler/reconcile with delete_orphans: true.
+    """
     try:
-        with open(SCHEDULES_FILE, 'w') as f:
-            json.dump(schedules, f, indent=2)
-        logger.info(f"💾 Saved {len(schedules)} schedules to file")
+        schedules = schedule_store.all()
+        reconcile_tasks(task_scheduler_service, schedules, delete_orphans=False)
     except Exception as e:
-        logger.error(f"Error saving schedules to file: {e}")
+        logger.error(f"Error reconciling scheduled tasks at startup: {e}")
+
+# Schedule data management endpoints (for cross-origin localStorage sync)
+# Schedules live in schedule_store (schedules.json + append-only journal, see schedule_store.py)
 
 @app.route('/api/schedules', methods=['GET'])
 def list_schedules():
     """List all schedule data stored on the server"""
     try:
-        schedules = load_schedules_from_file()
+        schedules = schedule_store.all()
         return jsonify({
             'success': True,
             'schedules': schedules,
@@ -1210,48 +1482,260 @@ def save_schedule():
         if not data:
             return jsonify({'success': False, 'error': 'No schedule data provided'}), 400
         
-        schedules = load_schedules_from_file()
+        # Optional full RRULE (e.g. "FREQ=MONTHLY;BYMONTHDAY=1") instead of the weekly days list
+        if data.get('rrule'):
+            rrule_error = validate_rrule(data['rrule'])
+            if rrule_error:
+                return jsonify({'success': False, 'error': f'Invalid rrule: {rrule_error}'}), 400
         
-        # Check if schedule already exists (by ID)
+        # Upsert by ID (one journal line instead of rewriting schedules.json)
         schedule_id = data.get('id')
         if schedule_id:
-            # Update existing schedule
-            existing_index = next((i for i, s in enumerate(schedules) if s.get('id') == schedule_id), -1)
-            if existing_index >= 0:
-                schedules[existing_index] = data
-                logger.info(f"📅 Updated existing schedule: {schedule_id}")
-            else:
-                schedules.append(data)
+            if schedule_store.upsert(data):
                 logger.info(f"📅 Added new schedule: {schedule_id}")
+            else:
+                logger.info(f"📅 Updated existing schedule: {schedule_id}")
         else:
             # Add new schedule with generated ID
             data['id'] = str(uuid.uuid4())
-            schedules.append(data)
+            schedule_store.upsert(data)
             logger.info(f"📅 Added new schedule with generated ID: {data['id']}")
         
-        save_schedules_to_file(schedules)
+        # Overlapping schedules are saved anyway, but reported so the UI can warn
+        try:
+            conflicts = conflict_index.conflicts_for(data)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Could not check schedule {data['id']} for conflicts: {e}")
+            conflicts = []
+        if conflicts:
+            logger.warning(f"⚠️ Schedule {data['id']} overlaps {len({c['schedule_id'] for c in conflicts})} other schedules")
         
         return jsonify({
             'success': True,
             'message': 'Schedule data saved successfully',
-            'schedule_id': data.get('id')
+            'schedule_id': data.get('id'),
+            'conflicts': conflicts
         })
     except Exception as e:
         logger.error(f"Error saving schedule: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Fields that change the OS task of a device schedule (isActive only toggles it)
+TASK_FIELDS = ('ringtoneFilePath', 'ringtoneUrl', 'time', 'days')
+BATCH_OPERATIONS = ('create', 'update', 'upsert', 'delete')
+
+def is_device_schedule(schedule):
+    return bool(schedule) and schedule.get('scheduleSource') == 'device'
+
+def apply_schedule_operation(schedules, positions, operation):
+    """
+    Apply one batch operation to the in-memory schedule list.
+    positions maps schedule id -> list index and is kept up to date.
+    
+    Returns:
+        (schedule_id, error message or None)
+    """
+    op = operation.get('op')
+    if op not in BATCH_OPERATIONS:
+        return operation.get('id'), f"Unknown operation: {op}"
+    
+    if op == 'delete':
+        schedule_id = operation.get('id')
+        if schedule_id not in positions:
+            return schedule_id, f'Schedule {schedule_id} not found'
+        # Tombstone now, compact once at the end (keeps positions valid)
+        schedules[positions.pop(schedule_id)] = None
+        return schedule_id, None
+    
+    schedule = operation.get('schedule')
+    if not isinstance(schedule, dict):
+        return operation.get('id'), 'schedule object is required'
+    schedule = dict(schedule)
+    schedule_id = schedule.get('id') or operation.get('id')
+    if schedule.get('rrule'):
+        rrule_error = validate_rrule(schedule['rrule'])
+        if rrule_error:
+            return schedule_id, f'Invalid rrule: {rrule_error}'
+    
+    if op == 'create':
+        if schedule_id in positions:
+            return schedule_id, f'Schedule {schedule_id} already exists'
+        schedule_id = schedule_id or str(uuid.uuid4())
+    elif op == 'update':
+        if schedule_id not in positions:
+            return schedule_id, f'Schedule {schedule_id} not found'
+        # Partial update: merge onto the stored schedule
+        schedule = {**schedules[positions[schedule_id]], **schedule}
+    elif not schedule_id:
+        schedule_id = str(uuid.uuid4())
+    
+    schedule['id'] = schedule_id
+    if schedule_id in positions:
+        schedules[positions[schedule_id]] = schedule
+    else:
+        positions[schedule_id] = len(schedules)
+        schedules.append(schedule)
+    return schedule_id, None
+
+def plan_task_changes(before, after):
+    """
+    Coalesce the OS task changes of a batch: one action per schedule id,
+    derived from its state before and after all operations.
+    
+    Returns:
+        dict schedule_id -> 'create' | 'create_disabled' | 'enable' | 'disable' | 'delete'
+    """
+    plan = {}
+    for schedule_id in set(before) | set(after):
+        old, new = before.get(schedule_id), after.get(schedule_id)
+        if not is_device_schedule(new):
+            if is_device_schedule(old):
+                plan[schedule_id] = 'delete'
+            continue
+        active = new.get('isActive', True)
+        if not is_device_schedule(old) or any(old.get(field) != new.get(field) for field in TASK_FIELDS):
+            plan[schedule_id] = 'create' if active else 'create_disabled'
+        elif old.get('isActive', True) != active:
+            plan[schedule_id] = 'enable' if active else 'disable'
+    return plan
+
+def apply_task_changes(plan, schedules_by_id):
+    """Run the planned OS task changes; returns schedule_id -> (action, error or None)"""
+    actions = [{'schedule_id': schedule_id, 'action': action} for schedule_id, action in plan.items()]
+    apply_task_actions(task_scheduler_service, actions, desired_tasks(schedules_by_id.values()))
+    return {action['schedule_id']: (action['action'], action.get('error')) for action in actions}
+
+@app.route('/api/schedules/batch', methods=['POST'])
+def batch_schedules():
+    """
+    Apply many schedule operations under one store lock with one journal write.
+    
+    Body: {"operations": [{"op": "create" | "update" | "upsert", "schedule": {...}},
+                          {"op": "delete", "id": "..."}],
+           "atomic": false,      # true: write nothing if any operation fails
+           "sync_tasks": true}   # also apply the coalesced OS task changes of device schedules
+    """
+    try:
+        data = request.get_json()
+        operations = data.get('operations') if isinstance(data, dict) else None
+        if not isinstance(operations, list):
+            return jsonify({'success': False, 'error': 'operations list is required'}), 400
+        atomic = bool(data.get('atomic', False))
+        sync_tasks = bool(data.get('sync_tasks', True)) and TASK_SCHEDULER_AVAILABLE
+        
+        with schedule_store.locked():
+            schedules = schedule_store.all()
+            before = {schedule.get('id'): schedule for schedule in schedules}
+            positions = {schedule.get('id'): index for index, schedule in enumerate(schedules)}
+            
+            results = []
+            for index, operation in enumerate(operations):
+                if not isinstance(operation, dict):
+                    results.append({'index': index, 'success': False, 'error': 'operation must be an object'})
+                    continue
+                schedule_id, error = apply_schedule_operation(schedules, positions, operation)
+                result = {'index': index, 'op': operation.get('op'), 'id': schedule_id, 'success': error is None}
+                if error:
+                    result['error'] = error
+                results.append(result)
+            
+            failed = sum(1 for result in results if not result['success'])
+            if atomic and failed:
+                return jsonify({'success': False, 'error': f'{failed} operations failed, nothing was saved',
+                                'results': results, 'failed': failed}), 400
+            
+            # Operations replace schedule dicts and never mutate stored ones, so identity marks changes
+            schedules = [schedule for schedule in schedules if schedule is not None]
+            after = {schedule.get('id'): schedule for schedule in schedules}
+            schedule_store.apply(puts=[schedule for schedule_id, schedule in after.items() if before.get(schedule_id) is not schedule],
+                                 deletes=[schedule_id for schedule_id in before if schedule_id not in after])
+        
+        task_outcomes = {}
+        if sync_tasks:
+            task_outcomes = apply_task_changes(plan_task_changes(before, after), after)
+            # Report the (single) task change on the last operation of each schedule
+            reported = set()
+            for result in reversed(results):
+                outcome = task_outcomes.get(result.get('id'))
+                if result['success'] and outcome and result['id'] not in reported:
+                    reported.add(result['id'])
+                    result['task'] = outcome[0]
+                    if outcome[1]:
+                        result['task_error'] = outcome[1]
+        
+        logger.info(f"📦 Applied schedule batch: {len(operations)} operations, {failed} failed, "
+                    f"{len(task_outcomes)} task changes")
+        return jsonify({
+            'success': failed == 0,
+            'results': results,
+            'failed': failed,
+            'count': len(schedules),
+            'task_changes': len(task_outcomes)
+        })
+    except Exception as e:
+        logger.error(f"Error applying schedule batch: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Upper bound for /api/schedules/upcoming?limit=
+MAX_UPCOMING_LIMIT = 1000
+
+@app.route('/api/schedules/upcoming', methods=['GET'])
+def upcoming_schedules():
+    """
+    Occurrences of active schedules in a time window, earliest first.
+    from/to: ISO timestamps (default: now .. now + 24h); limit: max results (default 100).
+    """
+    try:
+        try:
+            window_start = parse_datetime(request.args['from']) if request.args.get('from') else datetime.now()
+            window_end = parse_datetime(request.args['to']) if request.args.get('to') else window_start + timedelta(hours=24)
+            limit = min(int(request.args.get('limit', 100)), MAX_UPCOMING_LIMIT)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': f'Invalid parameter: {e}'}), 400
+        if window_end < window_start or limit < 1:
+            return jsonify({'success': False, 'error': 'to must not be before from and limit must be positive'}), 400
+        
+        schedules = schedule_store.all()
+        occurrences = occurrence_index.upcoming(schedules, window_start, window_end, limit)
+        return jsonify({
+            'success': True,
+            'from': window_start.isoformat(timespec='seconds'),
+            'to': window_end.isoformat(timespec='seconds'),
+            'occurrences': [
+                {
+                    'time': when.isoformat(timespec='seconds'),
+                    'schedule_id': schedule.get('id'),
+                    'ringtone_id': schedule.get('ringtoneId'),
+                    'ringtone_name': schedule.get('ringtoneName'),
+                    'schedule_source': schedule.get('scheduleSource'),
+                }
+                for when, schedule in occurrences
+            ],
+            'count': len(occurrences)
+        })
+    except Exception as e:
+        logger.error(f"Error listing upcoming schedules: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/schedules/conflicts', methods=['GET'])
+def schedule_conflicts():
+    """Pairs of active weekly schedules whose ringtones play at the same time"""
+    try:
+        conflicts = conflict_index.report()
+        return jsonify({
+            'success': True,
+            'conflicts': conflicts,
+            'count': len(conflicts)
+        })
+    except Exception as e:
+        logger.error(f"Error listing schedule conflicts: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/schedules/<schedule_id>', methods=['DELETE'])
 def delete_schedule(schedule_id):
     """Delete schedule data from server"""
     try:
-        schedules = load_schedules_from_file()
-        
-        # Find and remove the schedule
-        original_count = len(schedules)
-        schedules = [s for s in schedules if s.get('id') != schedule_id]
-        
-        if len(schedules) < original_count:
-            save_schedules_to_file(schedules)
+        if schedule_store.delete(schedule_id):
             logger.info(f"🗑️ Deleted schedule: {schedule_id}")
             return jsonify({
                 'success': True,
@@ -1267,14 +1751,95 @@ def delete_schedule(schedule_id):
         logger.error(f"Error deleting schedule: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Production frontend: serve the prebuilt React bundle (npm run build) from /
+FRONTEND_BUILD_FOLDER = os.environ.get('RINGTONE_FRONTEND_BUILD', DEFAULT_BUILD_FOLDER)
+
+def send_frontend_file(relative_path):
+    """Send a build file, preferring a precompressed variant, with cache headers"""
+    file_path = safe_join(FRONTEND_BUILD_FOLDER, relative_path)
+    send_path, content_encoding = choose_encoded_variant(file_path, request.headers.get('Accept-Encoding'))
+    mimetype = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+    
+    response = send_file(send_path, mimetype=mimetype, conditional=True, etag=True)
+    response.vary.add('Accept-Encoding')
+    if content_encoding:
+        response.headers['Content-Encoding'] = content_encoding
+    
+    # Hashed assets never change under the same URL; everything else revalidates (ETag)
+    if is_hashed_asset(relative_path):
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
+
+@app.route('/', defaults={'path': ''}, methods=['GET'])
+@app.route('/<path:path>', methods=['GET'])
+def serve_frontend(path):
+    """Serve the production React build with SPA fallback to index.html"""
+    try:
+        # Unknown API routes must not fall back to the SPA; known ones called
+        # with the wrong method (this GET-only catch-all matched instead) get 405
+        if path.startswith('api/'):
+            allowed = set(app.url_map.bind('').allowed_methods(request.path)) - {'GET', 'HEAD', 'OPTIONS'}
+            if allowed:
+                response = jsonify({'success': False, 'error': 'Method not allowed'})
+                response.headers['Allow'] = ', '.join(sorted(allowed | {'OPTIONS'}))
+                return response, 405
+            return jsonify({'success': False, 'error': 'Not found'}), 404
+        
+        index_path = os.path.join(FRONTEND_BUILD_FOLDER, 'index.html')
+        if not os.path.exists(index_path):
+            return jsonify({
+                'success': False,
+                'error': 'Frontend build not found. Run "npm run build" or use the development server on port 3000.'
+            }), 404
+        
+        file_path = safe_join(FRONTEND_BUILD_FOLDER, path) if path else None
+        if file_path and os.path.isfile(file_path):
+            return send_frontend_file(path)
+        
+        # Client-side routes (no file extension) get the app shell
+        if not path or '.' not in os.path.basename(path):
+            return send_frontend_file('index.html')
+        
+        return jsonify({'success': False, 'error': 'File not found'}), 404
+    except Exception as e:
+        logger.error(f"Error serving frontend: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def parse_server_args(argv=None):
+    """Command line options for running the server"""
+    import argparse
+    from production_server import DEFAULT_THREADS, DEFAULT_CONNECTION_LIMIT, DEFAULT_CHANNEL_TIMEOUT, DEFAULT_KEEPALIVE_TIMEOUT
+    
+    parser = argparse.ArgumentParser(description='Ringtone Creator backend server')
+    parser.add_argument('--production', action='store_true',
+                        help='Serve with a multi-threaded production WSGI server (no reloader/debugger)')
+    parser.add_argument('--host', default='0.0.0.0', help='Interface to bind')
+    # Port can be overridden (used by the startup benchmark to avoid clashing with a running app)
+    parser.add_argument('--port', type=int, default=int(os.environ.get('RINGTONE_BACKEND_PORT', '5000')),
+                        help='Port to listen on (default: $RINGTONE_BACKEND_PORT or 5000)')
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS, help='Worker threads (production)')
+    parser.add_argument('--connection-limit', type=int, default=DEFAULT_CONNECTION_LIMIT,
+                        help='Maximum open connections (production)')
+    parser.add_argument('--channel-timeout', type=int, default=DEFAULT_CHANNEL_TIMEOUT,
+                        help='Seconds before a stalled request is closed (production)')
+    parser.add_argument('--keepalive-timeout', type=float, default=DEFAULT_KEEPALIVE_TIMEOUT,
+                        help='Seconds an idle keep-alive connection is kept open (production, pooled server)')
+    parser.add_argument('--no-waitress', action='store_true',
+                        help='Use the built-in pooled server even if waitress is installed (production)')
+    return parser.parse_args(argv)
+
 if __name__ == '__main__':
+    args = parse_server_args()
+    port = args.port
     try:
         logger.info(f"Starting Ringtone Creator Backend Server")
         logger.info(f"RINGTONES_FOLDER: {RINGTONES_FOLDER}")
         logger.info(f"WAV_RINGTONES_FOLDER: {WAV_RINGTONES_FOLDER}")
         logger.info(f"MP3_RINGTONES_FOLDER: {MP3_RINGTONES_FOLDER}")
         logger.info(f"UPLOAD_FOLDER: {UPLOAD_FOLDER}")
-        logger.info("Server will be available at http://localhost:5000")
+        logger.info(f"Server will be available at http://localhost:{port}")
         logger.info(f"PYDUB_AVAILABLE: {PYDUB_AVAILABLE}")
         logger.info(f"PYDUB_FULLY_WORKING: {PYDUB_FULLY_WORKING}")
         
@@ -1289,7 +1854,30 @@ if __name__ == '__main__':
         else:
             logger.info("✅ MP3 conversion enabled - pydub is available and working")
         
-        app.run(host='0.0.0.0', port=5000, debug=True)
+        # Keep the playback daemon warm so scheduled alarms skip interpreter/mixer startup.
+        # Only the serving process (not the reloader's parent) starts it, and stops it on exit.
+        serving_process = args.production or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+        if serving_process and os.environ.get('RINGTONE_PLAYBACK_DAEMON', '1') != '0':
+            atexit.register(stop_playback_daemon)
+            threading.Thread(target=start_playback_daemon, name='playback-daemon-start', daemon=True).start()
+        
+        # Start the scheduler backend (Windows: warm the task registry; in-process: the timer thread),
+        # then reconcile its tasks with the schedule store once in the background.
+        # With the debug reloader only the serving child process runs it.
+        if TASK_SCHEDULER_AVAILABLE and serving_process:
+            task_scheduler_service.start()
+            if os.environ.get('RINGTONE_RECONCILE_ON_START', '1') != '0':
+                threading.Thread(target=reconcile_tasks_at_startup, name='task-reconcile', daemon=True).start()
+        
+        if args.production:
+            from production_server import serve_production
+            serve_production(app, host=args.host, port=port, threads=args.threads,
+                             connection_limit=args.connection_limit,
+                             channel_timeout=args.channel_timeout,
+                             keepalive_timeout=args.keepalive_timeout,
+                             use_waitress=not args.no_waitress)
+        else:
+            app.run(host=args.host, port=port, debug=True)
     except Exception as e:
         logger.error(f"Failed to start server: {e}")
         exit(1)
@@ -1,26 +1,259 @@
 # Rules applied
 import subprocess
+import csv
+import io
 import json
 import os
 import sys
+import tempfile
+import threading
+import time as time_module
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 
+from schedulerBackend import SchedulerBackend, create_scheduler_backend
+from task_xml import build_task_xml, normalize_time, player_arguments, ringtone_task_name, task_triggers, write_task_xml
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class WindowsTaskSchedulerService:
+TASK_PREFIX = "Ringtone_"
+
+# Schedule id -> trigger of its ringtone task (see TaskTriggerMap)
+TRIGGER_MAP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scheduled_task_triggers.json")
+
+# Seconds a task snapshot is served before a background refresh is started
+TASK_REGISTRY_TTL = float(os.environ.get('RINGTONE_TASK_REGISTRY_TTL', '30'))
+
+# Columns of `schtasks /query /fo csv /v`: English header name -> position
+# (positions are used when the headers are localized)
+SCHTASKS_CSV_COLUMNS = {
+    "TaskName": 1,
+    "Next Run Time": 2,
+    "Status": 3,
+    "Last Run Time": 5,
+    "Last Result": 6,
+    "Task To Run": 8,
+    "Scheduled Task State": 11,
+}
+
+
+def parse_schtasks_csv(output: str) -> Dict[str, Dict]:
+    """
+    Parse verbose CSV from `schtasks /query /fo csv /v` into our tasks keyed by full name.
+    
+    schtasks repeats the header row for every task folder and writes one row
+    per trigger, so header rows are skipped and tasks are de-duplicated.
+    """
+    rows = list(csv.reader(io.StringIO(output)))
+    rows = [row for row in rows if row]
+    if not rows:
+        return {}
+    
+    header = rows[0]
+    columns = {
+        name: header.index(name) if name in header else position
+        for name, position in SCHTASKS_CSV_COLUMNS.items()
+    }
+    
+    def column(row, name):
+        index = columns[name]
+        return row[index].strip() if index < len(row) else ""
+    
+    tasks = {}
+    for row in rows[1:]:
+        if row == header:
+            continue
+        full_name = column(row, "TaskName").lstrip("\\")
+        if not full_name.startswith(TASK_PREFIX) or full_name in tasks:
+            continue
+        status = column(row, "Status") or "Unknown"
+        state = column(row, "Scheduled Task State")
+        tasks[full_name] = {
+            "name": full_name[len(TASK_PREFIX):],
+            "full_name": full_name,
+            "status": status,
+            "enabled": state.lower() != "disabled" if state else status != "Disabled",
+            "next_run": column(row, "Next Run Time"),
+            "last_run": column(row, "Last Run Time"),
+            "last_result": column(row, "Last Result"),
+            "task_to_run": column(row, "Task To Run"),
+        }
+    return tasks
+
+
+class TaskRegistry:
+    """
+    In-memory snapshot of our scheduled tasks, filled by one verbose schtasks query.
+    
+    Readers get the cached snapshot; once it is older than the TTL a single
+    background refresh is started (the stale snapshot is served meanwhile).
+    Our own create/delete/enable/disable calls update the snapshot directly
+    and mark it stale so the next read confirms the change with schtasks.
+    """
+    
+    def __init__(self, query, ttl: float = TASK_REGISTRY_TTL):
+        self._query = query
+        self.ttl = ttl
+        self._tasks: Dict[str, Dict] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        # Bumped by our own changes; a query that started before one is discarded
+        self._generation = 0
+    
+    def refresh(self) -> bool:
+        """Query schtasks now and replace the snapshot"""
+        with self._lock:
+            generation = self._generation
+        success, tasks = self._query()
+        with self._lock:
+            self._refreshing = False
+            if generation == self._generation:
+                # A failed query keeps the old snapshot and is retried after the TTL
+                if success:
+                    self._tasks = tasks
+                self._loaded_at = time_module.monotonic()
+        return success
+    
+    def refresh_async(self):
+        """Start a background refresh unless one is already running"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="task-registry-refresh", daemon=True).start()
+    
+    def tasks(self) -> Dict[str, Dict]:
+        """Current snapshot (queried synchronously only the very first time)"""
+        if self._loaded_at is None:
+            self.refresh()
+        elif time_module.monotonic() - self._loaded_at > self.ttl:
+            self.refresh_async()
+        with self._lock:
+            return {name: dict(info) for name, info in self._tasks.items()}
+    
+    def get(self, full_name: str) -> Optional[Dict]:
+        return self.tasks().get(full_name)
+    
+    def update(self, full_name: str, **fields):
+        """Apply our own change to the snapshot and mark it stale"""
+        with self._lock:
+            entry = self._tasks.setdefault(full_name, {
+                "name": full_name[len(TASK_PREFIX):],
+                "full_name": full_name,
+                "status": "Unknown",
+            })
+            entry.update(fields)
+            self._expire()
+    
+    def remove(self, full_name: str):
+        with self._lock:
+            self._tasks.pop(full_name, None)
+            self._expire()
+    
+    def _expire(self):
+        self._generation += 1
+        if self._loaded_at is not None:
+            self._loaded_at = float("-inf")
+    
+    def age(self) -> Optional[float]:
+        if self._loaded_at is None or self._loaded_at == float("-inf"):
+            return None
+        return time_module.monotonic() - self._loaded_at
+
+
+class TaskTriggerMap:
+    """
+    Persisted schedule id -> trigger (task, ringtone_path, time, days, enabled).
+    
+    Task Scheduler only holds the per-ringtone tasks with their triggers; this
+    map is how schedule-level calls find and rebuild the task they belong to.
+    """
+    
+    def __init__(self, path: str = TRIGGER_MAP_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._schedules: Dict[str, Dict] = {}
+        self._by_task: Dict[str, set] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for schedule_id, entry in json.load(f).get("schedules", {}).items():
+                    self._index(schedule_id, entry)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.error(f"❌ Could not read task trigger map, starting empty: {e}")
+    
+    def _index(self, schedule_id: str, entry: Dict):
+        self._schedules[schedule_id] = entry
+        self._by_task.setdefault(entry["task"], set()).add(schedule_id)
+    
+    def _unindex(self, schedule_id: str):
+        entry = self._schedules.pop(schedule_id, None)
+        if entry:
+            members = self._by_task.get(entry["task"], set())
+            members.discard(schedule_id)
+            if not members:
+                self._by_task.pop(entry["task"], None)
+        return entry
+    
+    def get(self, schedule_id: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._schedules.get(schedule_id)
+            return dict(entry) if entry else None
+    
+    def set(self, schedule_id: str, entry: Optional[Dict]):
+        """Store (or with None, remove) a schedule's trigger"""
+        with self._lock:
+            self._unindex(schedule_id)
+            if entry:
+                self._index(schedule_id, dict(entry))
+    
+    def members(self, task: str) -> Dict[str, Dict]:
+        """Triggers of one ringtone task, keyed by schedule id"""
+        with self._lock:
+            return {schedule_id: dict(self._schedules[schedule_id]) for schedule_id in self._by_task.get(task, ())}
+    
+    def items(self) -> List[Tuple[str, Dict]]:
+        with self._lock:
+            return [(schedule_id, dict(entry)) for schedule_id, entry in self._schedules.items()]
+    
+    def task_names(self) -> set:
+        with self._lock:
+            return set(self._by_task)
+    
+    def save(self):
+        with self._lock:
+            data = {"schedules": self._schedules}
+            tmp_file = self.path + ".tmp"
+            try:
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, sort_keys=True)
+                os.replace(tmp_file, self.path)
+            except OSError as e:
+                logger.error(f"❌ Could not save task trigger map: {e}")
+
+
+class WindowsTaskSchedulerService(SchedulerBackend):
     """
     Service to manage Windows Task Scheduler tasks for ringtone scheduling.
     This service creates, updates, deletes, and manages Windows scheduled tasks.
     """
     
+    name = "windows"
+    
     def __init__(self):
         self.task_folder = ""  # Use root folder instead of custom folder
         self.ringtone_player_script = self._get_ringtone_player_script_path()
         self.python_exe = self._find_python_executable()
+        self.registry = TaskRegistry(self._query_tasks)
+        self.triggers = TaskTriggerMap()
+        self._task_locks: Dict[str, threading.Lock] = {}
+        self._task_locks_guard = threading.Lock()
         # No need to ensure task folder exists for root folder
     
     def _get_ringtone_player_script_path(self) -> str:
@@ -81,7 +314,7 @@ class WindowsTaskSchedulerService:
     
     
     
-    def _run_schtasks_command(self, args: List[str]) -> Tuple[bool, str, str]:
+    def _run_schtasks_command(self, args: List[str], log_output: bool = True) -> Tuple[bool, str, str]:
         """Run a schtasks command and return success status, stdout, and stderr."""
         try:
             cmd = ["schtasks"] + args
@@ -98,7 +331,7 @@ class WindowsTaskSchedulerService:
             success = result.returncode == 0
             logger.info(f"📋 Command result - Success: {success}, Return code: {result.returncode}")
             
-            if result.stdout:
+            if result.stdout and log_output:
                 logger.info(f"📤 stdout: {result.stdout}")
             if result.stderr:
                 logger.info(f"📤 stderr: {result.stderr}")
@@ -113,12 +346,86 @@ class WindowsTaskSchedulerService:
             return False, "", str(e)
     
     
+    @contextmanager
+    def _locked_tasks(self, tasks: Iterable[str]):
+        """Hold the locks of some ringtone tasks (taken in sorted order, so callers cannot deadlock)"""
+        with ExitStack() as stack:
+            for task in sorted(set(tasks)):
+                with self._task_locks_guard:
+                    lock = self._task_locks.setdefault(task, threading.Lock())
+                stack.enter_context(lock)
+            yield
+    
+    def _apply_ringtone_task(self, task: str) -> bool:
+        """
+        Register one ringtone task from its current triggers with `schtasks /create /xml`,
+        or delete it once no schedule uses it. The caller holds the task's lock.
+        """
+        full_name = f"{TASK_PREFIX}{task}"
+        members = self.triggers.members(task)
+        if not members:
+            success, stdout, stderr = self._run_schtasks_command(["/delete", "/tn", full_name, "/f"])
+            self.registry.remove(full_name)
+            if not success:
+                # Nothing refers to it any more; a leftover task is removed by the next reconcile
+                logger.warning(f"⚠️ Could not delete unused ringtone task {full_name}: {stderr}")
+            return True
+        
+        ringtone_path = next(iter(members.values()))["ringtone_path"]
+        triggers = list(members.values())
+        xml = build_task_xml(full_name, ringtone_path, triggers, self.python_exe, self.ringtone_player_script)
+        fd, xml_file = tempfile.mkstemp(prefix="ringtone_task_", suffix=".xml")
+        os.close(fd)
+        try:
+            write_task_xml(xml_file, xml)
+            success, stdout, stderr = self._run_schtasks_command(["/create", "/tn", full_name, "/xml", xml_file, "/f"])
+        finally:
+            try:
+                os.remove(xml_file)
+            except OSError:
+                pass
+        
+        if not success:
+            logger.error(f"❌ Failed to register ringtone task {full_name}: {stderr}")
+            return False
+        enabled = any(trigger["enabled"] for trigger in triggers)
+        arguments = player_arguments(self.ringtone_player_script, ringtone_path, [trigger["time"] for trigger in triggers])
+        self.registry.update(full_name, status="Ready" if enabled else "Disabled", enabled=enabled,
+                             task_to_run=f"{self.python_exe} {arguments}")
+        return True
+    
+    def _update_trigger(self, task_name: str, entry: Optional[Dict], previous: Optional[Dict]) -> bool:
+        """Replace a schedule's trigger (None removes it) and re-register the affected ringtone tasks"""
+        affected = {trigger["task"] for trigger in (entry, previous) if trigger}
+        with self._locked_tasks(affected):
+            self.triggers.set(task_name, entry)
+            applied = []
+            # The schedule's new task first, then the one it moved away from
+            for task in sorted(affected, key=lambda task: task != (entry or previous)["task"]):
+                if not self._apply_ringtone_task(task):
+                    # Put the old trigger back and undo the task registered already
+                    self.triggers.set(task_name, previous)
+                    for rebuilt in applied:
+                        self._apply_ringtone_task(rebuilt)
+                    return False
+                applied.append(task)
+            self.triggers.save()
+        return True
+    
+    def _single_task_exists(self, task_name: str) -> bool:
+        """A task of the old one-task-per-schedule layout (Ringtone_<schedule id>)"""
+        return task_name not in self.triggers.task_names() and self.registry.get(f"{TASK_PREFIX}{task_name}") is not None
+    
     def create_scheduled_task(self, task_name: str, ringtone_path: str, time: str, days: List[int]) -> bool:
         """
-        Create a Windows scheduled task for a ringtone.
+        Add (or replace) a schedule's weekly trigger on the task of its ringtone.
+        
+        All schedules of one ringtone share a task with one trigger each, defined
+        as Task Scheduler XML, so there is no command-length limit and no wrapper
+        script.
         
         Args:
-            task_name: Unique name for the task
+            task_name: Unique name for the task (the schedule id)
             ringtone_path: Full path to the ringtone file
             time: Time in HH:MM format
             days: List of days (0=Sunday, 1=Monday, etc.)
@@ -132,126 +439,101 @@ class WindowsTaskSchedulerService:
                 logger.error(f"❌ Ringtone player script not found: {self.ringtone_player_script}")
                 return False
             
-            # Convert days to schtasks format
-            day_mapping = {
-                0: "SUN",  # Sunday
-                1: "MON",  # Monday
-                2: "TUE",  # Tuesday
-                3: "WED",  # Wednesday
-                4: "THU",  # Thursday
-                5: "FRI",  # Friday
-                6: "SAT"   # Saturday
+            entry = {
+                "task": ringtone_task_name(ringtone_path),
+                "ringtone_path": ringtone_path,
+                "time": normalize_time(time),
+                "days": sorted({int(day) for day in days}),
+                "enabled": True,
             }
-            
-            day_list = ",".join([day_mapping[day] for day in days])
-            
-            # Use the detected Python executable
-            python_exe = self.python_exe
-            test_command = f'"{python_exe}" "{self.ringtone_player_script}" "{ringtone_path}"'
-            
-            logger.info(f"🔍 Using Python executable: {python_exe}")
-            logger.info(f"🔍 Test command length: {len(test_command)} chars")
-            
-            if len(test_command) > 261:
-                # For existing long filenames, create a Python wrapper script
-                logger.info(f"⚠️ Command too long ({len(test_command)} chars), creating Python wrapper")
-                wrapper_script = os.path.join(os.path.dirname(__file__), "play_ringtone_wrapper.py")
-                
-                # Create a Python wrapper script that imports and calls the main function
-                wrapper_content = f'''#!/usr/bin/env python3
-import sys
-import os
-
-# Add the backend directory to the path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-# Import and run the play_ringtone script
-from play_ringtone import main
-
-# Set the command line arguments
-sys.argv = ["play_ringtone_wrapper.py", r"{ringtone_path}"]
-
-# Run the main function
-main()
-'''
-                try:
-                    with open(wrapper_script, 'w', encoding='utf-8') as f:
-                        f.write(wrapper_content)
-                    logger.info(f"✅ Created Python wrapper: {wrapper_script}")
-                except Exception as e:
-                    logger.error(f"❌ Error creating Python wrapper: {e}")
-                    return False
-                
-                args = [
-                    "/create",
-                    "/tn", f"Ringtone_{task_name}",
-                    "/tr", f"\"{python_exe}\" \"{wrapper_script}\"",
-                    "/sc", "weekly",
-                    "/d", day_list,
-                    "/st", time,
-                    "/f"  # Force creation
-                ]
-            else:
-                # Use pythonw.exe directly for short filenames
-                logger.info(f"✅ Command length OK ({len(test_command)} chars), using Python directly")
-                args = [
-                    "/create",
-                    "/tn", f"Ringtone_{task_name}",
-                    "/tr", f"\"{python_exe}\" \"{self.ringtone_player_script}\" \"{ringtone_path}\"",
-                    "/sc", "weekly",
-                    "/d", day_list,
-                    "/st", time,
-                    "/f"  # Force creation
-                ]
-            
-            success, stdout, stderr = self._run_schtasks_command(args)
-            
-            if success:
-                logger.info(f"✅ Created scheduled task: {task_name}")
-                return True
-            else:
+            task_triggers([entry])
+        except (ValueError, TypeError) as e:
+            logger.error(f"❌ Invalid schedule for task {task_name}: {e}")
+            return False
+        
+        try:
+            if not self._update_trigger(task_name, entry, self.triggers.get(task_name)):
                 logger.error(f"❌ Failed to create scheduled task: {task_name}")
-                logger.error(f"Error: {stderr}")
                 return False
-                
+            # Replace a task of the old one-task-per-schedule layout
+            if self._single_task_exists(task_name):
+                self._delete_single_task(task_name)
+            logger.info(f"✅ Created scheduled task: {task_name} (task {TASK_PREFIX}{entry['task']})")
+            return True
         except Exception as e:
             logger.error(f"❌ Error creating scheduled task: {e}")
             return False
     
+    def _delete_single_task(self, task_name: str) -> bool:
+        """
+        Delete a Ringtone_ task that no trigger refers to. A ringtone task that
+        schedules (re-)registered in the meantime is kept: it only looked unused
+        because the trigger map did not know it when the task list was read.
+        """
+        with self._locked_tasks([task_name]):
+            if task_name in self.triggers.task_names():
+                logger.info(f"ℹ️ Kept {TASK_PREFIX}{task_name}: it holds the triggers of current schedules")
+                return True
+            success, stdout, stderr = self._run_schtasks_command(["/delete", "/tn", f"{TASK_PREFIX}{task_name}", "/f"])
+            if success:
+                logger.info(f"✅ Deleted scheduled task: {task_name}")
+                self.registry.remove(f"{TASK_PREFIX}{task_name}")
+            else:
+                logger.error(f"❌ Failed to delete scheduled task: {task_name}")
+                logger.error(f"Error: {stderr}")
+            return success
+    
     def delete_scheduled_task(self, task_name: str) -> bool:
         """
-        Delete a Windows scheduled task.
+        Remove a schedule's trigger; its ringtone task is deleted with the last trigger.
         
         Args:
-            task_name: Name of the task to delete
+            task_name: Name of the task to delete (the schedule id, or any Ringtone_ task name suffix)
         
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            args = [
-                "/delete",
-                "/tn", f"Ringtone_{task_name}",
-                "/f"  # Force deletion
-            ]
-            
-            success, stdout, stderr = self._run_schtasks_command(args)
+            previous = self.triggers.get(task_name)
+            if previous is None:
+                return self._delete_single_task(task_name)
             
-            if success:
-                logger.info(f"✅ Deleted scheduled task: {task_name}")
-                return True
-            else:
+            if not self._update_trigger(task_name, None, previous):
                 logger.error(f"❌ Failed to delete scheduled task: {task_name}")
-                logger.error(f"Error: {stderr}")
                 return False
+            logger.info(f"✅ Deleted scheduled task: {task_name}")
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Error deleting scheduled task: {e}")
             return False
     
+    def _set_enabled(self, task_name: str, enabled: bool) -> bool:
+        action = "enable" if enabled else "disable"
+        try:
+            previous = self.triggers.get(task_name)
+            if previous is None:
+                # Task of the old layout: toggle the whole task
+                success, stdout, stderr = self._run_schtasks_command(
+                    ["/change", "/tn", f"{TASK_PREFIX}{task_name}", "/enable" if enabled else "/disable"])
+                if success:
+                    self.registry.update(f"{TASK_PREFIX}{task_name}", status="Ready" if enabled else "Disabled", enabled=enabled)
+            else:
+                success = self._update_trigger(task_name, {**previous, "enabled": enabled}, previous)
+            
+            if success:
+                logger.info(f"✅ {action.capitalize()}d scheduled task: {task_name}")
+            else:
+                logger.error(f"❌ Failed to {action} scheduled task: {task_name}")
+            return success
+                
+        except Exception as e:
+            logger.error(f"❌ Error {action[:-1]}ing scheduled task: {e}")
+            return False
+    
     def enable_scheduled_task(self, task_name: str) -> bool:
         """
-        Enable a Windows scheduled task.
+        Enable a schedule's trigger.
         
         Args:
             task_name: Name of the task to enable
@@ -259,30 +541,11 @@ main()
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            args = [
-                "/change",
-                "/tn", f"Ringtone_{task_name}",
-                "/enable"
-            ]
-            
-            success, stdout, stderr = self._run_schtasks_command(args)
-            
-            if success:
-                logger.info(f"✅ Enabled scheduled task: {task_name}")
-                return True
-            else:
-                logger.error(f"❌ Failed to enable scheduled task: {task_name}")
-                logger.error(f"Error: {stderr}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Error enabling scheduled task: {e}")
-            return False
+        return self._set_enabled(task_name, True)
     
     def disable_scheduled_task(self, task_name: str) -> bool:
         """
-        Disable a Windows scheduled task.
+        Disable a schedule's trigger (the task stays registered for the other schedules).
         
         Args:
             task_name: Name of the task to disable
@@ -290,26 +553,17 @@ main()
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            args = [
-                "/change",
-                "/tn", f"Ringtone_{task_name}",
-                "/disable"
-            ]
-            
-            success, stdout, stderr = self._run_schtasks_command(args)
-            
-            if success:
-                logger.info(f"✅ Disabled scheduled task: {task_name}")
-                return True
-            else:
-                logger.error(f"❌ Failed to disable scheduled task: {task_name}")
-                logger.error(f"Error: {stderr}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Error disabling scheduled task: {e}")
-            return False
+        return self._set_enabled(task_name, False)
+    
+    def _query_tasks(self) -> Tuple[bool, Dict[str, Dict]]:
+        """One verbose query of all tasks, parsed into our tasks (used by the registry)"""
+        success, stdout, stderr = self._run_schtasks_command(["/query", "/fo", "csv", "/v"], log_output=False)
+        if not success:
+            logger.error(f"❌ Failed to query scheduled tasks: {stderr}")
+            return False, {}
+        tasks = parse_schtasks_csv(stdout)
+        logger.info(f"📋 Task registry refreshed: {len(tasks)} ringtone tasks")
+        return True, tasks
     
     def get_task_status(self, task_name: str) -> Optional[str]:
         """
@@ -322,124 +576,73 @@ main()
             str: Task status or None if not found
         """
         try:
-            args = [
-                "/query",
-                "/tn", f"Ringtone_{task_name}",
-                "/fo", "csv",
-                "/v"
-            ]
-            
-            success, stdout, stderr = self._run_schtasks_command(args)
-            
-            if success and stdout:
-                # Parse the CSV output to find the status
-                lines = stdout.strip().split('\n')
-                if len(lines) > 1:
-                    # Skip header line and get the first data line
-                    data_line = lines[1]
-                    # The status is typically in one of the columns
-                    # This is a simplified parsing - you might need to adjust based on actual output
-                    if "Ready" in data_line:
-                        return "Ready"
-                    elif "Disabled" in data_line:
-                        return "Disabled"
-                    elif "Running" in data_line:
-                        return "Running"
-                
-            return None
+            entry = self.triggers.get(task_name)
+            if entry is None:
+                task = self.registry.get(f"{TASK_PREFIX}{task_name}")
+                return task["status"] if task else None
+            task = self.registry.get(f"{TASK_PREFIX}{entry['task']}")
+            if task is None:
+                return None
+            return task["status"] if entry["enabled"] else "Disabled"
             
         except Exception as e:
             logger.error(f"❌ Error getting task status: {e}")
             return None
     
-    def list_all_tasks(self) -> List[Dict]:
+    def list_all_tasks(self, refresh: bool = False) -> List[Dict]:
         """
-        List all ringtone scheduler tasks.
+        List all ringtone scheduler tasks, one entry per schedule.
+        
+        A ringtone task holding several schedules is listed once per schedule
+        (name = schedule id, with its trigger's time, days and enabled state).
+        Ringtone_ tasks the trigger map does not know (the old one-task-per-schedule
+        layout) are listed as they are, with single=True.
+        
+        Args:
+            refresh: Query schtasks now instead of serving the cached snapshot
         
         Returns:
             List of task information dictionaries
         """
         try:
-            args = [
-                "/query",
-                "/fo", "csv",
-                "/v"
-            ]
-            
-            success, stdout, stderr = self._run_schtasks_command(args)
-            
+            if refresh:
+                self.registry.refresh()
+            snapshot = self.registry.tasks()
             tasks = []
-            if success and stdout:
-                lines = stdout.strip().split('\n')
-                if len(lines) > 1:
-                    # Parse CSV output
-                    for line in lines[1:]:  # Skip header
-                        if "Ringtone_" in line:
-                            # This is one of our tasks
-                            parts = line.split(',')
-                            if len(parts) > 0:
-                                task_name = parts[0].strip('"')
-                                # Extract just the task name without the Ringtone_ prefix
-                                if "Ringtone_" in task_name:
-                                    clean_name = task_name.replace("Ringtone_", "")
-                                    tasks.append({
-                                        "name": clean_name,
-                                        "full_name": task_name,
-                                        "status": "Unknown"  # Would need more parsing to get actual status
-                                    })
-            
-            return tasks
+            for schedule_id, entry in self.triggers.items():
+                task = snapshot.get(f"{TASK_PREFIX}{entry['task']}")
+                if task is None:
+                    continue
+                tasks.append({
+                    **task,
+                    "name": schedule_id,
+                    "status": task["status"] if entry["enabled"] else "Disabled",
+                    "enabled": task.get("enabled", True) and entry["enabled"],
+                    "time": entry["time"],
+                    "days": entry["days"],
+                })
+            ringtone_tasks = {f"{TASK_PREFIX}{task}" for task in self.triggers.task_names()}
+            tasks += [{**task, "single": True} for full_name, task in snapshot.items() if full_name not in ringtone_tasks]
+            return sorted(tasks, key=lambda task: (task["full_name"], task["name"]))
             
         except Exception as e:
             logger.error(f"❌ Error listing tasks: {e}")
             return []
     
-    def test_ringtone_playback(self, ringtone_path: str) -> bool:
+    def start(self):
+        """Fill the task registry before the first list request"""
+        self.registry.refresh_async()
+    
+    def snapshot_age(self) -> Optional[float]:
+        return self.registry.age()
+    
+    def player_command(self, ringtone_path: str) -> List[str]:
         """
-        Test playing a ringtone immediately.
-        
-        Args:
-            ringtone_path: Path to the ringtone file
+        Command that plays a ringtone now.
         
-        Returns:
-            bool: True if successful, False otherwise
+        Started directly (no schtasks /tr), so the 261-character limit does not apply.
         """
-        try:
-            # Use the detected Python executable
-            python_exe = self.python_exe
-            test_command = f'"{python_exe}" "{self.ringtone_player_script}" "{ringtone_path}"'
-            
-            logger.info(f"🔍 Using Python executable for test: {python_exe}")
-            logger.info(f"🔍 Test command length: {len(test_command)} chars")
-            
-            if len(test_command) > 261:
-                # Use batch file wrapper for existing ringtones with long filenames
-                logger.info(f"⚠️ Command too long ({len(test_command)} chars), using batch file wrapper")
-                batch_script = os.path.join(os.path.dirname(__file__), "play_ringtone_short.bat")
-                
-                # Create the batch file if it doesn't exist
-                if not os.path.exists(batch_script):
-                    self._create_short_batch_file()
-                
-                cmd = [batch_script, ringtone_path]
-            else:
-                # Use Python file directly for short filenames
-                logger.info(f"✅ Command length OK ({len(test_command)} chars), using Python directly")
-                cmd = [python_exe, self.ringtone_player_script, ringtone_path]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            
-            if result.returncode == 0:
-                logger.info(f"✅ Successfully tested ringtone: {ringtone_path}")
-                return True
-            else:
-                logger.error(f"❌ Failed to test ringtone: {ringtone_path}")
-                logger.error(f"Error: {result.stderr}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Error testing ringtone: {e}")
-            return False
+        return [self.python_exe, self.ringtone_player_script, ringtone_path]
 
-# Create singleton instance
-task_scheduler_service = WindowsTaskSchedulerService()
+# Create singleton instance (Windows scheduler or the in-process engine, see schedulerBackend.py)
+task_scheduler_service = create_scheduler_backend()
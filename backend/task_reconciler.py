@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Reconcile scheduler tasks with the schedule store.
+
+One snapshot of the Ringtone_* tasks (list_all_tasks(refresh=True)) is diffed
+against the device schedules in the store:
+
+    create           schedule without a task, or a task whose command no longer
+                     matches the schedule (ringtone, time, days) - e.g. a task
+                     that still points at a deleted ringtone
+    create_disabled  the same for an inactive schedule
+    delete           Ringtone_* task without a device schedule
+    enable/disable   task whose enabled state differs from isActive
+
+Only those changes are applied, through a bounded thread pool, and every
+action is reported. Schedules whose own ringtone file is missing are reported
+as issues and left alone.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from playback_renditions import create_rendition
+
+logger = logging.getLogger(__name__)
+
+# Scheduler calls run in parallel (each is a schtasks process on Windows)
+RECONCILE_WORKERS = max(1, int(os.environ.get('RINGTONE_RECONCILE_WORKERS', '4')))
+
+_reconcile_lock = threading.Lock()
+
+
+def schedule_ringtone_path(schedule):
+    """Absolute ringtone path of a schedule (as used for its task)"""
+    return os.path.abspath(schedule.get('ringtoneFilePath') or schedule.get('ringtoneUrl') or '')
+
+
+def desired_tasks(schedules):
+    """Task definition each device schedule should have, keyed by schedule id"""
+    return {
+        schedule['id']: {
+            'ringtone_path': schedule_ringtone_path(schedule),
+            'time': schedule.get('time'),
+            'days': sorted(set(schedule.get('days') or [])),
+            'enabled': schedule.get('isActive', True),
+        }
+        for schedule in schedules
+        if schedule.get('scheduleSource') == 'device' and schedule.get('id')
+    }
+
+
+def _same_path(first, second):
+    return os.path.normcase(os.path.abspath(first)) == os.path.normcase(os.path.abspath(second))
+
+
+def task_target(task):
+    """
+    (ringtone path, time, days, via_wrapper) a task actually runs, None where unknown.
+
+    The ringtone is the quoted argument after the player script, or the path
+    in a play_ringtone_wrapper.py written by older versions for long commands.
+    """
+    command = task.get('task_to_run') or ''
+    quoted = re.findall(r'"([^"]*)"', command)
+    ringtone_path = None
+    via_wrapper = bool(quoted) and quoted[-1].lower().endswith('.py') and os.path.basename(quoted[-1]) != 'play_ringtone.py'
+    if via_wrapper:
+        try:
+            with open(quoted[-1], 'r', encoding='utf-8') as f:
+                match = re.search(r'sys\.argv = \[[^,]+, r"([^"]*)"', f.read())
+            ringtone_path = match.group(1) if match else None
+        except OSError:
+            ringtone_path = None
+    elif len(quoted) >= 2 and quoted[-2].lower().endswith('.py'):
+        ringtone_path = quoted[-1]
+
+    time_match = re.search(r'--scheduled-time\s+(\S+)', command)
+    scheduled_time = task.get('time') or (time_match.group(1) if time_match else None)
+    days = task.get('days')
+    return ringtone_path, scheduled_time, sorted(set(days)) if days is not None else None, via_wrapper
+
+
+def plan_reconcile(desired, tasks, delete_orphans=True):
+    """
+    Minimal action list turning `tasks` (name -> task) into `desired`.
+
+    Returns:
+        (actions [{schedule_id, action, reason}], issues [{schedule_id, issue}], unchanged count)
+    """
+    actions, issues, unchanged = [], [], 0
+    for schedule_id, spec in desired.items():
+        task = tasks.get(schedule_id)
+        if not os.path.exists(spec['ringtone_path']):
+            issues.append({'schedule_id': schedule_id, 'issue': f"Ringtone file not found: {spec['ringtone_path']}"})
+            continue
+        create = 'create' if spec['enabled'] else 'create_disabled'
+        if task is None:
+            actions.append({'schedule_id': schedule_id, 'action': create, 'reason': 'task missing'})
+            continue
+
+        ringtone_path, scheduled_time, days, via_wrapper = task_target(task)
+        if task.get('single'):
+            # Task of the old one-task-per-schedule layout; recreating moves it onto its ringtone's task
+            reason = 'single-schedule task'
+        elif ringtone_path and not os.path.exists(ringtone_path):
+            reason = 'task ringtone deleted'
+        elif ringtone_path and not via_wrapper and not _same_path(ringtone_path, spec['ringtone_path']):
+            # All long-command tasks share the one wrapper script, so only a deleted target is conclusive there
+            reason = 'ringtone changed'
+        elif scheduled_time and ',' not in scheduled_time and scheduled_time != spec['time']:
+            reason = 'time changed'
+        elif days is not None and days != spec['days']:
+            reason = 'days changed'
+        else:
+            reason = None
+        if reason:
+            actions.append({'schedule_id': schedule_id, 'action': create, 'reason': reason})
+        elif bool(task.get('enabled', True)) != bool(spec['enabled']):
+            actions.append({'schedule_id': schedule_id, 'action': 'enable' if spec['enabled'] else 'disable',
+                            'reason': 'enabled state differs'})
+        else:
+            unchanged += 1
+
+    orphans = [name for name in tasks if name not in desired]
+    if delete_orphans:
+        actions += [{'schedule_id': name, 'action': 'delete', 'reason': 'no device schedule'} for name in orphans]
+    else:
+        issues += [{'schedule_id': name, 'issue': 'Task has no device schedule (not deleted)'} for name in orphans]
+    return actions, issues, unchanged
+
+
+def _apply_action(service, action, spec):
+    """Run one action; returns an error message or None"""
+    kind, schedule_id = action['action'], action['schedule_id']
+    if kind == 'delete':
+        # A task that is already gone is not an error (same as /api/task-scheduler/delete)
+        service.delete_scheduled_task(schedule_id)
+        return None
+    if kind in ('enable', 'disable'):
+        method = service.enable_scheduled_task if kind == 'enable' else service.disable_scheduled_task
+        return None if method(schedule_id) else f'Failed to {kind} scheduled task'
+
+    if not os.path.exists(spec['ringtone_path']):
+        return f"Ringtone file not found: {spec['ringtone_path']}"
+    if not service.create_scheduled_task(schedule_id, spec['ringtone_path'], spec['time'], spec['days']):
+        return 'Failed to create scheduled task'
+    if kind == 'create_disabled' and not service.disable_scheduled_task(schedule_id):
+        return 'Created but failed to disable scheduled task'
+    return None
+
+
+def apply_actions(service, actions, desired):
+    """
+    Apply actions with at most RECONCILE_WORKERS scheduler calls in flight,
+    deletes before everything else.
+    Each action gets 'success' (and 'error'); new tasks get their playback
+    renditions decoded in one background pass.
+    """
+    def run(action):
+        try:
+            error = _apply_action(service, action, desired.get(action['schedule_id']))
+        except Exception as e:
+            error = str(e)
+        action['success'] = error is None
+        if error:
+            action['error'] = error
+        return action
+
+    # Deletes first: an orphan can be a task the creates register again (a Windows ringtone
+    # task whose trigger map was lost), and it must not be removed after they did
+    deletes = [action for action in actions if action['action'] == 'delete']
+    others = [action for action in actions if action['action'] != 'delete']
+    for phase in (deletes, others):
+        if phase:
+            with ThreadPoolExecutor(max_workers=min(RECONCILE_WORKERS, len(phase)),
+                                    thread_name_prefix='task-reconcile') as pool:
+                list(pool.map(run, phase))
+
+    new_ringtones = sorted({desired[action['schedule_id']]['ringtone_path'] for action in actions
+                            if action['success'] and action['action'].startswith('create')})
+    if new_ringtones:
+        def create_renditions(paths):
+            for path in paths:
+                create_rendition(path)
+        threading.Thread(target=create_renditions, args=(new_ringtones,),
+                         name='playback-rendition', daemon=True).start()
+    return actions
+
+
+def reconcile(service, schedules, dry_run=False, delete_orphans=True):
+    """
+    Diff one task snapshot against the schedules and apply the difference.
+
+    Returns:
+        dict report: actions, issues, counts per action, unchanged, tasks, schedules, dry_run, elapsed_ms
+    """
+    with _reconcile_lock:
+        started = time.perf_counter()
+        desired = desired_tasks(schedules)
+        tasks = {task['name']: task for task in service.list_all_tasks(refresh=True)}
+        actions, issues, unchanged = plan_reconcile(desired, tasks, delete_orphans)
+        if not dry_run:
+            apply_actions(service, actions, desired)
+
+        counts = {}
+        for action in actions:
+            counts[action['action']] = counts.get(action['action'], 0) + 1
+        failed = sum(1 for action in actions if action.get('success') is False)
+        logger.info(f"🔄 Task reconcile{' (dry run)' if dry_run else ''}: {len(tasks)} tasks, {len(desired)} device schedules, "
+                    f"{len(actions)} actions {counts}, {failed} failed, {len(issues)} issues")
+        return {
+            'dry_run': dry_run,
+            'tasks': len(tasks),
+            'schedules': len(desired),
+            'actions': actions,
+            'counts': counts,
+            'failed': failed,
+            'unchanged': unchanged,
+            'issues': issues,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
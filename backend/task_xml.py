@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Task Scheduler XML for ringtone tasks (registered with `schtasks /create /xml`).
+
+One task per ringtone file: every schedule of that ringtone becomes a weekly
+CalendarTrigger (with its own Enabled flag) of the same task, and the player
+command goes into <Exec> as Command + Arguments, which has no 261-character
+/tr limit. The output is deterministic so it can be compared to golden files.
+"""
+
+import hashlib
+import ntpath
+import os
+import xml.etree.ElementTree as ET
+
+TASK_NAMESPACE = "http://schemas.microsoft.com/windows/2004/02/mit/task"
+
+# Any fixed date works as the trigger start; 2024-01-01 is a Monday
+TRIGGER_START_DATE = "2024-01-01"
+
+# Task Scheduler stops the player after this long (play_ringtone caps playback at 10 minutes)
+EXECUTION_TIME_LIMIT = "PT15M"
+
+# Schedule days are 0=Sunday ... 6=Saturday
+DAY_ELEMENTS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def ringtone_task_name(ringtone_path: str) -> str:
+    """Stable task name (without the Ringtone_ prefix) shared by all schedules of one ringtone (absolute path)"""
+    key = os.path.normcase(ringtone_path)
+    return "rt_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def normalize_time(value: str) -> str:
+    """'8:5' -> '08:05'; raises ValueError for anything that is not a time of day"""
+    hours, minutes = (int(part) for part in str(value).split(":")[:2])
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time: {value}")
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def task_triggers(schedules):
+    """
+    Weekly triggers for a ringtone's schedules, one per distinct (time, days, enabled).
+
+    schedules: iterable of dicts with time, days and enabled
+    Returns:
+        sorted list of (time, days tuple, enabled)
+    """
+    triggers = set()
+    for schedule in schedules:
+        days = tuple(sorted({int(day) for day in schedule["days"]})) or tuple(range(7))
+        if any(day < 0 or day > 6 for day in days):
+            raise ValueError(f"Invalid days: {list(days)}")
+        triggers.add((normalize_time(schedule["time"]), days, bool(schedule.get("enabled", True))))
+    return sorted(triggers)
+
+
+def player_arguments(player_script: str, ringtone_path: str, times) -> str:
+    """Arguments of the player command; --scheduled-time lists every trigger time"""
+    return f'"{player_script}" "{ringtone_path}" --scheduled-time {",".join(sorted(set(times)))}'
+
+
+def _element(parent, tag, text=None, **attributes):
+    element = ET.SubElement(parent, tag, attributes)
+    if text is not None:
+        element.text = text
+    return element
+
+
+def build_task_xml(task_name: str, ringtone_path: str, schedules, python_exe: str, player_script: str) -> str:
+    """
+    Task definition for one ringtone.
+
+    Args:
+        task_name: full task name (Ringtone_...)
+        ringtone_path: ringtone the task plays
+        schedules: dicts with time (HH:MM), days (0=Sunday ... 6=Saturday) and enabled
+        python_exe: interpreter that runs the player
+        player_script: path of play_ringtone.py
+
+    Returns:
+        str: XML document (declared UTF-16, see write_task_xml)
+    """
+    triggers = task_triggers(schedules)
+    if not triggers:
+        raise ValueError("A task needs at least one schedule")
+
+    task = ET.Element("Task", {"version": "1.2", "xmlns": TASK_NAMESPACE})
+    info = _element(task, "RegistrationInfo")
+    _element(info, "Description", f"Ringtone: {ntpath.basename(ringtone_path)}")
+    _element(info, "URI", f"\\{task_name}")
+
+    trigger_list = _element(task, "Triggers")
+    for time, days, enabled in triggers:
+        trigger = _element(trigger_list, "CalendarTrigger")
+        _element(trigger, "StartBoundary", f"{TRIGGER_START_DATE}T{time}:00")
+        _element(trigger, "Enabled", "true" if enabled else "false")
+        weekly = _element(trigger, "ScheduleByWeek")
+        day_list = _element(weekly, "DaysOfWeek")
+        for day in days:
+            _element(day_list, DAY_ELEMENTS[day])
+        _element(weekly, "WeeksInterval", "1")
+
+    principal = _element(_element(task, "Principals"), "Principal", id="Author")
+    _element(principal, "LogonType", "InteractiveToken")
+    _element(principal, "RunLevel", "LeastPrivilege")
+
+    settings = _element(task, "Settings")
+    _element(settings, "MultipleInstancesPolicy", "Parallel")
+    # An alarm has to ring on a laptop running on battery as well
+    _element(settings, "DisallowStartIfOnBatteries", "false")
+    _element(settings, "StopIfGoingOnBatteries", "false")
+    _element(settings, "StartWhenAvailable", "false")
+    _element(settings, "ExecutionTimeLimit", EXECUTION_TIME_LIMIT)
+    _element(settings, "Enabled", "true" if any(enabled for _, _, enabled in triggers) else "false")
+
+    actions = _element(task, "Actions", Context="Author")
+    action = _element(actions, "Exec")
+    _element(action, "Command", python_exe)
+    _element(action, "Arguments", player_arguments(player_script, ringtone_path, [time for time, _, _ in triggers]))
+    _element(action, "WorkingDirectory", os.path.dirname(player_script))
+
+    ET.indent(task, space="  ")
+    return '<?xml version="1.0" encoding="UTF-16"?>\n' + ET.tostring(task, encoding="unicode") + "\n"
+
+
+def write_task_xml(path: str, xml: str):
+    """schtasks reads the file as UTF-16 (with BOM), matching the declaration"""
+    with open(path, "w", encoding="utf-16", newline="\r\n") as f:
+        f.write(xml)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Multi-resolution waveform peaks for uploaded audio files.
+
+The source is decoded once to mono 16-bit PCM (FFmpeg pipe, or the wave
+module for WAV files without FFmpeg) and reduced to min/max pairs at several
+zoom levels. Level 0 has BASE_SAMPLES_PER_PEAK samples per peak; each further
+level halves the resolution. The pyramid is stored next to the uploads in a
+compact binary file and served per level by /api/waveform/<source_id>.
+
+Stored file layout (little endian):
+    header:  4s magic 'RTPK', H version, I sample_rate, I total_samples, H level_count
+    table:   level_count x (I samples_per_peak, I peak_count)
+    data:    for each level, peak_count x (h min, h max)
+
+Single-level response layout (little endian):
+    4s magic 'RTPK', H version, I sample_rate, I total_samples,
+    I samples_per_peak, I peak_count, then peak_count x (h min, h max)
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import struct
+import subprocess
+import threading
+import wave
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# numpy is vendored in packages/ for the portable app (Windows, CPython 3.13);
+# a pure Python reduction is only used where no numpy can be imported
+try:
+    import numpy as np
+except ImportError:
+    try:
+        from local_imports import safe_import
+        np = safe_import('numpy')
+    except ImportError:
+        np = None
+NUMPY_AVAILABLE = np is not None
+
+PEAKS_MAGIC = b'RTPK'
+PEAKS_VERSION = 1
+PEAKS_HEADER = struct.Struct('<4sHIIH')
+PEAKS_LEVEL = struct.Struct('<II')
+LEVEL_RESPONSE_HEADER = struct.Struct('<4sHIIII')
+
+# Decode rate for peak computation (plenty for drawing a waveform)
+PEAK_SAMPLE_RATE = 11025
+BASE_SAMPLES_PER_PEAK = 64
+# Stop adding levels once a level has this few peaks
+MIN_PEAKS_PER_LEVEL = 512
+MAX_LEVELS = 16
+
+SOURCE_EXTENSIONS = ('.mp3', '.wav')
+WAVEFORM_FOLDER_NAME = '.waveforms'
+
+_source_index = {}
+_source_index_lock = threading.Lock()
+_compute_locks = {}
+_compute_locks_guard = threading.Lock()
+
+
+def source_id_for(filename):
+    """Stable id for an uploaded source file"""
+    return hashlib.md5(filename.encode('utf-8')).hexdigest()[:16]
+
+
+def find_source_file(upload_folder, source_id):
+    """
+    Resolve a source id to the path of an uploaded file.
+    Uses a cached id -> filename index and rescans the folder on a miss.
+    """
+    with _source_index_lock:
+        filename = _source_index.get(source_id)
+        if filename and os.path.isfile(os.path.join(upload_folder, filename)):
+            return os.path.join(upload_folder, filename)
+
+        _source_index.clear()
+        if os.path.isdir(upload_folder):
+            for name in os.listdir(upload_folder):
+                if name.lower().endswith(SOURCE_EXTENSIONS) and os.path.isfile(os.path.join(upload_folder, name)):
+                    _source_index[source_id_for(name)] = name
+        filename = _source_index.get(source_id)
+    return os.path.join(upload_folder, filename) if filename else None
+
+
+def peaks_path_for(upload_folder, source_id):
+    """Location of the stored peak pyramid for a source"""
+    return os.path.join(upload_folder, WAVEFORM_FOLDER_NAME, f"{source_id}.peaks")
+
+
+def decode_mono_pcm(file_path, sample_rate=PEAK_SAMPLE_RATE):
+    """
+    Decode an audio file to mono signed 16-bit PCM.
+
+    Returns:
+        (samples as array('h'), sample_rate)
+    """
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg:
+        result = subprocess.run(
+            [ffmpeg, '-v', 'error', '-i', file_path, '-ac', '1', '-ar', str(sample_rate),
+             '-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=300
+        )
+        if result.returncode == 0:
+            samples = array('h')
+            samples.frombytes(result.stdout[:len(result.stdout) - len(result.stdout) % 2])
+            if struct.pack('=h', 1) != struct.pack('<h', 1):
+                samples.byteswap()
+            return samples, sample_rate
+        logger.warning(f"FFmpeg decode failed for {file_path}: {result.stderr.decode(errors='replace').strip()}")
+
+    if file_path.lower().endswith('.wav'):
+        return _decode_wav(file_path)
+    raise RuntimeError('FFmpeg is required to decode this file')
+
+
+def _decode_wav(file_path):
+    """Decode a 16-bit PCM WAV with the wave module (first channel only, native rate)"""
+    with wave.open(file_path, 'rb') as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise RuntimeError('Only 16-bit WAV files can be decoded without FFmpeg')
+        channels = wav_file.getnchannels()
+        sample_rate = wav_file.getframerate()
+        samples = array('h')
+        samples.frombytes(wav_file.readframes(wav_file.getnframes()))
+    if struct.pack('=h', 1) != struct.pack('<h', 1):
+        samples.byteswap()
+    if channels > 1:
+        samples = samples[::channels]
+    return samples, sample_rate
+
+
+def _reduce_levels(samples):
+    """Return [(samples_per_peak, mins, maxs), ...] from finest to coarsest"""
+    levels = []
+    if not len(samples):
+        return levels
+
+    if NUMPY_AVAILABLE:
+        data = np.frombuffer(samples, dtype=np.int16)
+        starts = np.arange(0, len(data), BASE_SAMPLES_PER_PEAK)
+        mins = np.minimum.reduceat(data, starts)
+        maxs = np.maximum.reduceat(data, starts)
+    else:
+        step = BASE_SAMPLES_PER_PEAK
+        mins = array('h', (min(samples[i:i + step]) for i in range(0, len(samples), step)))
+        maxs = array('h', (max(samples[i:i + step]) for i in range(0, len(samples), step)))
+
+    samples_per_peak = BASE_SAMPLES_PER_PEAK
+    while True:
+        levels.append((samples_per_peak, mins, maxs))
+        if len(mins) <= MIN_PEAKS_PER_LEVEL or len(levels) >= MAX_LEVELS:
+            break
+        # Each coarser level merges pairs of the previous one
+        if NUMPY_AVAILABLE:
+            pair_starts = np.arange(0, len(mins), 2)
+            mins = np.minimum.reduceat(mins, pair_starts)
+            maxs = np.maximum.reduceat(maxs, pair_starts)
+        else:
+            mins = array('h', (min(mins[i:i + 2]) for i in range(0, len(mins), 2)))
+            maxs = array('h', (max(maxs[i:i + 2]) for i in range(0, len(maxs), 2)))
+        samples_per_peak *= 2
+    return levels
+
+
+def _interleave(mins, maxs):
+    """Pack min/max arrays as little-endian (min, max) int16 pairs"""
+    if NUMPY_AVAILABLE:
+        pairs = np.empty(len(mins) * 2, dtype='<i2')
+        pairs[0::2] = mins
+        pairs[1::2] = maxs
+        return pairs.tobytes()
+    pairs = array('h', bytes(len(mins) * 4))
+    pairs[0::2] = array('h', mins)
+    pairs[1::2] = array('h', maxs)
+    if struct.pack('=h', 1) != struct.pack('<h', 1):
+        pairs.byteswap()
+    return pairs.tobytes()
+
+
+def compute_peaks(source_path, peaks_path):
+    """Decode a source file and write its peak pyramid (atomic replace)"""
+    samples, sample_rate = decode_mono_pcm(source_path)
+    levels = _reduce_levels(samples)
+
+    os.makedirs(os.path.dirname(peaks_path), exist_ok=True)
+    tmp_path = peaks_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(PEAKS_HEADER.pack(PEAKS_MAGIC, PEAKS_VERSION, sample_rate, len(samples), len(levels)))
+        for samples_per_peak, mins, _ in levels:
+            f.write(PEAKS_LEVEL.pack(samples_per_peak, len(mins)))
+        for _, mins, maxs in levels:
+            f.write(_interleave(mins, maxs))
+    os.replace(tmp_path, peaks_path)
+    logger.info(f"Computed waveform peaks for {os.path.basename(source_path)}: {len(levels)} levels")
+    return peaks_path
+
+
+def ensure_peaks(upload_folder, source_id):
+    """
+    Return the peaks file for a source, computing it if missing or stale.
+    Concurrent callers for the same source wait for a single computation.
+
+    Returns:
+        Path of the peaks file, or None if the source does not exist
+    """
+    source_path = find_source_file(upload_folder, source_id)
+    if not source_path:
+        return None
+    peaks_path = peaks_path_for(upload_folder, source_id)
+
+    with _compute_locks_guard:
+        lock = _compute_locks.setdefault(source_id, threading.Lock())
+    with lock:
+        try:
+            if os.path.getmtime(peaks_path) >= os.path.getmtime(source_path):
+                return peaks_path
+        except OSError:
+            pass
+        return compute_peaks(source_path, peaks_path)
+
+
+def read_peaks_index(peaks_path):
+    """Read the header and level table of a peaks file"""
+    with open(peaks_path, 'rb') as f:
+        magic, version, sample_rate, total_samples, level_count = PEAKS_HEADER.unpack(f.read(PEAKS_HEADER.size))
+        if magic != PEAKS_MAGIC or version != PEAKS_VERSION:
+            raise ValueError('Unsupported peaks file')
+        levels = [PEAKS_LEVEL.unpack(f.read(PEAKS_LEVEL.size)) for _ in range(level_count)]
+    return {
+        'sample_rate': sample_rate,
+        'total_samples': total_samples,
+        'duration': total_samples / sample_rate if sample_rate else 0,
+        'levels': [
+            {'level': index, 'samples_per_peak': samples_per_peak, 'peak_count': peak_count}
+            for index, (samples_per_peak, peak_count) in enumerate(levels)
+        ],
+    }
+
+
+def read_peaks_level(peaks_path, level):
+    """Return one level of a peaks file in the single-level binary response format"""
+    index = read_peaks_index(peaks_path)
+    if level < 0 or level >= len(index['levels']):
+        raise IndexError(f"Level must be between 0 and {len(index['levels']) - 1}")
+
+    offset = PEAKS_HEADER.size + PEAKS_LEVEL.size * len(index['levels'])
+    for entry in index['levels'][:level]:
+        offset += entry['peak_count'] * 4
+    entry = index['levels'][level]
+
+    with open(peaks_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(entry['peak_count'] * 4)
+    header = LEVEL_RESPONSE_HEADER.pack(PEAKS_MAGIC, PEAKS_VERSION, index['sample_rate'],
+                                        index['total_samples'], entry['samples_per_peak'], entry['peak_count'])
+    return header + data
+
+
+def compute_peaks_async(upload_folder, filename):
+    """Compute peaks for a freshly uploaded file in the background"""
+    source_id = source_id_for(filename)
+
+    def worker():
+        try:
+            ensure_peaks(upload_folder, source_id)
+        except Exception as e:
+            logger.warning(f"Waveform peak computation failed for {filename}: {e}")
+
+    threading.Thread(target=worker, name=f"peaks-{source_id}", daemon=True).start()
+    return source_id
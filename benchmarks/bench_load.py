@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Load benchmark: Flask development server vs `server.py --production`.
+
+Starts backend/server.py once per mode, drives it with concurrent keep-alive
+HTTP clients for a fixed duration and reports requests/second and latency
+percentiles per endpoint. The result is emitted as JSON.
+
+Usage:
+    python benchmarks/bench_load.py --duration 10 --concurrency 16
+    python benchmarks/bench_load.py --modes production --server-arg=--no-waitress
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_startup import (  # noqa: E402
+    BACKEND_DIR, create_stub_ffmpeg, get_commit, poll_json, stop_process_tree
+)
+
+MODES = {
+    "dev": [],
+    "production": ["--production"],
+}
+
+DEFAULT_PATHS = ["/health", "/api/ringtones", "/api/schedules"]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def client_worker(port, paths, stop_at, samples, errors, lock):
+    """Issue requests over one keep-alive connection until stop_at"""
+    connection = None
+    local_samples = {path: [] for path in paths}
+    local_errors = 0
+    index = 0
+    while time.perf_counter() < stop_at:
+        path = paths[index % len(paths)]
+        index += 1
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            started = time.perf_counter()
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            elapsed = time.perf_counter() - started
+            if response.status >= 500:
+                local_errors += 1
+            else:
+                local_samples[path].append(elapsed)
+            if response.getheader("Connection", "").lower() == "close":
+                connection.close()
+                connection = None
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            if connection is not None:
+                connection.close()
+            connection = None
+    if connection is not None:
+        connection.close()
+    with lock:
+        for path, values in local_samples.items():
+            samples[path].extend(values)
+        errors[0] += local_errors
+
+
+def run_load(port, paths, concurrency, duration):
+    """Run concurrent clients against the server and summarize the latencies"""
+    samples = {path: [] for path in paths}
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client_worker, args=(port, paths, stop_at, samples, errors, lock))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    def describe(values):
+        values = sorted(values)
+        return {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2) if values else None,
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2) if values else None,
+            "mean_ms": round(statistics.mean(values) * 1000, 2) if values else None,
+        }
+
+    all_values = [value for values in samples.values() for value in values]
+    return {
+        "total": describe(all_values),
+        "endpoints": {path: describe(values) for path, values in samples.items()},
+        "errors": errors[0],
+        "duration_s": round(elapsed, 2),
+    }
+
+
+def start_server(env, port, server_args, timeout):
+    """Start server.py and wait until /health answers"""
+    popen_kwargs = {}
+    if os.name == "nt":
+        popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        popen_kwargs["start_new_session"] = True
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "--port", str(port)] + server_args,
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **popen_kwargs
+    )
+    if poll_json(f"http://127.0.0.1:{port}/health", time.time() + timeout) is None:
+        stop_process_tree(process)
+        return None
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringtone Creator load benchmark (dev vs production server)")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["dev", "production"])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent keep-alive clients")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Seconds of untimed load before measuring")
+    parser.add_argument("--path", action="append", dest="paths", help="Endpoint to request (repeatable)")
+    parser.add_argument("--port", type=int, default=5056, help="Port for the benchmarked server")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for readiness")
+    parser.add_argument("--server-arg", action="append", default=[], help="Extra argument passed to server.py")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+    paths = args.paths or DEFAULT_PATHS
+
+    env = os.environ.copy()
+    env["PYTHONUNBUFFERED"] = "1"
+    # Do not leave a playback daemon running after the benchmark
+    env["RINGTONE_PLAYBACK_DAEMON"] = "0"
+    stub_dir = None
+    if os.name != "nt":
+        stub_dir = tempfile.mkdtemp(prefix="ringtone_load_")
+        env["PATH"] = create_stub_ffmpeg(stub_dir) + os.pathsep + env.get("PATH", "")
+
+    results = {
+        "benchmark": "load",
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "paths": paths,
+        "modes": {},
+    }
+
+    for mode in args.modes:
+        print(f"[INFO] Starting {mode} server...", file=sys.stderr)
+        process = start_server(env, args.port, MODES[mode] + args.server_arg, args.timeout)
+        if process is None:
+            print(f"[ERROR] {mode} server did not become ready", file=sys.stderr)
+            results["modes"][mode] = {"ready": False}
+            continue
+        try:
+            if args.warmup > 0:
+                run_load(args.port, paths, args.concurrency, args.warmup)
+            results["modes"][mode] = run_load(args.port, paths, args.concurrency, args.duration)
+            total = results["modes"][mode]["total"]
+            print(f"[INFO] {mode}: {total['rps']} req/s, p50 {total['p50_ms']} ms, p99 {total['p99_ms']} ms, "
+                  f"errors {results['modes'][mode]['errors']}", file=sys.stderr)
+        finally:
+            stop_process_tree(process)
+
+    if stub_dir:
+        shutil.rmtree(stub_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"[SUCCESS] Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Headless playback benchmark: the ringtone playback paths without a sound card.
+
+Every run spawns a fresh process (as Task Scheduler does) that plays one file
+through one path against SDL's `dummy` audio driver (or the `disk` driver,
+which writes the mixed output to a file sink). Each run is broken down into:
+
+    spawn_ms        process creation until the worker's first line
+    import_ms       importing the audio library (the harness' own imports excluded)
+    mixer_init_ms   opening the output (for the daemon: connecting to it)
+    decode_ms       loading the file (pygame.music only opens it; decoding is streamed)
+    start_ms        play call until the first buffer was queued
+    playback_ms     first buffer until the sound finished
+    time_to_audio_ms / total_ms  (both without harness_ms, the worker's own imports)
+
+Paths:
+    winsound        winsound.PlaySound on Windows; elsewhere a stdlib emulation
+                    (wave module, real-time paced writes to a null sink). WAV only.
+    pygame_music    pygame.mixer.music (streaming decode)
+    pygame_sound    pygame.mixer.Sound (full decode, then play)
+    daemon          client of backend/playback_daemon.py (mixer open, sounds cached)
+
+The corpus is generated: a WAV in the mixer format, a 44.1 kHz WAV that needs
+resampling, and an MP3 (encoded with FFmpeg when available, otherwise the MP3
+bundled with the pygame examples). Results are emitted as JSON.
+
+Usage:
+    python benchmarks/bench_playback.py --runs 5 --output playback.json
+    python benchmarks/bench_playback.py --paths pygame_sound daemon --corpus my_ringtone.mp3
+"""
+
+import time
+
+WORKER_START = time.time()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import math  # noqa: E402
+import os  # noqa: E402
+import platform  # noqa: E402
+import shutil  # noqa: E402
+import struct  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+import wave  # noqa: E402
+from pathlib import Path  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_startup import BACKEND_DIR, get_commit, stop_process_tree, summarize  # noqa: E402
+
+PATHS = ["winsound", "pygame_music", "pygame_sound", "daemon"]
+
+PHASE_KEYS = [
+    "spawn_ms", "import_ms", "mixer_init_ms", "decode_ms", "start_ms",
+    "playback_ms", "time_to_audio_ms", "total_ms", "harness_ms",
+]
+
+# Bundled fallback for the MP3 corpus entry when FFmpeg cannot encode one
+BUNDLED_MP3 = BACKEND_DIR / "packages" / "pygame_extracted" / "pygame" / "examples" / "data" / "house_lo.mp3"
+
+# Mixer format shared with the player and the daemon
+sys.path.insert(0, str(BACKEND_DIR))
+from playback_renditions import MIXER_BUFFER, MIXER_CHANNELS, MIXER_FREQUENCY, MIXER_SIZE  # noqa: E402
+
+# The harness' own imports are excluded from import_ms
+HARNESS_READY = time.time()
+
+
+# ---------------------------------------------------------------------------
+# Worker side (runs in the spawned process and prints one JSON line)
+# ---------------------------------------------------------------------------
+
+def wait_until(is_busy, max_play):
+    """Wait for the sound to finish (or max_play seconds); True if it was cut short"""
+    deadline = time.time() + max_play if max_play else None
+    while is_busy():
+        if deadline and time.time() >= deadline:
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def worker_winsound(path, marks, max_play):
+    if not path.lower().endswith(".wav"):
+        raise ValueError("winsound plays WAV files only")
+    if os.name == "nt":
+        import winsound
+        marks["imported"] = marks["mixer_ready"] = marks["decoded"] = time.time()
+        marks["first_buffer"] = time.time()
+        winsound.PlaySound(path, winsound.SND_FILENAME)
+        return False
+
+    # Emulation: what a blocking native WAV player does, without any audio library
+    marks["imported"] = time.time()
+    with open(os.devnull, "wb") as sink:
+        marks["mixer_ready"] = time.time()
+        with wave.open(path, "rb") as wav_file:
+            frame_rate = wav_file.getframerate()
+            frames = wav_file.readframes(wav_file.getnframes())
+            frame_size = wav_file.getsampwidth() * wav_file.getnchannels()
+        marks["decoded"] = time.time()
+        chunk = MIXER_BUFFER * frame_size
+        started = time.time()
+        for offset in range(0, len(frames), chunk):
+            sink.write(frames[offset:offset + chunk])
+            if offset == 0:
+                marks["first_buffer"] = time.time()
+            # Pace the writes like a device consuming samples in real time
+            due = started + (offset + chunk) / frame_size / frame_rate
+            if max_play and due - started > max_play:
+                return True
+            time.sleep(max(0.0, due - time.time()))
+    return False
+
+
+def init_pygame(marks):
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+    marks["imported"] = time.time()
+    pygame.mixer.pre_init(frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
+    pygame.mixer.init()
+    marks["mixer_ready"] = time.time()
+    return pygame
+
+
+def worker_pygame_music(path, marks, max_play):
+    pygame = init_pygame(marks)
+    pygame.mixer.music.load(path)
+    marks["decoded"] = time.time()
+    pygame.mixer.music.play()
+    marks["first_buffer"] = time.time()
+    cut = wait_until(pygame.mixer.music.get_busy, max_play)
+    pygame.mixer.quit()
+    return cut
+
+
+def worker_pygame_sound(path, marks, max_play):
+    pygame = init_pygame(marks)
+    sound = pygame.mixer.Sound(path)
+    marks["decoded"] = time.time()
+    channel = sound.play()
+    marks["first_buffer"] = time.time()
+    cut = wait_until(channel.get_busy, max_play)
+    pygame.mixer.quit()
+    return cut
+
+
+def worker_daemon(path, marks, max_play):
+    import socket
+    from playback_daemon import PLAYBACK_DAEMON_HOST, PLAYBACK_DAEMON_PORT, read_token
+    marks["imported"] = time.time()
+    with socket.create_connection((PLAYBACK_DAEMON_HOST, PLAYBACK_DAEMON_PORT), timeout=5) as sock:
+        marks["mixer_ready"] = time.time()
+        request = {"cmd": "play", "path": path, "token": read_token()}
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        sock.settimeout(max_play or None)
+        with sock.makefile("rb") as reader:
+            started = json.loads(reader.readline().decode("utf-8") or "{}")
+            if not started.get("ok"):
+                raise RuntimeError(started.get("error", "daemon did not answer"))
+            # The daemon decodes (or takes the cached sound) before it answers
+            marks["decoded"] = marks["first_buffer"] = time.time()
+            try:
+                reader.readline()
+            except socket.timeout:
+                # Closing the connection stops the sound
+                return True
+    return False
+
+
+WORKERS = {
+    "winsound": worker_winsound,
+    "pygame_music": worker_pygame_music,
+    "pygame_sound": worker_pygame_sound,
+    "daemon": worker_daemon,
+}
+
+
+def run_worker(path_name, file_path, max_play):
+    marks = {"start": WORKER_START, "harness_ready": HARNESS_READY}
+    result = {"ready": False}
+    try:
+        result["cut_short"] = WORKERS[path_name](file_path, marks, max_play)
+        marks["finished"] = time.time()
+        result["ready"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["marks"] = marks
+    print(json.dumps(result))
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+def write_tone(path, seconds, frame_rate, channels, frequency=880.0):
+    """Write a 16-bit sine tone WAV"""
+    frame_count = int(seconds * frame_rate)
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(frame_rate)
+        frames = bytearray()
+        for index in range(frame_count):
+            sample = int(12000 * math.sin(2 * math.pi * frequency * index / frame_rate))
+            frames += struct.pack("<h", sample) * channels
+        wav_file.writeframes(bytes(frames))
+
+
+def encode_mp3(source, target):
+    """Encode an MP3 with FFmpeg; False if no working FFmpeg is available"""
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return False
+    try:
+        result = subprocess.run([ffmpeg, "-v", "error", "-nostdin", "-y", "-i", str(source),
+                                 "-c:a", "libmp3lame", "-b:a", "128k", str(target)],
+                                capture_output=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    # A stub FFmpeg (see bench_startup.py) exits 0 without producing real audio
+    return result.returncode == 0 and target.exists() and target.stat().st_size > 1024
+
+
+def build_corpus(work_dir, clip_seconds, extra_files):
+    corpus = []
+    mixer_wav = work_dir / "tone_mixer_format.wav"
+    write_tone(mixer_wav, clip_seconds, MIXER_FREQUENCY, MIXER_CHANNELS)
+    corpus.append(mixer_wav)
+    cd_wav = work_dir / "tone_44100_stereo.wav"
+    write_tone(cd_wav, clip_seconds, 44100, 2)
+    corpus.append(cd_wav)
+
+    mp3 = work_dir / "tone.mp3"
+    if encode_mp3(cd_wav, mp3):
+        corpus.append(mp3)
+    elif BUNDLED_MP3.exists():
+        print(f"[INFO] FFmpeg not available, using bundled MP3 {BUNDLED_MP3.name}", file=sys.stderr)
+        corpus.append(BUNDLED_MP3)
+    else:
+        print("[WARNING] No MP3 encoder and no bundled MP3, corpus has WAV files only", file=sys.stderr)
+
+    corpus.extend(Path(path).resolve() for path in extra_files)
+    return corpus
+
+
+def describe_file(path):
+    info = {"name": path.name, "format": path.suffix.lower().lstrip("."), "bytes": path.stat().st_size}
+    if path.suffix.lower() == ".wav":
+        with wave.open(str(path), "rb") as wav_file:
+            info["seconds"] = round(wav_file.getnframes() / wav_file.getframerate(), 3)
+            info["frame_rate"] = wav_file.getframerate()
+            info["channels"] = wav_file.getnchannels()
+    return info
+
+
+def phases(marks, spawned, exited):
+    def span(start, end):
+        if marks.get(start) is None or marks.get(end) is None:
+            return None
+        return round((marks[end] - marks[start]) * 1000, 2)
+
+    result = {
+        "spawn_ms": round((marks["start"] - spawned) * 1000, 2),
+        "import_ms": span("harness_ready", "imported"),
+        "mixer_init_ms": span("imported", "mixer_ready"),
+        "decode_ms": span("mixer_ready", "decoded"),
+        "start_ms": span("decoded", "first_buffer"),
+        "playback_ms": span("first_buffer", "finished"),
+    }
+    result["total_ms"] = round((exited - spawned) * 1000 - (span("start", "harness_ready") or 0), 2)
+    # The harness' imports are not part of any playback path
+    result["harness_ms"] = span("start", "harness_ready")
+    if marks.get("first_buffer") is not None:
+        result["time_to_audio_ms"] = round((marks["first_buffer"] - spawned) * 1000 - result["harness_ms"], 2)
+    return result
+
+
+def measure(path_name, file_path, env, max_play, timeout):
+    """Spawn one worker process and break its run down by phase"""
+    command = [sys.executable, str(Path(__file__).resolve()), "--worker", path_name, str(file_path),
+               "--max-play", str(max_play)]
+    spawned = time.time()
+    try:
+        completed = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"ready": False, "error": f"timed out after {timeout}s"}
+    exited = time.time()
+
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        return {"ready": False, "error": completed.stderr.strip()[-500:] or f"exit code {completed.returncode}"}
+    result = json.loads(lines[-1])
+    if result.get("ready"):
+        result.update(phases(result["marks"], spawned, exited))
+    result.pop("marks", None)
+    return result
+
+
+def start_daemon(env, timeout=10.0):
+    """Start the playback daemon on the benchmark port and wait until it answers"""
+    from playback_daemon import send_request
+    popen_kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == "nt" else {"start_new_session": True}
+    process = subprocess.Popen([sys.executable, "playback_daemon.py"], cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **popen_kwargs)
+    port = int(env["RINGTONE_PLAYBACK_PORT"])
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            return None
+        reply = send_request({"cmd": "ping"}, port=port)
+        if reply and reply.get("ok"):
+            return process
+        time.sleep(0.05)
+    stop_process_tree(process)
+    return None
+
+
+def stop_daemon(process, env):
+    from playback_daemon import send_request
+    send_request({"cmd": "shutdown"}, port=int(env["RINGTONE_PLAYBACK_PORT"]))
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        stop_process_tree(process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringtone Creator headless playback benchmark")
+    parser.add_argument("--worker", nargs=2, metavar=("PATH", "FILE"), help=argparse.SUPPRESS)
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=PATHS)
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per path and file")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per path and file (fills OS and daemon caches)")
+    parser.add_argument("--audio-driver", choices=["dummy", "disk"], default="dummy",
+                        help="SDL audio driver: dummy (null sink) or disk (writes the output to a file)")
+    parser.add_argument("--clip-seconds", type=float, default=1.0, help="Length of the generated tones")
+    parser.add_argument("--max-play", type=float, default=0.0, help="Stop each playback after N seconds (0 = full)")
+    parser.add_argument("--corpus", nargs="*", default=[], help="Additional audio files to benchmark")
+    parser.add_argument("--port", type=int, default=50515, help="Port for the benchmark's playback daemon")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds before a run is abandoned")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker[0], args.worker[1], args.max_play)
+        return
+
+    work_dir = Path(tempfile.mkdtemp(prefix="ringtone_playback_"))
+    env = os.environ.copy()
+    env["SDL_AUDIODRIVER"] = args.audio_driver
+    env["SDL_VIDEODRIVER"] = "dummy"
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    env["RINGTONE_PLAYBACK_PORT"] = str(args.port)
+    if args.audio_driver == "disk":
+        env["SDL_DISKAUDIOFILE"] = str(work_dir / "sink.raw")
+
+    corpus = build_corpus(work_dir, args.clip_seconds, args.corpus)
+    results = {
+        "benchmark": "playback",
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "audio_driver": args.audio_driver,
+        "winsound_emulated": os.name != "nt",
+        "runs": args.runs,
+        "max_play_s": args.max_play,
+        "corpus": [describe_file(path) for path in corpus],
+        "paths": {},
+    }
+
+    daemon = None
+    if "daemon" in args.paths:
+        daemon = start_daemon(env)
+        if daemon is None:
+            print("[ERROR] Playback daemon did not start", file=sys.stderr)
+
+    try:
+        for path_name in args.paths:
+            results["paths"][path_name] = {}
+            for file_path in corpus:
+                if path_name == "daemon" and daemon is None:
+                    results["paths"][path_name][file_path.name] = {"skipped": "daemon not running"}
+                    continue
+                if path_name == "winsound" and file_path.suffix.lower() != ".wav":
+                    results["paths"][path_name][file_path.name] = {"skipped": "WAV only"}
+                    continue
+
+                for _ in range(args.warmup):
+                    measure(path_name, file_path, env, args.max_play, args.timeout)
+                runs = [measure(path_name, file_path, env, args.max_play, args.timeout) for _ in range(args.runs)]
+                summary = summarize(runs, PHASE_KEYS)
+                results["paths"][path_name][file_path.name] = {"summary": summary, "runs": runs}
+
+                audio = summary.get("time_to_audio_ms", {}).get("median")
+                errors = [run["error"] for run in runs if run.get("error")]
+                print(f"[INFO] {path_name} / {file_path.name}: time to audio {audio} ms"
+                      + (f", {len(errors)} failed ({errors[0]})" if errors else ""), file=sys.stderr)
+    finally:
+        if daemon is not None:
+            stop_daemon(daemon, env)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"[SUCCESS] Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
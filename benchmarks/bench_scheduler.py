@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Scheduler scale benchmark: the Windows scheduler backend against a simulated
+`schtasks` (benchmarks/fake_schtasks.py) preloaded with thousands of tasks.
+
+Runs in-process: the fake schtasks shim goes first on PATH, the backend is
+forced to RINGTONE_SCHEDULER_BACKEND=windows, and create / list / enable /
+disable / delete are driven through the Flask test client (or directly
+through `task_scheduler_service` with --via service). Reports ops/second and
+p50/p99 latency per operation as JSON, so task listing and batching changes
+can be measured on Linux/macOS.
+
+Usage:
+    python benchmarks/bench_scheduler.py --tasks 2000 --ops 50
+    python benchmarks/bench_scheduler.py --tasks 5000 --latency 0.05 --via client service
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import statistics
+import struct
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_load import percentile  # noqa: E402
+from bench_startup import BACKEND_DIR, get_commit  # noqa: E402
+import fake_schtasks  # noqa: E402
+
+OPERATIONS = ["create", "list", "list_refresh", "disable", "enable", "delete"]
+
+# Sunday..Saturday codes as listed by schtasks
+DAY_CODES = ["SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"]
+
+
+def write_tone(path, seconds=0.2, frame_rate=22050, frequency=880.0):
+    """Short stereo 16-bit tone in the mixer format (so no playback rendition is created)"""
+    frames = int(seconds * frame_rate)
+    samples = bytearray()
+    for index in range(frames):
+        value = int(8000 * math.sin(2 * math.pi * frequency * index / frame_rate))
+        samples += struct.pack("<hh", value, value)
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(frame_rate)
+        wav_file.writeframes(bytes(samples))
+    return str(path)
+
+
+def preload(state_file, trigger_map_file, player_script, python_exe, ringtone_dir, count, per_task):
+    """
+    Write `count` schedules into the fake schtasks state and the trigger map,
+    `per_task` schedules (triggers) per ringtone task. The preloaded ringtone
+    files need not exist; only created schedules are validated.
+    """
+    from task_xml import player_arguments, ringtone_task_name
+
+    tasks, schedules = {}, {}
+    for index in range(count):
+        task_index = index // per_task
+        ringtone_path = os.path.join(ringtone_dir, f"preloaded_{task_index}.wav")
+        task = ringtone_task_name(ringtone_path)
+        time_value = f"{(index * 7) % 24:02d}:{(index * 13) % 60:02d}"
+        days = sorted({index % 7, (index + 3) % 7})
+        entry = tasks.setdefault(f"Ringtone_{task}", {
+            "task_to_run": "", "enabled": True, "xml": None, "triggers": [], "times": [], "ringtone_path": ringtone_path,
+        })
+        entry["triggers"].append({"time": time_value, "days": [fake_schtasks.DAY_CODES[DAY_CODES[day]] for day in days],
+                                  "enabled": True})
+        entry["times"].append(time_value)
+        schedules[f"preload_{index}"] = {"task": task, "ringtone_path": ringtone_path, "time": time_value,
+                                         "days": days, "enabled": True}
+
+    for entry in tasks.values():
+        entry["task_to_run"] = f"{python_exe} {player_arguments(player_script, entry.pop('ringtone_path'), entry.pop('times'))}"
+    with open(state_file, "w", encoding="utf-8") as f:
+        json.dump({"tasks": tasks}, f)
+    with open(trigger_map_file, "w", encoding="utf-8") as f:
+        json.dump({"schedules": schedules}, f)
+    return len(tasks)
+
+
+def describe(values, elapsed):
+    values = sorted(values)
+    return {
+        "ops": len(values),
+        "ops_per_s": round(len(values) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2) if values else None,
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2) if values else None,
+        "mean_ms": round(statistics.mean(values) * 1000, 2) if values else None,
+    }
+
+
+def make_calls(via, client, service, ringtones):
+    """Operation name -> callable(index) returning True on success"""
+    def task_name(index):
+        return f"bench_{index}"
+
+    def ringtone(index):
+        # A handful of ringtones, so new schedules share tasks the way real ones do
+        return ringtones[index % len(ringtones)]
+
+    def schedule(index):
+        return f"{(index * 5) % 24:02d}:{(index * 11) % 60:02d}", [index % 7]
+
+    if via == "service":
+        return {
+            "create": lambda index: service.create_scheduled_task(task_name(index), ringtone(index), *schedule(index)),
+            "list": lambda index: service.list_all_tasks() is not None,
+            "list_refresh": lambda index: service.list_all_tasks(refresh=True) is not None,
+            "disable": lambda index: service.disable_scheduled_task(task_name(index)),
+            "enable": lambda index: service.enable_scheduled_task(task_name(index)),
+            "delete": lambda index: service.delete_scheduled_task(task_name(index)),
+        }
+
+    def post(path, index, **extra):
+        response = client.post(path, json={"task_name": task_name(index), **extra})
+        return response.status_code == 200 and response.get_json().get("success")
+
+    def create(index):
+        time_value, days = schedule(index)
+        return post("/api/task-scheduler/create", index, ringtone_path=ringtone(index), time=time_value, days=days)
+
+    def get(path):
+        response = client.get(path)
+        return response.status_code == 200 and response.get_json().get("success")
+
+    return {
+        "create": create,
+        "list": lambda index: get("/api/task-scheduler/list"),
+        "list_refresh": lambda index: get("/api/task-scheduler/list?refresh=1"),
+        "disable": lambda index: post("/api/task-scheduler/disable", index),
+        "enable": lambda index: post("/api/task-scheduler/enable", index),
+        "delete": lambda index: post("/api/task-scheduler/delete", index),
+    }
+
+
+def run_operations(calls, operations, ops):
+    """Run each operation `ops` times in order (create before enable/disable/delete reuse its tasks)"""
+    results = {}
+    for operation in operations:
+        samples, errors = [], 0
+        started = time.perf_counter()
+        for index in range(ops):
+            call_started = time.perf_counter()
+            try:
+                ok = calls[operation](index)
+            except Exception as e:
+                print(f"[WARNING] {operation} #{index} raised: {e}", file=sys.stderr)
+                ok = False
+            samples.append(time.perf_counter() - call_started)
+            errors += 0 if ok else 1
+        results[operation] = {**describe(samples, time.perf_counter() - started), "errors": errors}
+        summary = results[operation]
+        print(f"[INFO] {operation}: {summary['ops_per_s']} ops/s, p50 {summary['p50_ms']} ms, "
+              f"p99 {summary['p99_ms']} ms, errors {errors}", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringtone Creator scheduler scale benchmark (simulated schtasks)")
+    parser.add_argument("--tasks", type=int, default=2000, help="Schedules preloaded into the fake Task Scheduler")
+    parser.add_argument("--per-task", type=int, default=1, help="Preloaded schedules (triggers) per ringtone task")
+    parser.add_argument("--ops", type=int, default=50, help="Timed calls per operation")
+    parser.add_argument("--latency", type=float, default=0.0, help="Extra seconds per schtasks call")
+    parser.add_argument("--ringtones", type=int, default=5, help="Distinct ringtone files used by created schedules")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument("--via", nargs="+", choices=["client", "service"], default=["client"],
+                        help="Drive the Flask endpoints, the scheduler service directly, or both")
+    parser.add_argument("--verbose", action="store_true", help="Keep the server's per-call INFO logging")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="ringtone_scheduler_bench_")
+    bin_dir = os.path.join(work_dir, "bin")
+    fake_schtasks.install(bin_dir)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+    os.environ["FAKE_SCHTASKS_DELAY"] = str(args.latency)
+    os.environ["RINGTONE_SCHEDULER_BACKEND"] = "windows"
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("RINGTONE_PLAYBACK_DAEMON", "0")
+    ringtones = [write_tone(Path(work_dir) / f"bench_tone_{index}.wav", frequency=440.0 + 110 * index)
+                 for index in range(max(1, args.ringtones))]
+
+    results = {
+        "benchmark": "scheduler",
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "preloaded_schedules": args.tasks,
+        "per_task": args.per_task,
+        "schtasks_latency_s": args.latency,
+        "ops": args.ops,
+        "via": {},
+    }
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    print("[INFO] Importing server...", file=sys.stderr)
+    import server
+    from taskSchedulerService import TaskTriggerMap
+    if not args.verbose:
+        # Every schtasks call logs several lines; that cost is not what is measured here
+        logging.disable(logging.INFO)
+    service = server.task_scheduler_service
+    if getattr(service, "name", None) != "windows":
+        print(f"[ERROR] Expected the windows scheduler backend, got {getattr(service, 'name', None)}", file=sys.stderr)
+        return 1
+    service.python_exe = sys.executable
+    client = server.app.test_client()
+
+    try:
+        for via in args.via:
+            # Fresh fake Task Scheduler per run, so every run starts from the same preload
+            state_file = os.path.join(work_dir, f"schtasks_{via}.json")
+            trigger_map_file = os.path.join(work_dir, f"triggers_{via}.json")
+            os.environ["FAKE_SCHTASKS_STATE"] = state_file
+            started = time.perf_counter()
+            task_count = preload(state_file, trigger_map_file, service.ringtone_player_script, sys.executable,
+                                 os.path.join(work_dir, "preloaded"), args.tasks, max(1, args.per_task))
+            service.triggers = TaskTriggerMap(trigger_map_file)
+            service.list_all_tasks(refresh=True)
+            print(f"[INFO] {via}: preloaded {args.tasks} schedules in {task_count} tasks "
+                  f"({time.perf_counter() - started:.2f}s)", file=sys.stderr)
+
+            results["via"][via] = {
+                "preloaded_tasks": task_count,
+                "operations": run_operations(make_calls(via, client, service, ringtones), args.operations, args.ops),
+            }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"[SUCCESS] Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
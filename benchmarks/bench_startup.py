@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Startup benchmark for the Ringtone Creator backend (and optionally a launcher).
+
+Runs `python backend/server.py` cold and warm N times, polls /health until the
+server answers and breaks the time-to-ready down by startup phase (imports,
+ffmpeg probe, pydub self-test, Flask app construction). The result is emitted
+as JSON so numbers can be compared across commits.
+
+interpreter_startup_ms is the time from spawn until the serving process ran
+the first line of server.py; with the Werkzeug reloader (debug=True) it also
+includes the reloader parent importing server.py once.
+
+On POSIX a stub ffmpeg/ffprobe is put on PATH so the benchmark runs on a plain
+Linux box without FFmpeg installed.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --output startup.json
+    python benchmarks/bench_startup.py --launcher py_start_app.py --runs 1
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = APP_DIR / "backend"
+
+# Stub ffmpeg: writes a few bytes to the output file (always the last argument)
+STUB_FFMPEG = """#!{python}
+import sys
+if len(sys.argv) > 1 and not sys.argv[-1].startswith('-'):
+    with open(sys.argv[-1], 'wb') as f:
+        f.write(b'ID3' + b'\\x00' * 125)
+sys.exit(0)
+"""
+
+
+def create_stub_ffmpeg(target_dir):
+    """Create stub ffmpeg/ffprobe executables in target_dir (POSIX only)"""
+    for name in ("ffmpeg", "ffprobe"):
+        stub_path = Path(target_dir) / name
+        stub_path.write_text(STUB_FFMPEG.format(python=sys.executable))
+        stub_path.chmod(0o755)
+    return str(target_dir)
+
+
+def get_commit():
+    """Return the current git commit (short) or None"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+                                capture_output=True, text=True, timeout=5)
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except Exception:
+        pass
+    return None
+
+
+def poll_json(url, deadline, interval=0.02):
+    """Poll url until it returns HTTP 200 JSON or the deadline passes"""
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return json.loads(response.read().decode("utf-8"))
+        except Exception:
+            pass
+        time.sleep(interval)
+    return None
+
+
+def poll_url(url, deadline, interval=0.05):
+    """Poll url until it answers with any HTTP status below 500"""
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status < 500:
+                    return True
+        except Exception:
+            pass
+        time.sleep(interval)
+    return False
+
+
+def stop_process_tree(process):
+    """Stop a spawned process and everything it started (e.g. the Werkzeug reloader child)"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except Exception:
+        process.kill()
+        process.wait()
+
+
+def stop_listeners(ports):
+    """Kill processes listening on the given ports (used between launcher runs)"""
+    try:
+        import psutil
+    except ImportError:
+        print("[WARNING] psutil not available, cannot stop services between launcher runs")
+        return
+    for conn in psutil.net_connections(kind="tcp"):
+        if conn.laddr and conn.laddr.port in ports and conn.status == psutil.CONN_LISTEN and conn.pid:
+            try:
+                psutil.Process(conn.pid).kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+
+def measure_server(env, port, timeout, server_args):
+    """Start server.py once and measure time until /health answers"""
+    popen_kwargs = {}
+    if os.name == "nt":
+        popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        popen_kwargs["start_new_session"] = True
+
+    spawn_epoch = time.time()
+    process = subprocess.Popen(
+        [sys.executable, "server.py"] + server_args,
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **popen_kwargs
+    )
+    try:
+        health = poll_json(f"http://127.0.0.1:{port}/health", spawn_epoch + timeout)
+        ready_epoch = time.time()
+    finally:
+        stop_process_tree(process)
+
+    if health is None:
+        return {"ready": False, "timeout_s": timeout}
+
+    phases = health.get("startup_phases", {})
+    total_ms = (ready_epoch - spawn_epoch) * 1000
+    interpreter_ms = None
+    if health.get("startup_epoch"):
+        # Time from spawn until the first line of server.py ran (interpreter startup)
+        interpreter_ms = round((health["startup_epoch"] - spawn_epoch) * 1000, 2)
+    serve_ms = None
+    if interpreter_ms is not None:
+        # Everything after the module-level phases: app.run(), bind, first request
+        serve_ms = round(total_ms - interpreter_ms - sum(phases.values()), 2)
+
+    return {
+        "ready": True,
+        "time_to_ready_ms": round(total_ms, 2),
+        "interpreter_startup_ms": interpreter_ms,
+        "phases_ms": phases,
+        "serve_ms": serve_ms,
+        "ffmpeg_available": health.get("ffmpeg_available"),
+        "pydub_working": health.get("pydub_working"),
+    }
+
+
+def measure_launcher(launcher, env, timeout, frontend_url):
+    """Start a py_start_app*.py launcher and measure until backend and UI answer"""
+    spawn_epoch = time.time()
+    process = subprocess.Popen(
+        [sys.executable, launcher],
+        cwd=APP_DIR,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = spawn_epoch + timeout
+    result = {"ready": False}
+    if poll_json("http://127.0.0.1:5000/health", deadline) is not None:
+        result["backend_ready_ms"] = round((time.time() - spawn_epoch) * 1000, 2)
+        if poll_url(frontend_url, deadline):
+            result["ui_ready_ms"] = round((time.time() - spawn_epoch) * 1000, 2)
+            result["ready"] = True
+    try:
+        process.wait(timeout=max(1, deadline - time.time()))
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    result["launcher_exit_ms"] = round((time.time() - spawn_epoch) * 1000, 2)
+    return result
+
+
+def summarize(runs, keys):
+    """Return min/median/mean/max for the numeric keys of the ready runs"""
+    summary = {}
+    ready_runs = [run for run in runs if run.get("ready")]
+    for key in keys:
+        values = []
+        for run in ready_runs:
+            value = run
+            for part in key.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            if isinstance(value, (int, float)):
+                values.append(value)
+        if values:
+            summary[key] = {
+                "min": round(min(values), 2),
+                "median": round(statistics.median(values), 2),
+                "mean": round(statistics.mean(values), 2),
+                "max": round(max(values), 2),
+            }
+    summary["ready_runs"] = len(ready_runs)
+    summary["failed_runs"] = len(runs) - len(ready_runs)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringtone Creator startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per mode (cold and warm)")
+    parser.add_argument("--port", type=int, default=5055, help="Port for the benchmarked server")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for readiness")
+    parser.add_argument("--no-stub-ffmpeg", action="store_true", help="Use the real FFmpeg instead of a stub")
+    parser.add_argument("--server-arg", action="append", default=[], help="Extra argument passed to server.py")
+    parser.add_argument("--launcher", help="Benchmark a launcher script (e.g. py_start_app.py) instead of server.py")
+    parser.add_argument("--frontend-url", default="http://127.0.0.1:3000", help="UI URL polled in launcher mode")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="ringtone_bench_"))
+    env = os.environ.copy()
+    env["RINGTONE_BACKEND_PORT"] = str(args.port)
+    env["PYTHONUNBUFFERED"] = "1"
+    # Do not leave a playback daemon running after the benchmark
+    env["RINGTONE_PLAYBACK_DAEMON"] = "0"
+
+    stub_used = False
+    if not args.no_stub_ffmpeg and os.name != "nt":
+        stub_dir = work_dir / "stub_ffmpeg"
+        stub_dir.mkdir()
+        env["PATH"] = create_stub_ffmpeg(stub_dir) + os.pathsep + env.get("PATH", "")
+        stub_used = True
+
+    results = {
+        "benchmark": "startup",
+        "target": args.launcher or "backend/server.py",
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stub_ffmpeg": stub_used,
+        "runs_per_mode": args.runs,
+        "runs": {"cold": [], "warm": []},
+    }
+
+    try:
+        warm_cache = work_dir / "pycache_warm"
+        for mode in ("cold", "warm"):
+            print(f"[INFO] Running {args.runs} {mode} start(s)...", file=sys.stderr)
+            if mode == "warm":
+                # Prime the bytecode cache with one untimed run
+                env["PYTHONPYCACHEPREFIX"] = str(warm_cache)
+                if args.launcher:
+                    measure_launcher(args.launcher, env, args.timeout, args.frontend_url)
+                    stop_listeners({5000, 3000})
+                else:
+                    measure_server(env, args.port, args.timeout, args.server_arg)
+            for index in range(args.runs):
+                if mode == "cold":
+                    # A fresh bytecode cache per run forces every module to be compiled
+                    env["PYTHONPYCACHEPREFIX"] = str(work_dir / f"pycache_cold_{index}")
+                if args.launcher:
+                    run = measure_launcher(args.launcher, env, args.timeout, args.frontend_url)
+                    stop_listeners({5000, 3000})
+                else:
+                    run = measure_server(env, args.port, args.timeout, args.server_arg)
+                results["runs"][mode].append(run)
+                print(f"[INFO] {mode} run {index + 1}: {run}", file=sys.stderr)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.launcher:
+        keys = ["backend_ready_ms", "ui_ready_ms", "launcher_exit_ms"]
+    else:
+        keys = ["time_to_ready_ms", "interpreter_startup_ms", "serve_ms",
+                "phases_ms.imports", "phases_ms.ffmpeg_probe",
+                "phases_ms.pydub_self_test", "phases_ms.flask_app"]
+    results["summary"] = {mode: summarize(runs, keys) for mode, runs in results["runs"].items()}
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"[SUCCESS] Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
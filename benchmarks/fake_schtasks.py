@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Fake `schtasks` for running the Windows scheduler backend on Linux/macOS.
+
+Understands the subset taskSchedulerService.py uses:
+    /create /tn NAME /xml FILE [/f]
+    /create /tn NAME /tr CMD /sc weekly /d DAYS /st HH:MM [/f]
+    /delete /tn NAME [/f]
+    /change /tn NAME /enable | /disable
+    /query /fo csv /v          (one row per trigger, like the real one)
+
+Tasks are kept in a JSON state file (FAKE_SCHTASKS_STATE, default
+fake_schtasks_state.json in the temp directory) under an flock, so parallel
+calls behave. Registered XML is stored verbatim for golden-file checks.
+FAKE_SCHTASKS_DELAY adds a fixed delay (seconds) per call to mimic the real
+process start-up cost.
+
+Install a `schtasks` shim into a directory that is then put first on PATH:
+    python benchmarks/fake_schtasks.py --install /tmp/fakebin
+"""
+
+import csv
+import fcntl
+import io
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+STATE_FILE = os.environ.get("FAKE_SCHTASKS_STATE") or os.path.join(tempfile.gettempdir(), "fake_schtasks_state.json")
+
+TASK_NAMESPACE = "{http://schemas.microsoft.com/windows/2004/02/mit/task}"
+DAY_CODES = {"SUN": "Sunday", "MON": "Monday", "TUE": "Tuesday", "WED": "Wednesday",
+             "THU": "Thursday", "FRI": "Friday", "SAT": "Saturday"}
+
+# Leading columns of `schtasks /query /fo csv /v` (English)
+CSV_HEADER = ["HostName", "TaskName", "Next Run Time", "Status", "Logon Mode", "Last Run Time",
+              "Last Result", "Author", "Task To Run", "Start In", "Comment", "Scheduled Task State",
+              "Start Time", "Days"]
+
+
+def install(bin_dir):
+    """Write an executable `schtasks` shim running this script with the current interpreter"""
+    os.makedirs(bin_dir, exist_ok=True)
+    shim = os.path.join(bin_dir, "schtasks")
+    with open(shim, "w") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" "$@"\n')
+    os.chmod(shim, os.stat(shim).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return shim
+
+
+def parse_args(argv):
+    options, flags, index = {}, set(), 0
+    while index < len(argv):
+        arg = argv[index].lower()
+        if arg in ("/tn", "/xml", "/tr", "/sc", "/d", "/st", "/fo"):
+            options[arg] = argv[index + 1] if index + 1 < len(argv) else ""
+            index += 2
+        else:
+            flags.add(arg)
+            index += 1
+    return options, flags
+
+
+def parse_task_xml(path):
+    with open(path, "r", encoding="utf-16") as f:
+        text = f.read()
+    root = ET.fromstring(text.split("?>", 1)[1] if text.startswith("<?xml") else text)
+    triggers = []
+    for trigger in root.iter(f"{TASK_NAMESPACE}CalendarTrigger"):
+        boundary = trigger.findtext(f"{TASK_NAMESPACE}StartBoundary", "")
+        days = [day.tag.replace(TASK_NAMESPACE, "") for day in trigger.iter()
+                if day.tag.replace(TASK_NAMESPACE, "") in DAY_CODES.values()]
+        triggers.append({
+            "time": boundary.split("T")[1][:5] if "T" in boundary else "",
+            "days": days,
+            "enabled": trigger.findtext(f"{TASK_NAMESPACE}Enabled", "true") == "true",
+        })
+    command = root.findtext(f".//{TASK_NAMESPACE}Exec/{TASK_NAMESPACE}Command", "")
+    arguments = root.findtext(f".//{TASK_NAMESPACE}Exec/{TASK_NAMESPACE}Arguments", "")
+    enabled = root.findtext(f"{TASK_NAMESPACE}Settings/{TASK_NAMESPACE}Enabled", "true") == "true"
+    return {"task_to_run": f"{command} {arguments}".strip(), "triggers": triggers, "enabled": enabled, "xml": text}
+
+
+def format_rows(tasks):
+    out = io.StringIO()
+    writer = csv.writer(out, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+    writer.writerow(CSV_HEADER)
+    for name, task in sorted(tasks.items()):
+        status = "Ready" if task["enabled"] else "Disabled"
+        for trigger in task["triggers"] or [{"time": "", "days": []}]:
+            writer.writerow(["FAKEHOST", f"\\{name}", "N/A", status, "Interactive only", "N/A", "267011",
+                             "FAKEHOST\\user", task["task_to_run"], "N/A", "N/A",
+                             "Enabled" if task["enabled"] else "Disabled",
+                             trigger["time"], ", ".join(day[:3].upper() for day in trigger["days"])])
+    return out.getvalue()
+
+
+def run(argv, state):
+    """Apply one command to the state; returns (exit code, stdout, stderr)"""
+    if not argv:
+        return 1, "", "ERROR: Invalid syntax.\n"
+    command = argv[0].lower()
+    options, flags = parse_args(argv[1:])
+    tasks = state.setdefault("tasks", {})
+    name = options.get("/tn", "").lstrip("\\")
+
+    if command == "/query":
+        return 0, format_rows(tasks), ""
+
+    if command == "/create":
+        if name in tasks and "/f" not in flags:
+            return 1, "", "ERROR: Cannot create a file when that file already exists.\n"
+        if "/xml" in options:
+            try:
+                tasks[name] = parse_task_xml(options["/xml"])
+            except (OSError, ET.ParseError, UnicodeError) as e:
+                return 1, "", f"ERROR: The task XML is malformed. {e}\n"
+        else:
+            days = [DAY_CODES[day.strip().upper()] for day in options.get("/d", "").split(",") if day.strip()]
+            tasks[name] = {"task_to_run": options.get("/tr", ""), "enabled": True, "xml": None,
+                           "triggers": [{"time": options.get("/st", ""), "days": days, "enabled": True}]}
+        return 0, f'SUCCESS: The scheduled task "{name}" has successfully been created.\n', ""
+
+    if name not in tasks:
+        return 1, "", "ERROR: The system cannot find the file specified.\n"
+    if command == "/delete":
+        del tasks[name]
+        return 0, f'SUCCESS: The scheduled task "{name}" was successfully deleted.\n', ""
+    if command == "/change":
+        if "/enable" in flags or "/disable" in flags:
+            tasks[name]["enabled"] = "/enable" in flags
+        return 0, f'SUCCESS: The parameters of scheduled task "{name}" have been changed.\n', ""
+    return 1, "", f"ERROR: Invalid argument/option - '{argv[0]}'.\n"
+
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"tasks": {}}
+
+
+def main(argv):
+    if argv[:1] == ["--install"]:
+        print(install(argv[1] if len(argv) > 1 else "."))
+        return 0
+
+    delay = float(os.environ.get("FAKE_SCHTASKS_DELAY", "0") or 0)
+    if delay:
+        time.sleep(delay)
+    with open(STATE_FILE + ".lock", "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        state = load_state()
+        code, stdout, stderr = run(argv, state)
+        if code == 0 and argv and argv[0].lower() != "/query":
+            tmp_file = STATE_FILE + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_file, STATE_FILE)
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Shared helpers for the py_start_app*.py launchers.
+Readiness probing for the backend/frontend services started by the launchers,
+a fingerprinted cache for the launcher preflight checks, incremental
+extraction of bundled files and the production (prebuilt frontend) mode.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Overall time the launchers wait for the services to become ready
+STARTUP_DEADLINE = 120
+
+# Backoff between readiness probes (seconds)
+PROBE_INITIAL_DELAY = 0.1
+PROBE_MAX_DELAY = 2.0
+
+
+def is_port_open(port, host="127.0.0.1", timeout=0.25):
+    """Return True if something accepts TCP connections on host:port"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def probe_http(port, path="/", host="127.0.0.1", timeout=2.0):
+    """Return True if an HTTP GET on host:port/path answers with a non-5xx status"""
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=timeout) as response:
+            return response.status < 500
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except Exception:
+        return False
+
+
+def wait_for_service(port, health_path="/", deadline=None, host="127.0.0.1"):
+    """
+    Wait until a service accepts connections and answers its health URL.
+
+    Probes with exponential backoff (PROBE_INITIAL_DELAY doubling up to
+    PROBE_MAX_DELAY) until the absolute `deadline` (time.monotonic() value).
+
+    Returns:
+        float: Seconds waited until ready, or None if the deadline passed
+    """
+    started = time.monotonic()
+    if deadline is None:
+        deadline = started + STARTUP_DEADLINE
+    delay = PROBE_INITIAL_DELAY
+
+    while True:
+        # Cheap socket connect first, HTTP probe only once the port is bound
+        if is_port_open(port, host) and probe_http(port, health_path, host):
+            return time.monotonic() - started
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, PROBE_MAX_DELAY)
+
+
+def wait_for_services(services, timeout=STARTUP_DEADLINE):
+    """
+    Wait for several services concurrently under one overall deadline.
+
+    Args:
+        services: Dict of name -> (port, health_path)
+        timeout: Overall deadline in seconds shared by all services
+
+    Returns:
+        Dict of name -> seconds until ready (None if not ready in time)
+    """
+    deadline = time.monotonic() + timeout
+    with ThreadPoolExecutor(max_workers=max(1, len(services))) as pool:
+        futures = {
+            name: pool.submit(wait_for_service, port, path, deadline)
+            for name, (port, path) in services.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def wait_for_port_free(port, timeout=5.0, host="127.0.0.1"):
+    """Wait until nothing listens on host:port any more. Returns True if free."""
+    deadline = time.monotonic() + timeout
+    delay = PROBE_INITIAL_DELAY
+    while is_port_open(port, host):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, PROBE_MAX_DELAY)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Preflight result cache
+# ---------------------------------------------------------------------------
+
+PREFLIGHT_CACHE_VERSION = 1
+# Re-run the preflight at least this often even if nothing changed (seconds)
+PREFLIGHT_CACHE_MAX_AGE = 7 * 24 * 3600
+
+
+def _file_sha256(path):
+    """Return the sha256 of a file, or None if it does not exist"""
+    try:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def _executable_stamp(command):
+    """Resolve a command (or path) to [path, mtime_ns], or None if not found"""
+    path = command if os.path.isabs(command) else shutil.which(command)
+    if not path:
+        return None
+    try:
+        return [os.path.abspath(path), os.stat(path).st_mtime_ns]
+    except OSError:
+        return None
+
+
+def compute_preflight_fingerprint(app_dir, python_commands, extra_paths=()):
+    """
+    Fingerprint everything the launcher preflight checks depend on.
+
+    Covers the interpreter paths and mtimes, the requirements.txt and
+    package-lock.json hashes and the existence/mtime of extra marker files
+    (react-scripts, ffmpeg). Any change produces a different fingerprint.
+    """
+    app_dir = Path(app_dir)
+    stamps = {
+        "version": PREFLIGHT_CACHE_VERSION,
+        "python": {cmd: _executable_stamp(cmd) for cmd in python_commands},
+        "node": _executable_stamp("node"),
+        "npm": _executable_stamp("npm"),
+        "requirements": _file_sha256(app_dir / "backend" / "requirements.txt"),
+        "package_lock": _file_sha256(app_dir / "package-lock.json"),
+        "markers": {},
+    }
+    for path in extra_paths:
+        try:
+            stamps["markers"][str(path)] = os.stat(path).st_mtime_ns
+        except OSError:
+            stamps["markers"][str(path)] = None
+    encoded = json.dumps(stamps, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def load_preflight_cache(cache_file, fingerprint):
+    """Return the cached preflight results if the fingerprint still matches, else None"""
+    try:
+        with open(cache_file, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("fingerprint") != fingerprint:
+        return None
+    if time.time() - cache.get("created", 0) > PREFLIGHT_CACHE_MAX_AGE:
+        return None
+    return cache.get("results")
+
+
+def save_preflight_cache(cache_file, fingerprint, results):
+    """Store preflight results under a fingerprint (atomic replace)"""
+    tmp_file = f"{cache_file}.tmp"
+    try:
+        with open(tmp_file, "w") as f:
+            json.dump({"fingerprint": fingerprint, "created": time.time(), "results": results}, f, indent=2)
+        os.replace(tmp_file, cache_file)
+        return True
+    except OSError:
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Incremental extraction of bundled files
+# ---------------------------------------------------------------------------
+
+EXTRACTION_MANIFEST = ".extraction_manifest.json"
+# Optional manifest written at build time next to the bundled files
+BUNDLE_MANIFEST = "bundle_manifest.json"
+EXTRACTION_WORKERS = 8
+
+
+def _iter_item_files(root, items):
+    """Yield relative POSIX paths of all files below the given top-level items"""
+    root = Path(root)
+    for item in items:
+        path = root / item
+        if path.is_dir():
+            for file_path in path.rglob("*"):
+                if file_path.is_file():
+                    yield file_path.relative_to(root).as_posix()
+        elif path.is_file():
+            yield Path(item).as_posix()
+
+
+def build_bundle_manifest(bundle_dir, items, max_workers=EXTRACTION_WORKERS):
+    """
+    Build {relative_path: {"size": int, "sha256": str}} for the bundled items.
+    Uses the build-time BUNDLE_MANIFEST when present, otherwise hashes in parallel.
+    """
+    bundle_dir = Path(bundle_dir)
+    prebuilt = bundle_dir / BUNDLE_MANIFEST
+    if prebuilt.exists():
+        try:
+            with open(prebuilt, "r") as f:
+                manifest = json.load(f)
+            prefixes = tuple(Path(item).as_posix() for item in items)
+            return {
+                rel: entry for rel, entry in manifest.items()
+                if rel in prefixes or rel.startswith(tuple(p + "/" for p in prefixes))
+            }
+        except (OSError, ValueError):
+            pass
+
+    def describe(rel):
+        path = bundle_dir / rel
+        return rel, {"size": path.stat().st_size, "sha256": _file_sha256(path)}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(pool.map(describe, _iter_item_files(bundle_dir, items)))
+
+
+def _atomic_copy(source, destination):
+    """Copy to a temporary sibling and swap it in with os.replace"""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = destination.with_name(destination.name + ".extracting")
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, destination)
+    return destination.stat().st_mtime_ns
+
+
+def _bundle_stamp(items):
+    """
+    Identity of the bundle the launcher runs from: the frozen executable's
+    path, size and mtime (PyInstaller unpacks with fresh mtimes on every
+    start, so the unpacked files themselves cannot be compared by stat).
+    None when not frozen.
+    """
+    if not getattr(sys, "frozen", False):
+        return None
+    try:
+        st = os.stat(sys.executable)
+    except OSError:
+        return None
+    return {"executable": sys.executable, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "items": sorted(items)}
+
+
+def _load_extraction_manifest(manifest_path):
+    """(bundle stamp, files) of the last extraction; older manifests were a bare files dict"""
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None, {}
+    if "files" in manifest:
+        return manifest.get("bundle_stamp"), manifest["files"]
+    return None, manifest
+
+
+def extract_with_manifest(bundle_dir, app_dir, items, max_workers=EXTRACTION_WORKERS, log=print,
+                          overwrite_untracked=False):
+    """
+    Extract bundled items into app_dir, copying only what changed.
+
+    app_dir/EXTRACTION_MANIFEST records the bundle's content hashes and the
+    size/mtime of every file we extracted. The bundle is hashed only when the
+    executable changed since the last run (or BUNDLE_MANIFEST is bundled);
+    otherwise the recorded hashes are reused and each extracted file costs a
+    stat. A file is copied when it is missing and was never extracted, or when
+    the bundle has a new version and our extracted copy is untouched.
+
+    Files the user modified or deleted after extraction are left as they are
+    and are not restored by later runs. Existing files we did not extract are
+    kept unless identical to the bundle (then adopted) or overwrite_untracked
+    is set. Files dropped from the bundle are removed only if untouched.
+
+    Returns:
+        Dict with copied/unchanged/kept/removed/failed counts
+    """
+    bundle_dir = Path(bundle_dir)
+    app_dir = Path(app_dir)
+    manifest_path = app_dir / EXTRACTION_MANIFEST
+
+    previous_stamp, previous = _load_extraction_manifest(manifest_path)
+    stamp = _bundle_stamp(items)
+    if stamp is not None and stamp == previous_stamp and previous:
+        current = {rel: {"size": entry["size"], "sha256": entry["sha256"]} for rel, entry in previous.items()}
+    else:
+        current = build_bundle_manifest(bundle_dir, items, max_workers)
+
+    stats = {"copied": 0, "unchanged": 0, "kept": 0, "removed": 0, "failed": 0}
+    new_manifest = {}
+    to_copy = []
+
+    def stat_or_none(rel):
+        try:
+            return os.stat(app_dir / rel)
+        except OSError:
+            return None
+
+    for rel, entry in current.items():
+        old = previous.get(rel)
+        st = stat_or_none(rel)
+        if old is None:
+            # Never extracted by us: fill in missing files, leave existing ones to the user
+            if st is None or overwrite_untracked:
+                to_copy.append(rel)
+            elif st.st_size == entry["size"] and _file_sha256(app_dir / rel) == entry["sha256"]:
+                new_manifest[rel] = dict(entry, mtime_ns=st.st_mtime_ns)
+                stats["unchanged"] += 1
+            else:
+                new_manifest[rel] = dict(entry, mtime_ns=None)
+                stats["kept"] += 1
+        elif st is None or st.st_size != old.get("size") or st.st_mtime_ns != old.get("mtime_ns"):
+            # Modified or deleted since we extracted it (mtime_ns None: never ours)
+            new_manifest[rel] = dict(entry, mtime_ns=None)
+            stats["kept"] += 1
+        elif old.get("sha256") != entry["sha256"] or old.get("size") != entry["size"]:
+            to_copy.append(rel)
+        else:
+            new_manifest[rel] = old
+            stats["unchanged"] += 1
+
+    def copy_one(rel):
+        try:
+            mtime_ns = _atomic_copy(bundle_dir / rel, app_dir / rel)
+            return rel, dict(current[rel], mtime_ns=mtime_ns), None
+        except Exception as e:
+            return rel, None, e
+
+    if to_copy:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for rel, entry, error in pool.map(copy_one, to_copy):
+                if error is None:
+                    new_manifest[rel] = entry
+                    stats["copied"] += 1
+                else:
+                    stats["failed"] += 1
+                    log(f"[WARNING] Failed to extract {rel}: {error}")
+
+    # Remove files we extracted earlier that are no longer part of the bundle, unless the user changed them
+    for rel in set(previous) - set(current):
+        old = previous[rel]
+        st = stat_or_none(rel)
+        if st is None or st.st_size != old.get("size") or st.st_mtime_ns != old.get("mtime_ns"):
+            continue
+        try:
+            (app_dir / rel).unlink()
+            stats["removed"] += 1
+        except OSError as e:
+            log(f"[WARNING] Could not remove stale file {rel}: {e}")
+
+    # Swap the manifest in last so an interrupted run is re-verified next time;
+    # without the stamp, failed files are looked at again on the next start
+    tmp_manifest = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp_manifest, "w") as f:
+        json.dump({"bundle_stamp": stamp if not stats["failed"] else None, "files": new_manifest}, f)
+    os.replace(tmp_manifest, manifest_path)
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Production mode: backend serves the prebuilt React bundle
+# ---------------------------------------------------------------------------
+
+PRODUCTION_FLAG = "--production"
+APP_MODE_ENV = "RINGTONE_APP_MODE"
+
+
+def is_production_mode(argv=None):
+    """True if the launcher was started with --production or RINGTONE_APP_MODE=production"""
+    argv = sys.argv[1:] if argv is None else argv
+    return PRODUCTION_FLAG in argv or os.environ.get(APP_MODE_ENV, "").lower() == "production"
+
+
+def frontend_build_exists(app_dir):
+    """True if `npm run build` output is present in app_dir/build"""
+    return (Path(app_dir) / "build" / "index.html").exists()
+
+
+def prepare_frontend_build(app_dir, python_cmd=None, precompress=True, log=print):
+    """
+    Make sure app_dir/build exists and (optionally) is precompressed.
+    Runs `npm run build` only if there is no build yet (needs Node.js once).
+
+    Returns:
+        bool: True if a build is available
+    """
+    app_dir = Path(app_dir)
+    if not frontend_build_exists(app_dir):
+        log("[INFO] No frontend build found - running npm run build (one-time)...")
+        result = subprocess.run("npm run build", shell=True, cwd=app_dir)
+        if result.returncode != 0 or not frontend_build_exists(app_dir):
+            log("[ERROR] npm run build failed")
+            return False
+        log("[SUCCESS] Frontend build created")
+
+    if not precompress:
+        return True
+
+    # Only (re)compresses files that changed since the last run
+    result = subprocess.run(
+        [python_cmd or sys.executable, str(app_dir / "backend" / "frontend_build.py"), str(app_dir / "build")],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        log(f"[WARNING] Could not precompress frontend build: {result.stderr.strip()}")
+    return True
+
+
+if __name__ == "__main__":
+    # Build step helper: python launcher_support.py --write-bundle-manifest backend public src ...
+    if len(sys.argv) > 2 and sys.argv[1] == "--write-bundle-manifest":
+        root = Path(__file__).parent
+        manifest = build_bundle_manifest(root, sys.argv[2:])
+        with open(root / BUNDLE_MANIFEST, "w") as f:
+            json.dump(manifest, f)
+        print(f"[SUCCESS] Wrote {BUNDLE_MANIFEST} with {len(manifest)} files")
+    else:
+        print("Usage: python launcher_support.py --write-bundle-manifest <item> [<item> ...]")
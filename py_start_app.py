@@ -3,6 +3,10 @@
 """
 Portable Ringtone Creator - Universal Launcher (Python Version)
 This script replicates the functionality of START_APP.bat in Python
+
+Usage:
+    python py_start_app.py               # development: backend + React dev server
+    python py_start_app.py --production  # backend serves the prebuilt frontend
 """
 
 import os
@@ -15,8 +19,15 @@ import urllib.request
 import zipfile
 import tempfile
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from launcher_support import (
+    STARTUP_DEADLINE, is_port_open, wait_for_services,
+    compute_preflight_fingerprint, load_preflight_cache, save_preflight_cache,
+    is_production_mode, frontend_build_exists, prepare_frontend_build
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -33,6 +44,9 @@ class PortableAppLauncher:
         self.app_dir = Path(__file__).parent
         self.python_path = r"C:\Program Files\Python313\python.exe"
         self.proxy_config = "http://proxy-enclave.altera.com:912"
+        self.preflight_cache_file = self.app_dir / ".preflight_cache.json"
+        # Production mode: no Node dev server, the backend serves build/
+        self.production = is_production_mode()
         
     def print_header(self):
         """Print application header"""
@@ -40,6 +54,8 @@ class PortableAppLauncher:
         print("   Portable Ringtone Creator App")
         print("=" * 40)
         print("Universal Launcher - One-Click Start")
+        if self.production:
+            print("Mode: production (single process)")
         print()
         
     def check_directory(self):
@@ -52,7 +68,7 @@ class PortableAppLauncher:
             input("Press Enter to exit...")
             sys.exit(1)
             
-    def run_command(self, command, shell=True, capture_output=False, timeout=300):
+    def run_command(self, command, shell=True, capture_output=False, timeout=300, cwd=None):
         """Run a command and return the result"""
         try:
             if capture_output:
@@ -61,11 +77,12 @@ class PortableAppLauncher:
                     shell=shell, 
                     capture_output=True, 
                     text=True, 
-                    timeout=timeout
+                    timeout=timeout,
+                    cwd=cwd
                 )
                 return result.returncode, result.stdout, result.stderr
             else:
-                result = subprocess.run(command, shell=shell, timeout=timeout)
+                result = subprocess.run(command, shell=shell, timeout=timeout, cwd=cwd)
                 return result.returncode, "", ""
         except subprocess.TimeoutExpired:
             logger.error(f"Command timed out: {command}")
@@ -74,10 +91,36 @@ class PortableAppLauncher:
             logger.error(f"Error running command {command}: {e}")
             return -1, "", str(e)
             
-    def check_python_installation(self):
-        """Check and install Python if needed"""
+    def probe_python(self):
+        """
+        Read-only probe: first working Python command, its version and whether
+        the backend dependencies import. Safe to run in a worker thread.
+        
+        Returns:
+            (python_cmd, version, dependencies_found); python_cmd is None if not found
+        """
+        for cmd in ["python", "python3", self.python_path]:
+            if cmd == self.python_path and not os.path.exists(cmd):
+                continue
+            returncode, stdout, _ = self.run_command(f"{cmd} --version", capture_output=True)
+            if returncode == 0:
+                returncode, _, _ = self.run_command(f"{cmd} -c \"import flask_cors\"", capture_output=True)
+                return cmd, stdout.strip(), returncode == 0
+        return None, None, False
+        
+    def probe_nodejs(self):
+        """Read-only probe: Node.js version, or None if node is not on PATH"""
+        returncode, stdout, _ = self.run_command("node --version", capture_output=True)
+        return stdout.strip() if returncode == 0 else None
+        
+    def check_python_installation(self, probed=None):
+        """Check and install Python if needed (probed: result of probe_python)"""
         print("[1/4] Checking Python installation...")
         
+        if probed and probed[0]:
+            print(f"[SUCCESS] Python {probed[1]} found")
+            return probed[0]
+        
         # Try different Python commands
         python_commands = ["python", "python3", self.python_path]
         
@@ -157,13 +200,13 @@ class PortableAppLauncher:
         input("Press Enter to exit...")
         sys.exit(1)
         
-    def check_nodejs_installation(self):
-        """Check and install Node.js if needed"""
+    def check_nodejs_installation(self, version=None):
+        """Check and install Node.js if needed (version: result of probe_nodejs)"""
         print("[2/4] Checking Node.js installation...")
         
-        returncode, stdout, stderr = self.run_command("node --version", capture_output=True)
-        if returncode == 0:
-            version = stdout.strip()
+        if version is None:
+            version = self.probe_nodejs()
+        if version:
             print(f"[SUCCESS] Node.js {version} found")
             return True
             
@@ -228,39 +271,39 @@ class PortableAppLauncher:
         input("Press Enter to exit...")
         sys.exit(1)
         
-    def check_python_dependencies(self, python_cmd):
-        """Check and install Python dependencies"""
+    def check_python_dependencies(self, python_cmd, installed=None):
+        """Check and install Python dependencies (installed: result of probe_python)"""
         print("[3/4] Checking Python dependencies...")
         
         # Check if flask_cors is installed
-        returncode, _, _ = self.run_command(f"{python_cmd} -c \"import flask_cors\"", capture_output=True)
-        if returncode != 0:
+        if installed is None:
+            returncode, _, _ = self.run_command(f"{python_cmd} -c \"import flask_cors\"", capture_output=True)
+            installed = returncode == 0
+        if not installed:
             print("[WARNING] Python dependencies not found, installing...")
             
             backend_dir = self.app_dir / "backend"
             requirements_file = backend_dir / "requirements.txt"
             
             if requirements_file.exists():
-                os.chdir(backend_dir)
+                # Pass cwd instead of changing the launcher's working directory
                 print("[INFO] Installing with proxy configuration...")
                 
-                cmd = f"{python_cmd} -m pip install --proxy {self.proxy_config} -r requirements.txt"
-                returncode, _, _ = self.run_command(cmd, timeout=300)
+                cmd = f'{python_cmd} -m pip install --proxy {self.proxy_config} -r "{requirements_file}"'
+                returncode, _, _ = self.run_command(cmd, timeout=300, cwd=backend_dir)
                 
                 if returncode != 0:
                     print("[ERROR] Failed to install Python dependencies with proxy")
                     print("[INFO] Trying without proxy...")
-                    cmd = f"{python_cmd} -m pip install -r requirements.txt"
-                    returncode, _, _ = self.run_command(cmd, timeout=300)
+                    cmd = f'{python_cmd} -m pip install -r "{requirements_file}"'
+                    returncode, _, _ = self.run_command(cmd, timeout=300, cwd=backend_dir)
                     
                     if returncode != 0:
                         print("[ERROR] Failed to install Python dependencies")
                         print("[INFO] Please check your internet connection and try again")
-                        os.chdir(self.app_dir)
                         input("Press Enter to exit...")
                         sys.exit(1)
                         
-                os.chdir(self.app_dir)
                 print("[SUCCESS] Python dependencies installed successfully")
             else:
                 print("[WARNING] requirements.txt not found")
@@ -277,46 +320,37 @@ class PortableAppLauncher:
         if not node_modules.exists() or not react_scripts_path.exists():
             print("[WARNING] Node.js dependencies not found or incomplete, installing...")
             
-            # Ensure we're in the correct directory
-            original_dir = os.getcwd()
-            os.chdir(self.app_dir)
+            # Run npm in the app directory (cwd, not os.chdir)
+            # Clear npm cache first
+            print("[INFO] Clearing npm cache...")
+            self.run_command("npm cache clean --force", timeout=60, cwd=self.app_dir)
             
-            try:
-                # Clear npm cache first
-                print("[INFO] Clearing npm cache...")
-                self.run_command("npm cache clean --force", timeout=60)
-                
-                # Install dependencies
-                print("[INFO] Installing Node.js dependencies...")
-                returncode, stdout, stderr = self.run_command("npm install", timeout=600, capture_output=True)
+            # Install dependencies
+            print("[INFO] Installing Node.js dependencies...")
+            returncode, stdout, stderr = self.run_command("npm install", timeout=600, capture_output=True, cwd=self.app_dir)
+            
+            if returncode != 0:
+                print(f"[ERROR] Failed to install Node.js dependencies: {stderr}")
+                print("[INFO] Trying with verbose output...")
                 
+                # Try with verbose output for debugging
+                returncode, stdout, stderr = self.run_command("npm install --verbose", timeout=600, capture_output=True, cwd=self.app_dir)
                 if returncode != 0:
-                    print(f"[ERROR] Failed to install Node.js dependencies: {stderr}")
-                    print("[INFO] Trying with verbose output...")
-                    
-                    # Try with verbose output for debugging
-                    returncode, stdout, stderr = self.run_command("npm install --verbose", timeout=600, capture_output=True)
-                    if returncode != 0:
-                        print(f"[ERROR] npm install failed: {stderr}")
-                        print("[INFO] Please check your internet connection and try again")
-                        os.chdir(original_dir)
-                        input("Press Enter to exit...")
-                        sys.exit(1)
-                
-                # Verify react-scripts is installed
-                if not react_scripts_path.exists():
-                    print("[WARNING] react-scripts not found after installation, trying to install it specifically...")
-                    returncode, _, _ = self.run_command("npm install react-scripts", timeout=300, capture_output=True)
-                    if returncode != 0:
-                        print("[ERROR] Failed to install react-scripts specifically")
-                        os.chdir(original_dir)
-                        input("Press Enter to exit...")
-                        sys.exit(1)
-                
-                print("[SUCCESS] Node.js dependencies installed successfully")
-                
-            finally:
-                os.chdir(original_dir)
+                    print(f"[ERROR] npm install failed: {stderr}")
+                    print("[INFO] Please check your internet connection and try again")
+                    input("Press Enter to exit...")
+                    sys.exit(1)
+            
+            # Verify react-scripts is installed
+            if not react_scripts_path.exists():
+                print("[WARNING] react-scripts not found after installation, trying to install it specifically...")
+                returncode, _, _ = self.run_command("npm install react-scripts", timeout=300, capture_output=True, cwd=self.app_dir)
+                if returncode != 0:
+                    print("[ERROR] Failed to install react-scripts specifically")
+                    input("Press Enter to exit...")
+                    sys.exit(1)
+            
+            print("[SUCCESS] Node.js dependencies installed successfully")
         else:
             print("[SUCCESS] Node.js dependencies found")
             
@@ -350,25 +384,111 @@ class PortableAppLauncher:
         else:
             print("[SUCCESS] FFmpeg found")
             
+    def preflight_fingerprint(self):
+        """Fingerprint of everything the preflight checks depend on"""
+        return compute_preflight_fingerprint(
+            self.app_dir,
+            ["python", "python3", self.python_path],
+            extra_paths=[
+                self.app_dir / "node_modules" / ".bin" / "react-scripts.cmd",
+                self.app_dir / "ffmpeg" / "bin" / "ffmpeg.exe",
+            ]
+        )
+        
+    def run_preflight(self):
+        """
+        Run the Python/Node.js/dependency/FFmpeg checks.
+        Results are cached under a fingerprint so an unchanged setup skips all
+        subprocesses. Otherwise the read-only probes (--version, imports) run in
+        parallel; installers, prompts and exits then run one at a time on the
+        main thread, as they may change PATH or end the launcher.
+        """
+        started = time.monotonic()
+        # Node.js is only needed for the dev server or to create the first build
+        needs_nodejs = not (self.production and frontend_build_exists(self.app_dir))
+        cached = load_preflight_cache(self.preflight_cache_file, self.preflight_fingerprint())
+        if cached and cached.get("python_cmd"):
+            print("[SUCCESS] Nothing changed since the last launch - using cached system check")
+            print(f"[INFO] Python command: {cached['python_cmd']}")
+            print(f"[INFO] Preflight finished in {time.monotonic() - started:.2f}s")
+            return cached["python_cmd"]
+        
+        # Only the probes run in parallel; they start no installer and touch no state
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            python_future = pool.submit(self.probe_python)
+            nodejs_future = pool.submit(self.probe_nodejs) if needs_nodejs else None
+            python_probe = python_future.result()
+            nodejs_version = nodejs_future.result() if nodejs_future else None
+            
+        python_cmd = self.check_python_installation(python_probe)
+        # A freshly installed Python was not probed for its dependencies
+        self.check_python_dependencies(python_cmd, python_probe[2] if python_cmd == python_probe[0] else None)
+        if needs_nodejs:
+            self.check_nodejs_installation(nodejs_version)
+            self.check_nodejs_dependencies()
+        self.check_ffmpeg()
+            
+        if not needs_nodejs:
+            print("[INFO] Production build present - skipping Node.js checks")
+            
+        # Fingerprint again - installers may have changed the environment
+        # (a Node-less production run is not cached so dev mode still checks Node.js)
+        if needs_nodejs:
+            save_preflight_cache(self.preflight_cache_file, self.preflight_fingerprint(), {"python_cmd": python_cmd})
+        print(f"[INFO] Preflight finished in {time.monotonic() - started:.2f}s")
+        return python_cmd
+        
     def check_ports(self):
         """Check if required ports are available"""
         print()
         print("[INFO] Checking port availability...")
         
-        # Check port 3000
-        returncode, _, _ = self.run_command('netstat -an | findstr ":3000"', capture_output=True)
-        if returncode == 0:
+        # Check port 3000 (dev server only)
+        if not self.production and is_port_open(3000):
             print("[WARNING] Port 3000 is already in use")
             print("[INFO] Please close other applications using port 3000")
             print()
             
         # Check port 5000
-        returncode, _, _ = self.run_command('netstat -an | findstr ":5000"', capture_output=True)
-        if returncode == 0:
+        if is_port_open(5000):
             print("[WARNING] Port 5000 is already in use")
             print("[INFO] Please close other applications using port 5000")
             print()
             
+    def start_production(self, python_cmd):
+        """Start the backend only; it serves the prebuilt frontend on port 5000"""
+        print()
+        print("=" * 40)
+        print("   Starting Portable Ringtone Creator")
+        print("=" * 40)
+        print()
+        
+        if not prepare_frontend_build(self.app_dir, python_cmd):
+            print("[INFO] Run without --production to use the development server")
+            print()
+            input("Press Enter to exit...")
+            return
+            
+        print("[INFO] Starting backend server (serving the frontend build)...")
+        backend_dir = self.app_dir / "backend"
+        backend_cmd = f'start "Ringtone Backend" cmd /k "cd /d {backend_dir} && {python_cmd} server.py --production"'
+        self.run_command(backend_cmd)
+        
+        print(f"[INFO] Waiting for backend to become ready (up to {STARTUP_DEADLINE}s)...")
+        ready = wait_for_services({"backend": (5000, "/health")})
+        if ready["backend"] is None:
+            print("[WARNING] Backend did not become ready in time")
+            print("[INFO] Check the backend window for error messages")
+            print()
+            input("Press Enter to exit...")
+            return
+            
+        print(f"[SUCCESS] Backend ready on port 5000 after {ready['backend']:.1f}s")
+        print("[SUCCESS] Application started successfully!")
+        print()
+        print("[INFO] Access the app at: http://localhost:5000")
+        print()
+        
     def start_application(self, python_cmd):
         """Start the application"""
         print()
@@ -388,10 +508,7 @@ class PortableAppLauncher:
         backend_cmd = f'start "Ringtone Backend" cmd /k "cd /d {backend_dir} && {python_cmd} server.py"'
         self.run_command(backend_cmd)
         
-        print("[INFO] Waiting for backend to start...")
-        time.sleep(5)
-        
-        # Start frontend with better error handling
+        # Start frontend right away - both services boot concurrently
         print("[INFO] Starting frontend server...")
         
         # Check if we're running from an executable (PyInstaller)
@@ -407,18 +524,30 @@ class PortableAppLauncher:
             frontend_cmd = f'start "Ringtone Frontend" cmd /k "cd /d {self.app_dir} && npm start"'
             self.run_command(frontend_cmd)
         
-        print("[INFO] Waiting for frontend to start...")
-        time.sleep(8)
+        # Wait for real readiness (socket connect + HTTP probe) instead of fixed sleeps
+        print(f"[INFO] Waiting for backend and frontend to become ready (up to {STARTUP_DEADLINE}s)...")
+        ready = wait_for_services({
+            "backend": (5000, "/health"),
+            "frontend": (3000, "/"),
+        })
         
-        # Verify frontend started successfully
-        print("[INFO] Verifying frontend startup...")
-        returncode, _, _ = self.run_command('netstat -an | findstr ":3000"', capture_output=True)
-        if returncode == 0:
-            print("[SUCCESS] Frontend appears to be running on port 3000")
+        if ready["backend"] is not None:
+            print(f"[SUCCESS] Backend ready on port 5000 after {ready['backend']:.1f}s")
+        else:
+            print("[WARNING] Backend did not become ready in time")
+            print("[INFO] Check the backend window for error messages")
+            
+        if ready["frontend"] is not None:
+            print(f"[SUCCESS] Frontend ready on port 3000 after {ready['frontend']:.1f}s")
         else:
             print("[WARNING] Frontend may not have started properly")
             print("[INFO] Check the frontend window for error messages")
         
+        if ready["backend"] is None or ready["frontend"] is None:
+            print()
+            input("Press Enter to exit...")
+            return
+        
         print("[SUCCESS] Application started successfully!")
         print()
         print("[INFO] Access the app at: http://localhost:3000")
@@ -429,8 +558,6 @@ class PortableAppLauncher:
         print("- FFmpeg enables MP3 conversion features")
         print("- Check the README.md for detailed usage instructions")
         print()
-        print("[INFO] This window will close in 10 seconds...")
-        time.sleep(10)
         
     def run(self):
         """Main execution method"""
@@ -441,26 +568,17 @@ class PortableAppLauncher:
             print("[INFO] Performing comprehensive system check...")
             print()
             
-            # Check and install Python
-            python_cmd = self.check_python_installation()
-            
-            # Check and install Node.js
-            self.check_nodejs_installation()
-            
-            # Check Python dependencies
-            self.check_python_dependencies(python_cmd)
-            
-            # Check Node.js dependencies
-            self.check_nodejs_dependencies()
-            
-            # Check FFmpeg
-            self.check_ffmpeg()
+            # Check Python, Node.js, dependencies and FFmpeg (cached, parallel)
+            python_cmd = self.run_preflight()
             
             # Check ports
             self.check_ports()
             
             # Start application
-            self.start_application(python_cmd)
+            if self.production:
+                self.start_production(python_cmd)
+            else:
+                self.start_application(python_cmd)
             
         except KeyboardInterrupt:
             print("\n[INFO] Application startup cancelled by user")
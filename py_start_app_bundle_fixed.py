@@ -10,13 +10,14 @@ import sys
 import subprocess
 import time
 import platform
-import shutil
 import urllib.request
 import zipfile
 import tempfile
 import logging
 from pathlib import Path
 
+from launcher_support import extract_with_manifest
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -79,33 +80,20 @@ class PortableAppLauncher:
                 "tsconfig.json"
             ]
             
-            extracted_count = 0
-            for item in items_to_extract:
-                bundle_path = self.bundle_dir / item
-                app_path = self.app_dir / item
-                
-                if bundle_path.exists():
-                    try:
-                        if bundle_path.is_dir():
-                            if not app_path.exists():
-                                print(f"[INFO] Extracting directory: {item}")
-                                shutil.copytree(bundle_path, app_path)
-                                extracted_count += 1
-                            else:
-                                print(f"[INFO] Directory already exists: {item}")
-                        else:
-                            if not app_path.exists():
-                                print(f"[INFO] Extracting file: {item}")
-                                shutil.copy2(bundle_path, app_path)
-                                extracted_count += 1
-                            else:
-                                print(f"[INFO] File already exists: {item}")
-                    except Exception as e:
-                        print(f"[WARNING] Failed to extract {item}: {e}")
-                else:
-                    print(f"[WARNING] Bundled item not found: {item}")
+            # Copy missing files and bundle updates; files that exist or were changed by the user are kept
+            missing = [item for item in items_to_extract if not (self.bundle_dir / item).exists()]
+            for item in missing:
+                print(f"[WARNING] Bundled item not found: {item}")
+            present = [item for item in items_to_extract if item not in missing]
+            
+            stats = extract_with_manifest(self.bundle_dir, self.app_dir, present)
+            extracted_count = stats["copied"]
+            if stats["unchanged"]:
+                print(f"[INFO] {stats['unchanged']} files already up to date")
+            if stats["kept"]:
+                print(f"[INFO] {stats['kept']} existing or user-modified files kept")
             
-            print(f"[SUCCESS] File extraction completed ({extracted_count} items extracted)")
+            print(f"[SUCCESS] File extraction completed ({extracted_count} files extracted)")
             return True
         else:
             print("[INFO] Not running from PyInstaller bundle, skipping extraction")
@@ -3,6 +3,9 @@
 """
 Portable Ringtone Creator - Truly Standalone Launcher
 This version includes ALL dependencies bundled inside the executable
+
+Pass --production (or set RINGTONE_APP_MODE=production) to have the backend
+serve the prebuilt frontend instead of starting the React dev server.
 """
 
 import os
@@ -10,12 +13,16 @@ import sys
 import subprocess
 import time
 import platform
-import shutil
 import logging
 import psutil
 import atexit
 from pathlib import Path
 
+from launcher_support import (
+    STARTUP_DEADLINE, is_port_open, wait_for_port_free, wait_for_services, extract_with_manifest,
+    is_production_mode, prepare_frontend_build
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -60,6 +67,9 @@ class StandaloneAppLauncher:
         print(f"[DEBUG] Python executable: {sys.executable}")
         print(f"[DEBUG] Python version: {sys.version}")
         
+        self.production = is_production_mode()
+        print(f"[DEBUG] Production mode: {self.production}")
+        
         # Register cleanup function
         atexit.register(self.cleanup_lock_file)
         
@@ -200,43 +210,14 @@ class StandaloneAppLauncher:
             
             print(f"[DEBUG] Total items to extract: {len(items_to_extract)}")
             
-            extracted_count = 0
-            for item_name in items_to_extract:
-                print(f"[DEBUG] Processing item: {item_name}")
-                bundle_path = self.bundle_dir / item_name
-                app_path = self.app_dir / item_name
-                
-                print(f"[DEBUG] Bundle path: {bundle_path} (exists: {bundle_path.exists()})")
-                print(f"[DEBUG] App path: {app_path} (exists: {app_path.exists()})")
-                
-                if bundle_path.exists():
-                    try:
-                        if bundle_path.is_dir():
-                            # Always extract directories (overwrite if exists)
-                            print(f"[INFO] Extracting directory: {item_name}")
-                            print(f"[DEBUG] Copying from {bundle_path} to {app_path}")
-                            if app_path.exists():
-                                print(f"[DEBUG] Directory exists, removing first: {app_path}")
-                                shutil.rmtree(app_path)
-                            shutil.copytree(bundle_path, app_path)
-                            extracted_count += 1
-                            print(f"[DEBUG] Directory extraction completed: {item_name}")
-                        else:
-                            # Always extract files (overwrite if exists)
-                            print(f"[INFO] Extracting file: {item_name}")
-                            print(f"[DEBUG] Copying from {bundle_path} to {app_path}")
-                            shutil.copy2(bundle_path, app_path)
-                            extracted_count += 1
-                            print(f"[DEBUG] File extraction completed: {item_name}")
-                    except Exception as e:
-                        print(f"[WARNING] Failed to extract {item_name}: {e}")
-                        print(f"[DEBUG] Exception type: {type(e)}")
-                        import traceback
-                        print(f"[DEBUG] Traceback: {traceback.format_exc()}")
-                else:
-                    print(f"[WARNING] Bundled item not found: {item_name}")
-            
-            print(f"[SUCCESS] All files extracted ({extracted_count} items)")
+            # Only copy files changed in the bundle; files the user modified after extraction are kept
+            print("[DEBUG] Comparing bundle against extraction manifest...")
+            started = time.monotonic()
+            stats = extract_with_manifest(self.bundle_dir, self.app_dir, items_to_extract, overwrite_untracked=True)
+            print(f"[DEBUG] Extraction stats: {stats} ({time.monotonic() - started:.2f}s)")
+            extracted_count = stats["copied"]
+            
+            print(f"[SUCCESS] All files extracted ({extracted_count} changed files copied, {stats['unchanged']} unchanged, {stats['kept']} user-modified kept)")
             print(f"[DEBUG] Final app directory contents: {list(self.app_dir.iterdir())}")
             return True
         else:
@@ -299,43 +280,26 @@ class StandaloneAppLauncher:
         print("[INFO] Checking for existing backend/frontend processes...")
         
         try:
-            # Kill processes using port 5000 (backend)
-            print("[DEBUG] Checking for processes using port 5000...")
-            result = subprocess.run('netstat -ano | findstr ":5000"', shell=True, capture_output=True, text=True)
-            if result.returncode == 0:
-                print("[INFO] Found processes using port 5000, attempting to kill them...")
-                lines = result.stdout.strip().split('\n')
-                for line in lines:
-                    if ':5000' in line:
-                        parts = line.split()
-                        if len(parts) >= 5:
-                            pid = parts[-1]
-                            try:
-                                print(f"[DEBUG] Killing process {pid} using port 5000...")
-                                subprocess.run(f'taskkill /F /PID {pid}', shell=True, capture_output=True)
-                            except Exception as e:
-                                print(f"[WARNING] Could not kill process {pid}: {e}")
-            
-            # Kill processes using port 3000 (frontend)
-            print("[DEBUG] Checking for processes using port 3000...")
-            result = subprocess.run('netstat -ano | findstr ":3000"', shell=True, capture_output=True, text=True)
-            if result.returncode == 0:
-                print("[INFO] Found processes using port 3000, attempting to kill them...")
-                lines = result.stdout.strip().split('\n')
-                for line in lines:
-                    if ':3000' in line:
-                        parts = line.split()
-                        if len(parts) >= 5:
-                            pid = parts[-1]
-                            try:
-                                print(f"[DEBUG] Killing process {pid} using port 3000...")
-                                subprocess.run(f'taskkill /F /PID {pid}', shell=True, capture_output=True)
-                            except Exception as e:
-                                print(f"[WARNING] Could not kill process {pid}: {e}")
-            
-            # Wait a moment for processes to be killed
-            print("[DEBUG] Waiting 3 seconds for processes to be killed...")
-            time.sleep(3)
+            # Find listeners on the backend (5000) and frontend (3000) ports in one pass
+            print("[DEBUG] Checking for processes using ports 5000 and 3000...")
+            listeners = {}
+            for conn in psutil.net_connections(kind='tcp'):
+                if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port in (5000, 3000) and conn.pid:
+                    listeners[conn.pid] = conn.laddr.port
+            
+            for pid, port in listeners.items():
+                print(f"[INFO] Found process using port {port}, attempting to kill it...")
+                try:
+                    print(f"[DEBUG] Killing process {pid} using port {port}...")
+                    # Kill the whole tree (cmd window -> python/node)
+                    subprocess.run(f'taskkill /F /T /PID {pid}', shell=True, capture_output=True)
+                except Exception as e:
+                    print(f"[WARNING] Could not kill process {pid}: {e}")
+            
+            # Wait until the ports are actually released instead of a fixed sleep
+            for port in set(listeners.values()):
+                if not wait_for_port_free(port, timeout=5):
+                    print(f"[WARNING] Port {port} is still in use")
             
         except Exception as e:
             print(f"[WARNING] Error killing existing processes: {e}")
@@ -344,29 +308,26 @@ class StandaloneAppLauncher:
         """Check if required ports are available"""
         print("[INFO] Checking port availability...")
         
-        # Check port 3000
-        result = subprocess.run('netstat -an | findstr ":3000"', shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
+        # Check port 3000 (dev server only)
+        if not self.production and is_port_open(3000):
             print("[WARNING] Port 3000 is already in use")
             print("[INFO] Please close other applications using port 3000")
             print()
             
         # Check port 5000
-        result = subprocess.run('netstat -an | findstr ":5000"', shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
+        if is_port_open(5000):
             print("[WARNING] Port 5000 is already in use")
             print("[INFO] Please close other applications using port 5000")
             print()
     
     def start_backend(self):
-        """Start the backend server using bundled Python"""
+        """Start the backend server using bundled Python (does not wait for readiness)"""
         print("[DEBUG] Starting backend server...")
         print("[INFO] Starting backend server...")
         
         # Check if backend is already running
         print("[DEBUG] Checking if backend is already running...")
-        result = subprocess.run('netstat -an | findstr ":5000"', shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
+        if is_port_open(5000):
             print("[INFO] Backend is already running on port 5000")
             return True
         
@@ -393,40 +354,23 @@ class StandaloneAppLauncher:
         
         # Start backend in a new window with unique title to prevent multiple instances
         backend_title = f"Ringtone Backend - {int(time.time())}"
-        backend_cmd = f'start "{backend_title}" cmd /k "cd /d {backend_dir} && "{python_cmd}" server.py"'
+        server_args = " --production" if self.production else ""
+        backend_cmd = f'start "{backend_title}" cmd /k "cd /d {backend_dir} && "{python_cmd}" server.py{server_args}"'
         print(f"[DEBUG] Backend command: {backend_cmd}")
         
         print("[DEBUG] Executing backend start command...")
         result = subprocess.run(backend_cmd, shell=True)
         print(f"[DEBUG] Backend start command result: {result}")
-        
-        print("[INFO] Waiting for backend to start...")
-        print("[DEBUG] Waiting 5 seconds for backend to initialize...")
-        time.sleep(5)
-        
-        # Verify backend is running
-        print("[DEBUG] Checking if backend is running on port 5000...")
-        result = subprocess.run('netstat -an | findstr ":5000"', shell=True, capture_output=True, text=True)
-        print(f"[DEBUG] Port check result: {result.returncode}")
-        print(f"[DEBUG] Port check output: {result.stdout}")
-        
-        if result.returncode == 0:
-            print("[SUCCESS] Backend server started successfully")
-            return True
-        else:
-            print("[WARNING] Backend may not have started properly")
-            print("[DEBUG] Backend might still be starting up, continuing...")
-            return False
+        return True
     
     def start_frontend(self):
-        """Start the frontend using bundled Node.js dependencies"""
+        """Start the frontend using bundled Node.js dependencies (does not wait for readiness)"""
         print("[DEBUG] Starting frontend server...")
         print("[INFO] Starting frontend server...")
         
         # Check if frontend is already running
         print("[DEBUG] Checking if frontend is already running...")
-        result = subprocess.run('netstat -an | findstr ":3000"', shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
+        if is_port_open(3000):
             print("[INFO] Frontend is already running on port 3000")
             return True
         
@@ -451,24 +395,7 @@ class StandaloneAppLauncher:
             print("[DEBUG] Executing frontend start command...")
             result = subprocess.run(frontend_cmd, shell=True)
             print(f"[DEBUG] Frontend start command result: {result}")
-            
-            print("[INFO] Waiting for frontend to start...")
-            print("[DEBUG] Waiting 8 seconds for frontend to initialize...")
-            time.sleep(8)
-            
-            # Check if frontend started
-            print("[DEBUG] Checking if frontend is running on port 3000...")
-            result = subprocess.run('netstat -an | findstr ":3000"', shell=True, capture_output=True, text=True)
-            print(f"[DEBUG] Port check result: {result.returncode}")
-            print(f"[DEBUG] Port check output: {result.stdout}")
-            
-            if result.returncode == 0:
-                print("[SUCCESS] Frontend started successfully")
-                return True
-            else:
-                print("[WARNING] Frontend may not have started properly")
-                print("[DEBUG] Frontend might still be starting up, continuing...")
-                return False
+            return True
         else:
             print("[ERROR] Bundled Node.js dependencies not found")
             print("[INFO] Frontend cannot start without bundled dependencies")
@@ -483,11 +410,29 @@ class StandaloneAppLauncher:
         print("=" * 40)
         print()
         
-        # Start backend
-        backend_success = self.start_backend()
-        
-        # Start frontend
-        frontend_success = self.start_frontend()
+        if self.production:
+            # The backend serves the bundled build; precompressing needs a real interpreter
+            print("[INFO] Production mode - backend serves the prebuilt frontend")
+            if not prepare_frontend_build(self.app_dir, sys.executable, precompress=not getattr(sys, 'frozen', False)):
+                print("[WARNING] No frontend build available, falling back to the development server")
+                self.production = False
+        
+        # Launch both services first so they boot concurrently
+        backend_started = self.start_backend()
+        frontend_started = False if self.production else self.start_frontend()
+        
+        # Then wait for real readiness of whatever was launched
+        services = {}
+        if backend_started:
+            services["backend"] = (5000, "/health")
+        if frontend_started:
+            services["frontend"] = (3000, "/")
+        print(f"[INFO] Waiting for services to become ready (up to {STARTUP_DEADLINE}s)...")
+        ready = wait_for_services(services) if services else {}
+        print(f"[DEBUG] Readiness results: {ready}")
+        
+        backend_success = ready.get("backend") is not None
+        frontend_success = self.production or ready.get("frontend") is not None
         
         print()
         print("=" * 40)
@@ -496,12 +441,15 @@ class StandaloneAppLauncher:
         print()
         
         if backend_success:
-            print("[SUCCESS] Backend API at: http://localhost:5000")
+            print(f"[SUCCESS] Backend API at: http://localhost:5000 (ready after {ready['backend']:.1f}s)")
         else:
             print("[ERROR] Backend failed to start")
         
-        if frontend_success:
-            print("[SUCCESS] Frontend at: http://localhost:3000")
+        if self.production:
+            if backend_success:
+                print("[SUCCESS] App at: http://localhost:5000")
+        elif frontend_success:
+            print(f"[SUCCESS] Frontend at: http://localhost:3000 (ready after {ready['frontend']:.1f}s)")
         else:
             print("[ERROR] Frontend failed to start")
             print("[INFO] Check the frontend window for error messages")
@@ -510,8 +458,9 @@ class StandaloneAppLauncher:
         print("[INFO] This is a truly standalone executable")
         print("[INFO] No external dependencies required")
         print()
-        print("[INFO] This window will close in 10 seconds...")
-        time.sleep(10)
+        
+        if not (backend_success and frontend_success):
+            input("Press Enter to exit...")
         
     def run(self):
         """Main execution method"""
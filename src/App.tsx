@@ -6,7 +6,7 @@ import FileUpload from './components/FileUpload';
 import RingtoneList from './components/RingtoneList';
 import ScheduleRingtone from './components/ScheduleRingtone';
 import { AudioFile } from './types/audio';
-import ringtoneService, { API_BASE_URL } from './services/ringtoneService';
+import ringtoneService from './services/ringtoneService';
 
 type MainTabType = 'creator' | 'ringtones' | 'schedule';
 
@@ -36,7 +36,7 @@ function App() {
           .map(ringtone => ({
             id: ringtone.id,
             name: ringtone.original_name || ringtone.name,
-            url: `${API_BASE_URL}/ringtones/${ringtone.folder}/${ringtone.name}`,
+            url: ringtoneService.getStreamUrl(ringtone),
             duration: ringtone.duration || 0,
             file: null as any, // We don't have the actual file object
             type: 'ringtone' as const,
@@ -1,7 +1,11 @@
 // Rules applied
 import React, { useState, useRef, useEffect, useCallback } from 'react';
 import { AudioFile } from '../types/audio';
-import ringtoneService from '../services/ringtoneService';
+import ringtoneService, { WaveformLevel } from '../services/ringtoneService';
+
+// Finest precomputed zoom level with at most this many peaks is drawn (about two per pixel)
+const WAVEFORM_MAX_PEAKS = 2048;
+const WAVEFORM_HEIGHT = 60;
 
 interface AudioPlayerProps {
   audioFile: AudioFile;
@@ -18,9 +22,11 @@ const AudioPlayer: React.FC<AudioPlayerProps> = ({ audioFile, onRingtoneCreated
   const [error, setError] = useState<string | null>(null);
   const [isCreatingRingtone, setIsCreatingRingtone] = useState(false);
   const [successMessage, setSuccessMessage] = useState<string | null>(null);
+  const [waveform, setWaveform] = useState<WaveformLevel | null>(null);
   
   const audioRef = useRef<HTMLAudioElement>(null);
   const progressRef = useRef<HTMLDivElement>(null);
+  const waveformRef = useRef<HTMLCanvasElement>(null);
   const audioContextRef = useRef<AudioContext | null>(null);
 
   useEffect(() => {
@@ -30,6 +36,57 @@ const AudioPlayer: React.FC<AudioPlayerProps> = ({ audioFile, onRingtoneCreated
     }
   }, [audioFile]);
 
+  // Waveform from the backend's precomputed peaks for files it already has (no decoding in the browser)
+  useEffect(() => {
+    setWaveform(null);
+    const sourceId = audioFile.sourceId;
+    if (!sourceId) return;
+
+    let cancelled = false;
+    const loadWaveform = async () => {
+      const index = await ringtoneService.getWaveformIndex(sourceId);
+      if (!index || index.levels.length === 0 || cancelled) return;
+      const level = index.levels.find((info) => info.peak_count <= WAVEFORM_MAX_PEAKS) || index.levels[index.levels.length - 1];
+      const peaks = await ringtoneService.getWaveformLevel(sourceId, level.level);
+      if (!cancelled) setWaveform(peaks);
+    };
+    loadWaveform().catch((error) => console.error('Error loading waveform:', error));
+
+    return () => {
+      cancelled = true;
+    };
+  }, [audioFile]);
+
+  useEffect(() => {
+    const canvas = waveformRef.current;
+    if (!canvas || !waveform) return;
+
+    const width = canvas.clientWidth * (window.devicePixelRatio || 1);
+    const height = WAVEFORM_HEIGHT * (window.devicePixelRatio || 1);
+    canvas.width = width;
+    canvas.height = height;
+    const context = canvas.getContext('2d');
+    if (!context) return;
+
+    const peakCount = waveform.peaks.length / 2;
+    const middle = height / 2;
+    context.clearRect(0, 0, width, height);
+    context.fillStyle = 'rgba(255, 255, 255, 0.7)';
+    for (let x = 0; x < width; x++) {
+      const first = Math.floor((x / width) * peakCount);
+      const last = Math.max(first + 1, Math.floor(((x + 1) / width) * peakCount));
+      let min = 0;
+      let max = 0;
+      for (let i = first; i < last && i < peakCount; i++) {
+        min = Math.min(min, waveform.peaks[i * 2]);
+        max = Math.max(max, waveform.peaks[i * 2 + 1]);
+      }
+      const top = middle - (max / 32768) * middle;
+      const bottom = middle - (min / 32768) * middle;
+      context.fillRect(x, top, 1, Math.max(1, bottom - top));
+    }
+  }, [waveform]);
+
   useEffect(() => {
     const audio = audioRef.current;
     if (!audio) return;
@@ -331,6 +388,14 @@ const AudioPlayer: React.FC<AudioPlayerProps> = ({ audioFile, onRingtoneCreated
         </button>
 
         <div className="progress-container">
+          {waveform && (
+            <canvas
+              ref={waveformRef}
+              className="waveform"
+              style={{ width: '100%', height: `${WAVEFORM_HEIGHT}px` }}
+              onClick={handleSeek}
+            />
+          )}
           <div 
             ref={progressRef}
             className="progress-bar"
@@ -1,7 +1,7 @@
 // Rules applied
 import React, { useState, useRef, useEffect } from 'react';
 import { AudioFile } from '../types/audio';
-import ringtoneService, { RingtoneInfo, API_BASE_URL } from '../services/ringtoneService';
+import ringtoneService, { RingtoneInfo } from '../services/ringtoneService';
 
 interface RingtoneListProps {
   ringtones: AudioFile[];
@@ -89,7 +89,7 @@ const RingtoneList: React.FC<RingtoneListProps> = ({ ringtones, onRingtonesUpdat
     return {
       id: ringtone.id,
       name: ringtone.original_name || ringtone.name,
-      url: `${API_BASE_URL}/ringtones/${ringtone.folder || 'wav_ringtones'}/${ringtone.name}`,
+      url: ringtoneService.getStreamUrl(ringtone),
       duration: ringtone.duration || 0,
       file: null as any, // We don't have the actual file object
       type: 'ringtone' as const,
@@ -304,7 +304,7 @@ const RingtoneList: React.FC<RingtoneListProps> = ({ ringtones, onRingtonesUpdat
           ref={(el) => {
             if (el) audioRefs.current[ringtoneData.id] = el;
           }}
-          src={isLocalRingtone ? (ringtoneData as AudioFile).url : `${API_BASE_URL}/ringtones/${(ringtoneData as RingtoneInfo).folder || 'wav_ringtones'}/${(ringtoneData as RingtoneInfo).name}`}
+          src={isLocalRingtone ? (ringtoneData as AudioFile).url : ringtoneService.getStreamUrl(ringtoneData as RingtoneInfo)}
           preload="metadata"
         />
       </div>
@@ -35,6 +35,28 @@ export interface RingtoneInfo {
   mp3_available?: boolean;
   format?: string;
   folder?: string;
+  version?: string;  // Content version token, changes whenever the file changes
+}
+
+export interface WaveformLevelInfo {
+  level: number;
+  samples_per_peak: number;
+  peak_count: number;
+}
+
+export interface WaveformIndex {
+  source_id: string;
+  sample_rate: number;
+  total_samples: number;
+  duration: number;
+  levels: WaveformLevelInfo[];
+}
+
+export interface WaveformLevel {
+  sampleRate: number;
+  totalSamples: number;
+  samplesPerPeak: number;
+  peaks: Int16Array;  // Interleaved min/max pairs
 }
 
 export interface ApiResponse<T> {
@@ -147,6 +169,14 @@ class RingtoneService {
     return this.makeRequest<RingtoneInfo[]>('/ringtones');
   }
 
+  // URL for playing a backend ringtone in an <audio> element.
+  // Served inline with Range support; the version token makes it cacheable forever.
+  getStreamUrl(ringtone: RingtoneInfo): string {
+    const folder = ringtone.folder || 'wav_ringtones';
+    const version = ringtone.version ? `&v=${ringtone.version}` : '';
+    return `${API_BASE_URL}/ringtones/${folder}/${ringtone.name}?inline=1${version}`;
+  }
+
   async downloadRingtone(filename: string, folder?: string): Promise<void> {
     try {
       let endpoint = `/ringtones/${filename}`;
@@ -190,7 +220,8 @@ class RingtoneService {
     });
   }
 
-  async uploadAudioFile(file: File): Promise<ApiResponse<{ filename: string; file_path: string; size: number; uploaded: string }>> {
+  // The upload response is flat (no `data` wrapper)
+  async uploadAudioFile(file: File): Promise<{ success: boolean; error?: string; filename?: string; file_path?: string; size?: number; uploaded?: string; source_id?: string; waveform_url?: string }> {
     try {
       const formData = new FormData();
       formData.append('file', file);
@@ -216,6 +247,55 @@ class RingtoneService {
     }
   }
 
+  // Zoom levels available for an uploaded source's precomputed waveform
+  async getWaveformIndex(sourceId: string): Promise<WaveformIndex | null> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/waveform/${sourceId}`);
+      if (!response.ok) {
+        return null;
+      }
+      return await response.json();
+    } catch (error) {
+      console.error('Error fetching waveform index:', error);
+      return null;
+    }
+  }
+
+  // Min/max peaks of one zoom level (binary 'RTPK' format, see backend/waveform_peaks.py)
+  async getWaveformLevel(sourceId: string, level: number): Promise<WaveformLevel | null> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/waveform/${sourceId}?level=${level}`);
+      if (!response.ok) {
+        return null;
+      }
+      const buffer = await response.arrayBuffer();
+      const view = new DataView(buffer);
+      const magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+      if (magic !== 'RTPK') {
+        throw new Error('Unexpected waveform format');
+      }
+      const peakCount = view.getUint32(18, true);
+      const peaks = new Int16Array(peakCount * 2);
+      for (let i = 0; i < peakCount * 2; i++) {
+        peaks[i] = view.getInt16(22 + i * 2, true);
+      }
+      return {
+        sampleRate: view.getUint32(6, true),
+        totalSamples: view.getUint32(10, true),
+        samplesPerPeak: view.getUint32(14, true),
+        peaks,
+      };
+    } catch (error) {
+      console.error('Error fetching waveform level:', error);
+      return null;
+    }
+  }
+
+  // Streams only the [start, end] range of an uploaded source (usable as <audio> src)
+  getPreviewUrl(sourceId: string, start: number, end: number, format: 'mp3' | 'opus' = 'mp3'): string {
+    return `${API_BASE_URL}/preview?source=${sourceId}&start=${start.toFixed(3)}&end=${end.toFixed(3)}&format=${format}`;
+  }
+
   async checkServerHealth(): Promise<boolean> {
     try {
       const response = await fetch(`${API_BASE_URL.replace('/api', '')}/health`);
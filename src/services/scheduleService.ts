@@ -1,5 +1,5 @@
 // Rules applied
-import { ScheduledRingtone, ScheduleFormData } from '../types/schedule';
+import { ScheduleConflict, ScheduledRingtone, ScheduleFormData, ScheduleOccurrence, TaskReconcileReport, TestPlayback } from '../types/schedule';
 import { AudioFile } from '../types/audio';
 import { ringtoneService } from './ringtoneService';
 
@@ -31,6 +31,7 @@ export class ScheduleService {
   private scheduledRingtones: ScheduledRingtone[] = [];
   private checkInterval: NodeJS.Timeout | null = null;
   private audioElement: HTMLAudioElement | null = null;
+  private testPlaybackId: string | null = null; // Device test playback started by testPlayRingtone
 
   private constructor() {
     this.initializeService();
@@ -60,8 +61,14 @@ export class ScheduleService {
         this.scheduledRingtones = JSON.parse(stored);
         console.log('📅 Loaded scheduled ringtones from localStorage fallback:', this.scheduledRingtones.length);
         
-        // Sync localStorage data to backend
-        await this.syncToBackend();
+        // Sync localStorage data to backend, then let it create any missing device tasks.
+        // Only after a confirmed batch: the store must hold every schedule before tasks are compared.
+        const synced = await this.syncToBackend();
+        if (synced && this.scheduledRingtones.some(schedule => schedule.scheduleSource === 'device')) {
+          await this.reconcileTasks().catch(error => console.warn('⚠️ Task reconcile failed:', error));
+        } else if (!synced) {
+          console.warn('⚠️ Schedules not fully synced to backend, skipping task reconcile');
+        }
       }
     } catch (error) {
       console.error('❌ Error loading scheduled ringtones:', error);
@@ -96,15 +103,35 @@ export class ScheduleService {
     }
   }
 
-  // Sync current data to backend
-  private async syncToBackend(): Promise<void> {
+  // Sync current data to backend; true only if the batch request stored every schedule
+  private async syncToBackend(): Promise<boolean> {
     try {
-      for (const schedule of this.scheduledRingtones) {
-        await this.saveScheduleToBackend(schedule);
+      // One batch request (one schedules.json write) instead of one POST per schedule.
+      // OS tasks are already managed per schedule, so the batch must not touch them.
+      const response = await fetch(`${API_BASE_URL}/api/schedules/batch`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+          operations: this.scheduledRingtones.map(schedule => ({ op: 'upsert', schedule })),
+          sync_tasks: false
+        })
+      });
+
+      const result = response.ok ? await response.json() : null;
+      if (!result?.success) {
+        console.warn('⚠️ Batch sync failed, saving schedules one by one:', response.status, result?.failed);
+        for (const schedule of this.scheduledRingtones) {
+          await this.saveScheduleToBackend(schedule);
+        }
+        return false;
       }
       console.log('🔄 Synced localStorage data to backend');
+      return true;
     } catch (error) {
       console.warn('⚠️ Failed to sync to backend:', error);
+      return false;
     }
   }
 
@@ -121,6 +148,11 @@ export class ScheduleService {
 
       if (!response.ok) {
         console.warn('⚠️ Failed to save schedule to backend:', schedule.id);
+        return;
+      }
+      const result = await response.json();
+      if (result.conflicts?.length) {
+        console.warn('⚠️ Schedule overlaps other schedules:', schedule.id, result.conflicts);
       }
     } catch (error) {
       console.warn('⚠️ Error saving schedule to backend:', error);
@@ -161,7 +193,7 @@ export class ScheduleService {
         } else {
           // Fallback: extract the file path from the URL
           console.log('⚠️ No file path provided, extracting from URL...');
-          const urlParts = ringtone.url.split('/');
+          const urlParts = ringtone.url.split('?')[0].split('/');
           const folder = urlParts[urlParts.length - 2]; // e.g., 'wav_ringtones' or 'mp3_ringtones'
           const filename = urlParts[urlParts.length - 1]; // e.g., 'ringtone_20231201_120000_song.wav'
           
@@ -296,7 +328,7 @@ export class ScheduleService {
         } else {
           // Fallback: extract the file path from the URL
           console.log('⚠️ No file path provided, extracting from URL...');
-          const urlParts = ringtone.url.split('/');
+          const urlParts = ringtone.url.split('?')[0].split('/');
           const folder = urlParts[urlParts.length - 2]; // e.g., 'wav_ringtones' or 'mp3_ringtones'
           const filename = urlParts[urlParts.length - 1]; // e.g., 'ringtone_20231201_120000_song.wav'
           
@@ -514,6 +546,11 @@ export class ScheduleService {
         this.audioElement.currentTime = 0;
         console.log('⏹️ Audio stopped');
       }
+      if (this.testPlaybackId) {
+        const playbackId = this.testPlaybackId;
+        this.testPlaybackId = null;
+        this.stopTestPlayback(playbackId).catch(error => console.warn('⚠️ Could not stop test playback:', error));
+      }
     } catch (error) {
       console.error('❌ Error stopping audio:', error);
     }
@@ -686,7 +723,7 @@ export class ScheduleService {
             } else {
               // Fallback: extract the file path from the URL
               console.log('⚠️ No file path provided, extracting from URL...');
-              const urlParts = ringtone.url.split('/');
+              const urlParts = ringtone.url.split('?')[0].split('/');
               const folder = urlParts[urlParts.length - 2]; // e.g., 'wav_ringtones' or 'mp3_ringtones'
               const filename = urlParts[urlParts.length - 1]; // e.g., 'ringtone_20231201_120000_song.wav'
               
@@ -722,7 +759,9 @@ export class ScheduleService {
             throw new Error(result.error || 'Failed to test ringtone');
           }
 
-          console.log('✅ Tested ringtone via Windows Task Scheduler:', ringtone.name);
+          // Playback runs on the server; the id is used to poll or stop it
+          this.testPlaybackId = result.playback_id;
+          console.log('✅ Started ringtone test via Windows Task Scheduler:', ringtone.name, result.playback_id);
           return;
         } catch (taskError) {
           console.warn('⚠️ Windows Task Scheduler test failed, falling back to browser audio:', taskError);
@@ -746,6 +785,68 @@ export class ScheduleService {
     }
   }
 
+  // What rings between from and to (backend default: the next 24 hours)
+  public async getUpcomingOccurrences(from?: Date, to?: Date, limit = 100): Promise<ScheduleOccurrence[]> {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (from) params.set('from', from.toISOString());
+    if (to) params.set('to', to.toISOString());
+
+    const response = await fetch(`${API_BASE_URL}/api/schedules/upcoming?${params.toString()}`);
+    if (!response.ok) {
+      throw new Error(`Failed to load upcoming schedules: ${response.statusText}`);
+    }
+    const result = await response.json();
+    return result.occurrences || [];
+  }
+
+  // Pairs of active weekly schedules whose ringtones would play at the same time
+  public async getScheduleConflicts(): Promise<ScheduleConflict[]> {
+    const response = await fetch(`${API_BASE_URL}/api/schedules/conflicts`);
+    if (!response.ok) {
+      throw new Error(`Failed to load schedule conflicts: ${response.statusText}`);
+    }
+    const result = await response.json();
+    return result.conflicts || [];
+  }
+
+  // Bring the OS scheduler tasks in line with the device schedules stored on the server
+  // Orphan tasks (no schedule in the store) are only reported unless deleteOrphans is set
+  public async reconcileTasks(dryRun = false, deleteOrphans = false): Promise<TaskReconcileReport> {
+    const response = await fetch(`${API_BASE_URL}/api/task-scheduler/reconcile`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ dry_run: dryRun, delete_orphans: deleteOrphans })
+    });
+    const result = await response.json();
+    if (!response.ok && !result.actions) {
+      throw new Error(result.error || `Failed to reconcile tasks: ${response.statusText}`);
+    }
+    return result;
+  }
+
+  // Status of a device test playback (playing, stopping, finished, stopped or failed)
+  public async getTestPlayback(playbackId: string): Promise<TestPlayback> {
+    const response = await fetch(`${API_BASE_URL}/api/task-scheduler/test/${encodeURIComponent(playbackId)}`);
+    const result = await response.json();
+    if (!result.success) {
+      throw new Error(result.error || `Failed to load test playback: ${response.statusText}`);
+    }
+    return result;
+  }
+
+  public async stopTestPlayback(playbackId: string): Promise<TestPlayback> {
+    const response = await fetch(`${API_BASE_URL}/api/task-scheduler/test/${encodeURIComponent(playbackId)}/stop`, {
+      method: 'POST'
+    });
+    const result = await response.json();
+    if (!result.success) {
+      throw new Error(result.error || `Failed to stop test playback: ${response.statusText}`);
+    }
+    return result;
+  }
+
   // Cleanup method
   public destroy(): void {
     this.stopScheduleChecker();
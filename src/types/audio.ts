@@ -9,6 +9,7 @@ export interface AudioFile {
   startTime?: number;
   endTime?: number;
   filePath?: string; // Add file path for backend ringtones
+  sourceId?: string; // Backend source id once an original was uploaded (waveform peaks)
 }
 
 export interface RingtoneSettings {
@@ -7,12 +7,64 @@ export interface ScheduledRingtone {
   ringtoneFilePath?: string; // Actual file path on the filesystem for Windows Task Scheduler
   time: string; // Format: "HH:MM" (24-hour format)
   days: number[]; // Array of day numbers (0 = Sunday, 1 = Monday, ..., 6 = Saturday)
+  rrule?: string; // Optional RRULE (e.g. "FREQ=MONTHLY;BYMONTHDAY=1") used instead of days by the backend
   isActive: boolean;
   scheduleSource: 'web' | 'device'; // How the schedule is managed
   createdAt: string;
   lastPlayed?: string;
 }
 
+export interface ScheduleOccurrence {
+  time: string; // Local ISO timestamp
+  schedule_id: string;
+  ringtone_id?: string;
+  ringtone_name?: string;
+  schedule_source?: 'web' | 'device';
+}
+
+export interface ScheduleOverlap {
+  day: number; // Day of the schedule the overlap starts on (0 = Sunday)
+  start: string; // e.g. "Monday 08:00:00"
+  end: string;
+}
+
+export interface ScheduleConflict {
+  schedules: [string, string]; // Ids of the two overlapping schedules
+  ringtone_names: [string | null, string | null];
+  overlaps: ScheduleOverlap[];
+}
+
+export interface TaskReconcileAction {
+  schedule_id: string;
+  action: 'create' | 'create_disabled' | 'delete' | 'enable' | 'disable';
+  reason: string;
+  success?: boolean; // Missing on dry runs
+  error?: string;
+}
+
+export interface TaskReconcileReport {
+  dry_run: boolean;
+  tasks: number;
+  schedules: number;
+  actions: TaskReconcileAction[];
+  counts: Record<string, number>;
+  failed: number;
+  unchanged: number;
+  issues: { schedule_id: string; issue: string }[];
+  elapsed_ms: number;
+}
+
+export interface TestPlayback {
+  playback_id: string;
+  ringtone_path: string;
+  status: 'playing' | 'stopping' | 'finished' | 'stopped' | 'failed';
+  started_at: number;
+  ended_at: number | null;
+  elapsed_ms: number;
+  returncode: number | null;
+  error: string | null;
+}
+
 export interface ScheduleFormData {
   ringtoneId: string;
   time: string;
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# Rules applied
+"""
+Golden-file tests for the Task Scheduler XML tasks, run on Linux/macOS against
+benchmarks/fake_schtasks.py (no Windows needed).
+
+The Windows scheduler backend registers its tasks with the fake schtasks; the
+XML it registered is compared with test_data/task_xml/*.xml (machine-specific
+paths replaced by @PYTHON@ / @PLAYER@ / @BACKEND@).
+
+Usage:
+    python test_task_xml.py            # run the checks
+    python test_task_xml.py --update   # rewrite the golden files
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = APP_DIR / "backend"
+GOLDEN_DIR = APP_DIR / "test_data" / "task_xml"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(APP_DIR / "benchmarks"))
+
+import fake_schtasks  # noqa: E402
+
+PYTHON_EXE = r"C:\Program Files\Python313\pythonw.exe"
+MORNING = r"C:\Ringtones\morning.wav"
+EVENING = r"C:\Ringtones\evening.mp3"
+# Far beyond the 261-character /tr limit the old command lines had
+LONG_PATH = "C:\\Ringtones\\" + "\\".join(["a very long folder name"] * 12) + "\\ringtone_20250101_120000_Artist - Title_0s_to_30s.wav"
+
+
+class FakeWindows:
+    """Temp directory with a schtasks shim first on PATH and a fresh fake state"""
+
+    def __enter__(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.dir.name, "state.json")
+        self.saved_env = {name: os.environ.get(name) for name in ("PATH", "FAKE_SCHTASKS_STATE")}
+        fake_schtasks.install(os.path.join(self.dir.name, "bin"))
+        os.environ["PATH"] = os.path.join(self.dir.name, "bin") + os.pathsep + os.environ.get("PATH", "")
+        os.environ["FAKE_SCHTASKS_STATE"] = self.state_file
+
+        from taskSchedulerService import TaskTriggerMap, WindowsTaskSchedulerService
+        self.service = WindowsTaskSchedulerService()
+        self.service.python_exe = PYTHON_EXE
+        self.service.triggers = TaskTriggerMap(os.path.join(self.dir.name, "triggers.json"))
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, value in self.saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        self.dir.cleanup()
+
+    def tasks(self):
+        return fake_schtasks.load_state(self.state_file)["tasks"]
+
+    def registered_xml(self, ringtone_path):
+        from task_xml import ringtone_task_name
+        xml = self.tasks()[f"Ringtone_{ringtone_task_name(ringtone_path)}"]["xml"]
+        player = self.service.ringtone_player_script
+        return (xml.replace(PYTHON_EXE, "@PYTHON@")
+                   .replace(player, "@PLAYER@")
+                   .replace(os.path.dirname(player), "@BACKEND@"))
+
+
+def check_golden(name, xml, update=False):
+    golden_file = GOLDEN_DIR / f"{name}.xml"
+    if update:
+        GOLDEN_DIR.mkdir(parents=True, exist_ok=True)
+        golden_file.write_text(xml, encoding="utf-8")
+        print(f"[INFO] Updated {golden_file.relative_to(APP_DIR)}")
+        return
+    expected = golden_file.read_text(encoding="utf-8")
+    assert xml == expected, f"{name}: registered XML differs from {golden_file}:\n{xml}"
+
+
+def test_schedules_of_one_ringtone_share_a_task(update=False):
+    with FakeWindows() as fake:
+        service = fake.service
+        assert service.create_scheduled_task("weekdays", MORNING, "07:00", [1, 2, 3, 4, 5])
+        assert service.create_scheduled_task("weekend", MORNING, "8:30", [0, 6])
+        # Same trigger as "weekdays": registered once
+        assert service.create_scheduled_task("weekdays-copy", MORNING, "07:00", [5, 4, 3, 2, 1])
+        assert service.create_scheduled_task("evening", EVENING, "21:15", [3])
+        assert service.disable_scheduled_task("weekend")
+
+        assert len(fake.tasks()) == 2
+        check_golden("morning_collapsed", fake.registered_xml(MORNING), update)
+
+        listed = {task["name"]: task for task in service.list_all_tasks(refresh=True)}
+        assert sorted(listed) == ["evening", "weekdays", "weekdays-copy", "weekend"]
+        assert listed["weekend"]["enabled"] is False and listed["weekend"]["status"] == "Disabled"
+        assert listed["weekdays"]["enabled"] is True and listed["weekdays"]["time"] == "07:00"
+        assert listed["weekdays"]["full_name"] == listed["weekend"]["full_name"]
+        assert service.get_task_status("weekend") == "Disabled"
+        assert service.get_task_status("weekdays") == "Ready"
+
+
+def test_last_schedule_removes_the_task():
+    with FakeWindows() as fake:
+        service = fake.service
+        assert service.create_scheduled_task("a", MORNING, "07:00", [1])
+        assert service.create_scheduled_task("b", MORNING, "07:30", [1])
+        assert service.create_scheduled_task("c", EVENING, "20:00", [1])
+        # Moving a schedule to another ringtone moves its trigger
+        assert service.create_scheduled_task("b", EVENING, "07:30", [1])
+        commands = sorted(task["task_to_run"] for task in fake.tasks().values())
+        assert commands[0].endswith("--scheduled-time 07:30,20:00") and commands[1].endswith("--scheduled-time 07:00"), commands
+        assert service.delete_scheduled_task("a")
+        assert len(fake.tasks()) == 1
+        assert service.delete_scheduled_task("b") and service.delete_scheduled_task("c")
+        assert fake.tasks() == {}
+        assert service.triggers.items() == []
+
+
+def test_disabled_task_and_long_path(update=False):
+    with FakeWindows() as fake:
+        service = fake.service
+        assert service.create_scheduled_task("long", LONG_PATH, "06:45", [0, 1, 2, 3, 4, 5, 6])
+        assert service.disable_scheduled_task("long")
+        check_golden("long_path_disabled", fake.registered_xml(LONG_PATH), update)
+        assert [task["enabled"] for task in fake.tasks().values()] == [False]
+        # The whole command fits into <Exec>; no wrapper script is needed any more
+        assert not (BACKEND_DIR / "play_ringtone_wrapper.py").exists()
+
+
+def test_single_schedule_tasks_are_migrated():
+    with FakeWindows() as fake:
+        service = fake.service
+        # A task created by the old one-task-per-schedule code
+        assert service._run_schtasks_command(["/create", "/tn", "Ringtone_old", "/tr", f'"{PYTHON_EXE}" "x.py" "{MORNING}"',
+                                              "/sc", "weekly", "/d", "MON", "/st", "07:00", "/f"])[0]
+        listed = service.list_all_tasks(refresh=True)
+        assert [(task["name"], task.get("single")) for task in listed] == [("old", True)]
+
+        from task_reconciler import plan_reconcile
+        desired = {"old": {"ringtone_path": __file__, "time": "07:00", "days": [1], "enabled": True}}
+        actions, issues, unchanged = plan_reconcile(desired, {task["name"]: task for task in listed})
+        assert [(action["action"], action["reason"]) for action in actions] == [("create", "single-schedule task")]
+
+        assert service.create_scheduled_task("old", MORNING, "07:00", [1])
+        assert "Ringtone_old" not in fake.tasks() and len(fake.tasks()) == 1
+
+
+def test_reconcile_with_lost_trigger_map_keeps_ringtone_task():
+    import time
+    import wave
+    from taskSchedulerService import TaskTriggerMap
+    from task_reconciler import reconcile
+
+    with FakeWindows() as fake:
+        service = fake.service
+        # A real file in the mixer format (the reconciler checks it and no rendition is decoded)
+        ringtone = os.path.join(fake.dir.name, "alarm.wav")
+        with wave.open(ringtone, "wb") as wav_file:
+            wav_file.setnchannels(2)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(22050)
+            wav_file.writeframes(b"\0" * 400)
+        schedules = [{"id": f"s{index}", "scheduleSource": "device", "ringtoneFilePath": ringtone,
+                      "time": f"0{index}:00", "days": [1], "isActive": True} for index in range(2)]
+        for schedule in schedules:
+            assert service.create_scheduled_task(schedule["id"], ringtone, schedule["time"], schedule["days"])
+
+        # Trigger map lost: the ringtone task now looks like an orphan of the old layout.
+        # A slow /delete makes it land after the creates that re-register the task, if both run at once.
+        service.triggers = TaskTriggerMap(os.path.join(fake.dir.name, "lost.json"))
+        run_schtasks = service._run_schtasks_command
+
+        def slow_delete(args, *rest, **kwargs):
+            if args[0] == "/delete":
+                time.sleep(0.5)
+            return run_schtasks(args, *rest, **kwargs)
+
+        service._run_schtasks_command = slow_delete
+        report = reconcile(service, schedules, delete_orphans=True)
+        assert all(action["success"] for action in report["actions"]), report["actions"]
+
+        tasks = fake.tasks()
+        assert len(tasks) == 1, f"{sorted(tasks)} after {report['actions']}"
+        assert len(next(iter(tasks.values()))["triggers"]) == 2
+        assert sorted(task["name"] for task in service.list_all_tasks(refresh=True)) == ["s0", "s1"]
+
+
+def test_invalid_schedules_are_rejected():
+    with FakeWindows() as fake:
+        assert not fake.service.create_scheduled_task("bad-time", MORNING, "25:00", [1])
+        assert not fake.service.create_scheduled_task("bad-day", MORNING, "07:00", [7])
+        assert fake.tasks() == {}
+
+
+def main():
+    update = "--update" in sys.argv
+    tests = [
+        ("test_schedules_of_one_ringtone_share_a_task", lambda: test_schedules_of_one_ringtone_share_a_task(update)),
+        ("test_last_schedule_removes_the_task", test_last_schedule_removes_the_task),
+        ("test_disabled_task_and_long_path", lambda: test_disabled_task_and_long_path(update)),
+        ("test_single_schedule_tasks_are_migrated", test_single_schedule_tasks_are_migrated),
+        ("test_reconcile_with_lost_trigger_map_keeps_ringtone_task", test_reconcile_with_lost_trigger_map_keeps_ringtone_task),
+        ("test_invalid_schedules_are_rejected", test_invalid_schedules_are_rejected),
+    ]
+    failed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"[SUCCESS] {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"[ERROR] {name}: {e}")
+    print(f"[INFO] {len(tests) - failed}/{len(tests)} passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())